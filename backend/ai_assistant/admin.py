@@ -1,11 +1,12 @@
 from django.contrib import admin
-from .models import AIConsultation
+from .models import AIAnswerCache, AIConsultation
 
 @admin.register(AIConsultation)
 class AIConsultationAdmin(admin.ModelAdmin):
-    list_display = ('question_short', 'user', 'created_at')
-    list_filter = ('created_at', 'user')
-    readonly_fields = ('user', 'question', 'answer', 'created_at')
+    list_display = ('question_short', 'user', 'language', 'status', 'cache_hit', 'reusable', 'created_at')
+    list_filter = ('created_at', 'status', 'language', 'cache_hit', 'reusable', 'user')
+    readonly_fields = ('public_id', 'user', 'question', 'answer', 'language', 'status', 'attempts',
+                       'cache_hit', 'reusable', 'started_at', 'next_attempt_at', 'created_at')
     
     def question_short(self, obj):
         return (obj.question[:75] + '..') if len(obj.question) > 75 else obj.question
@@ -17,3 +18,19 @@ class AIConsultationAdmin(admin.ModelAdmin):
     
     def has_change_permission(self, request, obj=None):
         return False
+
+
+@admin.register(AIAnswerCache)
+class AIAnswerCacheAdmin(admin.ModelAdmin):
+    """Les entrées peuvent être supprimées (réponse à régénérer), pas modifiées"""
+    list_display = ('normalized_question', 'language', 'hits', 'last_used_at', 'expires_at')
+    list_filter = ('language',)
+    search_fields = ('normalized_question',)
+    readonly_fields = ('key', 'language', 'normalized_question', 'answer', 'hits',
+                       'created_at', 'last_used_at', 'expires_at')
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
@@ -5,3 +5,6 @@ class AiAssistantConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'ai_assistant'
     verbose_name = 'Assistant IA Biblique'
+
+    def ready(self):
+        from . import signals  # noqa: F401
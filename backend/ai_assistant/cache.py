@@ -0,0 +1,100 @@
+"""
+Cache des réponses de l'assistant biblique.
+
+Les questions fréquentes (« Que dit la Bible sur le pardon ? ») sont
+normalisées (casse, accents, ponctuation, espaces) et associées, par langue,
+à la dernière réponse réussie de l'IA. Le cache vit en base (AIAnswerCache),
+donc partagé entre les workers ; chaque entrée expire après
+AI_ANSWER_CACHE_TTL secondes et les moins récemment utilisées sont évincées
+au-delà de AI_ANSWER_CACHE_MAX_ENTRIES. Les statistiques succès/échec se
+lisent sur l'historique (AIConsultation.cache_hit).
+"""
+import hashlib
+import re
+import unicodedata
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q, Sum
+from django.utils import timezone
+
+from .models import AIAnswerCache, AIConsultation, AIQuestionIndex
+
+PUNCTUATION_RE = re.compile(r'[^\w\s]')
+WHITESPACE_RE = re.compile(r'\s+')
+
+
+def normalize_question(question):
+    text = unicodedata.normalize('NFKD', question.lower())
+    text = ''.join(char for char in text if not unicodedata.combining(char))
+    text = PUNCTUATION_RE.sub(' ', text)
+    return WHITESPACE_RE.sub(' ', text).strip()
+
+
+def get_key(normalized, language):
+    return hashlib.sha256(f"{language}:{normalized}".encode('utf-8')).hexdigest()
+
+
+def get_answer(question, language):
+    """Réponse en cache encore valide, ou None ; une utilisation met à jour l'ordre LRU"""
+    if not settings.AI_ANSWER_CACHE_ENABLED:
+        return None
+    now = timezone.now()
+    key = get_key(normalize_question(question), language)
+    entry = AIAnswerCache.objects.filter(key=key, expires_at__gt=now).only('pk', 'answer').first()
+    if entry is None:
+        return None
+    AIAnswerCache.objects.filter(pk=entry.pk).update(hits=F('hits') + 1, last_used_at=now)
+    return entry.answer
+
+
+def store_answer(question, language, answer):
+    if not settings.AI_ANSWER_CACHE_ENABLED:
+        return
+    now = timezone.now()
+    normalized = normalize_question(question)
+    if not normalized:
+        return
+    defaults = {
+        'language': language,
+        'normalized_question': normalized,
+        'answer': answer,
+        'last_used_at': now,
+        'expires_at': now + timedelta(seconds=settings.AI_ANSWER_CACHE_TTL),
+    }
+    try:
+        with transaction.atomic():
+            AIAnswerCache.objects.update_or_create(key=get_key(normalized, language), defaults=defaults)
+    except IntegrityError:
+        # Même question enregistrée au même instant par un autre worker
+        return
+    evict()
+
+
+def evict():
+    """Supprime les entrées expirées puis les moins récemment utilisées au-delà de la limite"""
+    now = timezone.now()
+    AIAnswerCache.objects.filter(expires_at__lte=now).delete()
+    # Entrées de l'index des questions proches sans réponse en cache (cache désactivé entre-temps)
+    AIQuestionIndex.objects.filter(expires_at__lte=now).delete()
+    excess = AIAnswerCache.objects.count() - settings.AI_ANSWER_CACHE_MAX_ENTRIES
+    if excess > 0:
+        oldest = list(AIAnswerCache.objects.order_by('last_used_at', 'id').values_list('pk', flat=True)[:excess])
+        AIAnswerCache.objects.filter(pk__in=oldest).delete()
+
+
+def get_stats():
+    history = AIConsultation.objects.aggregate(
+        total=Count('id'), hits=Count('id', filter=Q(cache_hit=True))
+    )
+    entries = AIAnswerCache.objects.aggregate(entries=Count('id'), reused=Sum('hits'))
+    total = history['total']
+    return {
+        'requests': total,
+        'hits': history['hits'],
+        'misses': total - history['hits'],
+        'hit_ratio': round(history['hits'] / total, 4) if total else 0.0,
+        'entries': entries['entries'],
+        'entry_hits': entries['reused'] or 0,
+    }
@@ -0,0 +1,118 @@
+"""
+Client HTTP partagé pour l'API Gemini.
+
+Une seule session requests par processus : les connexions TCP/TLS vers
+generativelanguage.googleapis.com restent ouvertes (keep-alive) dans un pool
+réutilisé par tous les threads (requêtes, pool d'arrière-plan). Les réponses
+en flux (ASGI) utilisent de même un httpx.AsyncClient partagé par boucle
+d'événements (une seule par worker uvicorn). Délais de
+connexion et de lecture distincts ; chaque appel est chronométré par
+opération (generateContent...) et consultable via get_metrics() (par
+processus, exposé dans /api/ai/cache/stats/).
+"""
+import asyncio
+import logging
+import threading
+import time
+import weakref
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+
+class GeminiClient:
+    def __init__(self):
+        self._session = None
+        self._lock = threading.Lock()
+        self._metrics = {}
+        # Un client asynchrone est lié à sa boucle d'événements
+        self._async_clients = weakref.WeakKeyDictionary()
+
+    def get_timeouts(self):
+        return settings.GEMINI_CONNECT_TIMEOUT, settings.GEMINI_READ_TIMEOUT
+
+    def get_session(self):
+        with self._lock:
+            if self._session is None:
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=settings.GEMINI_POOL_MAXSIZE)
+                session = requests.Session()
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+                self._session = session
+            return self._session
+
+    def get_async_client(self):
+        """Client httpx de la boucle courante, créé au premier appel (keep-alive, même pool maximal)"""
+        import httpx
+
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            client = self._async_clients.get(loop)
+            if client is None or client.is_closed:
+                connect, read = self.get_timeouts()
+                client = httpx.AsyncClient(
+                    timeout=httpx.Timeout(read, connect=connect),
+                    limits=httpx.Limits(
+                        max_connections=settings.GEMINI_POOL_MAXSIZE,
+                        max_keepalive_connections=settings.GEMINI_POOL_MAXSIZE,
+                    ),
+                )
+                self._async_clients[loop] = client
+            return client
+
+    def get_url(self, method):
+        return f"{settings.GEMINI_API_URL}:{method}"
+
+    def post(self, method, payload):
+        """POST JSON vers `{GEMINI_API_URL}:{method}` ; la clé passe par l'en-tête, pas par l'URL journalisée"""
+        started = time.perf_counter()
+        ok = False
+        try:
+            response = self.get_session().post(
+                self.get_url(method), json=payload,
+                headers={'x-goog-api-key': settings.GEMINI_API_KEY},
+                timeout=self.get_timeouts(),
+            )
+            ok = response.status_code == 200
+            return response
+        finally:
+            elapsed = (time.perf_counter() - started) * 1000
+            self.record(method, elapsed, ok)
+            logger.debug("Gemini %s : %.0f ms", method, elapsed)
+
+    def record(self, method, elapsed, ok):
+        with self._lock:
+            metric = self._metrics.setdefault(method, {'calls': 0, 'errors': 0, 'total_ms': 0.0, 'max_ms': 0.0})
+            metric['calls'] += 1
+            metric['errors'] += 0 if ok else 1
+            metric['total_ms'] += elapsed
+            metric['max_ms'] = max(metric['max_ms'], elapsed)
+            metric['last_ms'] = elapsed
+
+    def get_metrics(self):
+        with self._lock:
+            return {
+                method: {
+                    'calls': metric['calls'],
+                    'errors': metric['errors'],
+                    'avg_ms': round(metric['total_ms'] / metric['calls'], 1),
+                    'max_ms': round(metric['max_ms'], 1),
+                    'last_ms': round(metric['last_ms'], 1),
+                }
+                for method, metric in self._metrics.items()
+            }
+
+    def reset(self):
+        """Ferme les connexions et remet les mesures à zéro (tests, changement de configuration)"""
+        with self._lock:
+            if self._session is not None:
+                self._session.close()
+            self._session = None
+            self._async_clients = weakref.WeakKeyDictionary()
+            self._metrics = {}
+
+
+gemini = GeminiClient()
@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from ai_assistant.similarity import rebuild_index
+
+
+class Command(BaseCommand):
+    help = "Reconstruit l'index des questions proches de l'assistant biblique"
+
+    def handle(self, *args, **options):
+        count = rebuild_index()
+        self.stdout.write(self.style.SUCCESS(f"{count} question(s) indexée(s)."))
@@ -0,0 +1,37 @@
+# Generated by Django 4.2.30 on 2026-10-18 18:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ai_assistant', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='aiconsultation',
+            name='cache_hit',
+            field=models.BooleanField(default=False, verbose_name='Servie depuis le cache'),
+        ),
+        migrations.CreateModel(
+            name='AIAnswerCache',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=64, unique=True, verbose_name='Clé')),
+                ('language', models.CharField(max_length=10, verbose_name='Langue')),
+                ('normalized_question', models.TextField(verbose_name='Question normalisée')),
+                ('answer', models.TextField(verbose_name='Réponse')),
+                ('hits', models.PositiveIntegerField(default=0, verbose_name='Utilisations')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('last_used_at', models.DateTimeField(verbose_name='Dernière utilisation')),
+                ('expires_at', models.DateTimeField(verbose_name='Expire le')),
+            ],
+            options={
+                'verbose_name': 'Réponse IA en cache',
+                'verbose_name_plural': 'Réponses IA en cache',
+                'indexes': [models.Index(fields=['last_used_at'], name='ai_answer_cache_lru_idx'), models.Index(fields=['expires_at'], name='ai_answer_cache_expiry_idx')],
+            },
+        ),
+    ]
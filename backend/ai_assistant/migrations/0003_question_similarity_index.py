@@ -0,0 +1,50 @@
+# Generated by Django 4.2.30 on 2026-10-18 18:35
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ai_assistant', '0002_aianswercache'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='aiconsultation',
+            name='language',
+            field=models.CharField(default='fr', max_length=10, verbose_name='Langue'),
+        ),
+        migrations.AddField(
+            model_name='aiconsultation',
+            name='reusable',
+            field=models.BooleanField(default=False, verbose_name='Réutilisable'),
+        ),
+        migrations.CreateModel(
+            name='AIQuestionIndex',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('language', models.CharField(max_length=10, verbose_name='Langue')),
+                ('tokens', models.TextField(verbose_name='Termes')),
+                ('consultation', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='similarity_entry', to='ai_assistant.aiconsultation')),
+            ],
+            options={
+                'verbose_name': 'Question indexée',
+                'verbose_name_plural': 'Questions indexées',
+            },
+        ),
+        migrations.CreateModel(
+            name='AIQuestionBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bucket', models.BigIntegerField(verbose_name='Seau')),
+                ('entry', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='buckets', to='ai_assistant.aiquestionindex')),
+            ],
+            options={
+                'verbose_name': 'Seau LSH',
+                'verbose_name_plural': 'Seaux LSH',
+                'indexes': [models.Index(fields=['bucket', 'entry'], name='ai_question_bucket_idx')],
+            },
+        ),
+    ]
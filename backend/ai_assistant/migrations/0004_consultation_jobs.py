@@ -0,0 +1,61 @@
+# Generated by Django 4.2.30 on 2026-10-18 18:42
+
+from django.db import migrations, models
+import uuid
+
+
+def fill_public_ids(apps, schema_editor):
+    # AddField n'évalue le défaut qu'une fois : un identifiant distinct par consultation existante
+    AIConsultation = apps.get_model('ai_assistant', 'AIConsultation')
+    for consultation in AIConsultation.objects.only('pk').iterator():
+        AIConsultation.objects.filter(pk=consultation.pk).update(public_id=uuid.uuid4())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ai_assistant', '0003_question_similarity_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='aiconsultation',
+            name='attempts',
+            field=models.PositiveSmallIntegerField(default=0, verbose_name='Tentatives'),
+        ),
+        migrations.AddField(
+            model_name='aiconsultation',
+            name='next_attempt_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Prochaine tentative'),
+        ),
+        migrations.AddField(
+            model_name='aiconsultation',
+            name='public_id',
+            field=models.UUIDField(default=uuid.uuid4, editable=False, null=True),
+        ),
+        migrations.RunPython(fill_public_ids, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='aiconsultation',
+            name='public_id',
+            field=models.UUIDField(default=uuid.uuid4, editable=False, unique=True),
+        ),
+        migrations.AddField(
+            model_name='aiconsultation',
+            name='started_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Début du traitement'),
+        ),
+        migrations.AddField(
+            model_name='aiconsultation',
+            name='status',
+            field=models.CharField(choices=[('PENDING', 'En attente'), ('RUNNING', 'En cours'), ('DONE', 'Terminée'), ('FAILED', 'Échouée')], default='DONE', max_length=10, verbose_name='Statut'),
+        ),
+        migrations.AlterField(
+            model_name='aiconsultation',
+            name='answer',
+            field=models.TextField(blank=True, verbose_name="Réponse de l'IA"),
+        ),
+        migrations.AddIndex(
+            model_name='aiconsultation',
+            index=models.Index(fields=['status', 'next_attempt_at'], name='ai_consultation_job_idx'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.30 on 2026-10-18 18:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ai_assistant', '0004_consultation_jobs'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='aiquestionindex',
+            name='cache_key',
+            field=models.CharField(db_index=True, default='', max_length=64, verbose_name='Clé du cache'),
+        ),
+        migrations.AddField(
+            model_name='aiquestionindex',
+            name='expires_at',
+            field=models.DateTimeField(null=True, verbose_name='Expire le'),
+        ),
+    ]
@@ -1,8 +1,18 @@
+import uuid
+
 from django.db import models
 from django.conf import settings
 from django.utils.translation import gettext_lazy as _
 
 class AIConsultation(models.Model):
+    class Status(models.TextChoices):
+        PENDING = 'PENDING', _('En attente')
+        RUNNING = 'RUNNING', _('En cours')
+        DONE = 'DONE', _('Terminée')
+        FAILED = 'FAILED', _('Échouée')
+
+    # Identifiant non devinable pour suivre la consultation (GET /api/ai/consultations/<public_id>/)
+    public_id = models.UUIDField(default=uuid.uuid4, unique=True, editable=False)
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         on_delete=models.SET_NULL,
@@ -11,13 +21,83 @@ class AIConsultation(models.Model):
         related_name='ai_consultations'
     )
     question = models.TextField(_('Question'))
-    answer = models.TextField(_('Réponse de l\'IA'))
+    answer = models.TextField(_('Réponse de l\'IA'), blank=True)
+    status = models.CharField(_('Statut'), max_length=10, choices=Status.choices, default=Status.DONE)
+    # Traitement en arrière-plan (ConsultationJobService) : tentatives et prochaine tentative après un quota atteint
+    attempts = models.PositiveSmallIntegerField(_('Tentatives'), default=0)
+    next_attempt_at = models.DateTimeField(_('Prochaine tentative'), null=True, blank=True)
+    started_at = models.DateTimeField(_('Début du traitement'), null=True, blank=True)
+    language = models.CharField(_('Langue'), max_length=10, default='fr')
+    # Réponse servie depuis le cache (statistiques de succès/échec du cache)
+    cache_hit = models.BooleanField(_('Servie depuis le cache'), default=False)
+    # Réponse complète de l'IA, réutilisable pour les questions proches (ai_assistant/similarity.py)
+    reusable = models.BooleanField(_('Réutilisable'), default=False)
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
         verbose_name = _('Consultation IA')
         verbose_name_plural = _('Consultations IA')
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='ai_consultation_job_idx'),
+        ]
 
     def __str__(self):
         return f"Question de {self.user.username if self.user else 'Anonyme'} - {self.created_at.strftime('%Y-%m-%d %H:%M')}"
+
+
+class AIAnswerCache(models.Model):
+    """
+    Réponse de l'IA réutilisable pour une question normalisée (casse, accents,
+    ponctuation, espaces) dans une langue. Partagée par tous les workers via la
+    base ; expiration (TTL) et éviction LRU gérées par ai_assistant/cache.py.
+    """
+    key = models.CharField(_('Clé'), max_length=64, unique=True)
+    language = models.CharField(_('Langue'), max_length=10)
+    normalized_question = models.TextField(_('Question normalisée'))
+    answer = models.TextField(_('Réponse'))
+    hits = models.PositiveIntegerField(_('Utilisations'), default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_used_at = models.DateTimeField(_('Dernière utilisation'))
+    expires_at = models.DateTimeField(_('Expire le'))
+
+    class Meta:
+        verbose_name = _('Réponse IA en cache')
+        verbose_name_plural = _('Réponses IA en cache')
+        indexes = [
+            models.Index(fields=['last_used_at'], name='ai_answer_cache_lru_idx'),
+            models.Index(fields=['expires_at'], name='ai_answer_cache_expiry_idx'),
+        ]
+
+    def __str__(self):
+        return f"[{self.language}] {self.normalized_question[:60]}"
+
+
+class AIQuestionIndex(models.Model):
+    """Question indexée pour la recherche de questions proches (MinHash / LSH)"""
+    consultation = models.OneToOneField(AIConsultation, on_delete=models.CASCADE, related_name='similarity_entry')
+    language = models.CharField(_('Langue'), max_length=10)
+    tokens = models.TextField(_('Termes'))
+    # Clé de l'entrée AIAnswerCache de la même question : supprimées ensemble
+    cache_key = models.CharField(_('Clé du cache'), max_length=64, db_index=True, default='')
+    expires_at = models.DateTimeField(_('Expire le'), null=True)
+
+    class Meta:
+        verbose_name = _('Question indexée')
+        verbose_name_plural = _('Questions indexées')
+
+    def __str__(self):
+        return f"[{self.language}] {self.tokens[:60]}"
+
+
+class AIQuestionBucket(models.Model):
+    """Seau LSH : empreinte d'une bande de la signature MinHash d'une question"""
+    entry = models.ForeignKey(AIQuestionIndex, on_delete=models.CASCADE, related_name='buckets')
+    bucket = models.BigIntegerField(_('Seau'))
+
+    class Meta:
+        verbose_name = _('Seau LSH')
+        verbose_name_plural = _('Seaux LSH')
+        indexes = [
+            models.Index(fields=['bucket', 'entry'], name='ai_question_bucket_idx'),
+        ]
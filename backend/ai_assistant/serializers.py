@@ -4,5 +4,5 @@ from .models import AIConsultation
 class AIConsultationSerializer(serializers.ModelSerializer):
     class Meta:
         model = AIConsultation
-        fields = ('id', 'user', 'question', 'answer', 'created_at')
-        read_only_fields = ('user', 'answer', 'created_at')
+        fields = ('id', 'public_id', 'user', 'question', 'answer', 'status', 'cache_hit', 'created_at')
+        read_only_fields = ('public_id', 'user', 'answer', 'status', 'cache_hit', 'created_at')
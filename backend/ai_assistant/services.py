@@ -1,106 +1,201 @@
-import requests
+import asyncio
+import json
+import logging
+import time
+
+from datetime import timedelta
+
 from django.conf import settings
+from django.db.models import F, Q
+from django.utils import timezone
+
+from cyprus_api.tasks import run_in_background, run_later
+from .client import gemini
+from .models import AIConsultation
+from . import cache as answer_cache
+
+logger = logging.getLogger(__name__)
+
+RATE_LIMIT_MESSAGE = "Le service est actuellement surchargé (limite de quota). Veuillez réessayer dans quelques instants."
+
+
+class AIRateLimitError(Exception):
+    """Quota de l'API Gemini atteint (HTTP 429)"""
+
 
 class BiblicalAIService:
     @staticmethod
     def ask_bible(question, language='fr'):
+        return BiblicalAIService.generate_answer(question, language)[0]
+
+    @staticmethod
+    def get_system_prompt(language='fr'):
         # Configuration of the system prompt based on language
         if language == 'en':
-            system_prompt = (
+            return (
                 "You are a spiritual and biblical assistant for the 'Cyprus For Christ' platform. "
                 "Your answers must be based on the Bible, with a pastoral, caring, and encouraging tone. "
                 "If a question is not spiritual or biblical, politely try to steer the conversation back to faith. "
                 "Use Bible verses to support your answers. Answer in English (King James Version style if appropriate)."
             )
-        else:
-            system_prompt = (
-                "Tu es un assistant spirituel et biblique pour la plateforme 'Cyprus For Christ'. "
-                "Tes réponses doivent être basées sur la Bible, avec un ton pastoral, bienveillant, et encourageant. "
-                "Si une question n'est pas spirituelle ou biblique, essaie de ramener poliment la conversation vers la foi. "
-                "Utilise des versets bibliques pour appuyer tes réponses. Réponds en français."
-            )
+        return (
+            "Tu es un assistant spirituel et biblique pour la plateforme 'Cyprus For Christ'. "
+            "Tes réponses doivent être basées sur la Bible, avec un ton pastoral, bienveillant, et encourageant. "
+            "Si une question n'est pas spirituelle ou biblique, essaie de ramener poliment la conversation vers la foi. "
+            "Utilise des versets bibliques pour appuyer tes réponses. Réponds en français."
+        )
+
+    @staticmethod
+    def get_answer_payload(question, language='fr'):
+        # Construct the full prompt with context
+        full_prompt = f"{BiblicalAIService.get_system_prompt(language)}\n\nQuestion de l'utilisateur: {question}"
+        return {
+            "contents": [{
+                "parts": [{"text": full_prompt}]
+            }],
+            "generationConfig": {
+                "temperature": 0.7,
+                "maxOutputTokens": 2048
+            }
+        }
 
+    @staticmethod
+    def request_answer(question, language='fr'):
+        """
+        Un seul appel à l'IA : (réponse, complète). Un quota atteint (HTTP 429)
+        lève AIRateLimitError, l'appelant décide quand réessayer.
+        """
         try:
             if not settings.GEMINI_API_KEY:
-                 return "Erreur de configuration : La clé API Google Gemini est manquante."
-
-            # Use Gemini REST API directly (v1beta endpoint_
-            # Update to gemini-flash-latest to better handle free tier limits and availability
-            url = f"https://generativelanguage.googleapis.com/v1beta/models/gemini-flash-latest:generateContent?key={settings.GEMINI_API_KEY}"
-            
-            # Construct the full prompt with context
-            full_prompt = f"{system_prompt}\n\nQuestion de l'utilisateur: {question}"
-            
-            payload = {
-                "contents": [{
-                    "parts": [{"text": full_prompt}]
-                }],
-                "generationConfig": {
-                    "temperature": 0.7,
-                    "maxOutputTokens": 2048
-                }
-            }
-            
-            # Simple retry mechanism for 429 errors
-            import time
-            max_retries = 3
-            for attempt in range(max_retries):
-                response = requests.post(url, json=payload, timeout=30)
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    # Debug logging
-                    print(f"Gemini API Response: {data}")
-                    
-                    if 'candidates' in data and len(data['candidates']) > 0:
-                        candidate = data['candidates'][0]
-                        answer_text = ""
-                        
-                        # Try to get text even if interrupted
-                        if 'content' in candidate and 'parts' in candidate['content']:
-                            answer_text = candidate['content']['parts'][0]['text']
-                        
-                        if 'finishReason' in candidate and candidate['finishReason'] != 'STOP':
-                            if answer_text:
-                                return f"{answer_text}\n\n[Note: La réponse a été interrompue ({candidate['finishReason']})]"
-                            else:
-                                return f"La réponse a été interrompue. Raison: {candidate['finishReason']}"
-                        
+                 return "Erreur de configuration : La clé API Google Gemini est manquante.", False
+
+            # Use Gemini REST API directly (GEMINI_API_URL, connexions réutilisées par ai_assistant/client.py)
+            payload = BiblicalAIService.get_answer_payload(question, language)
+            response = gemini.post('generateContent', payload)
+
+            if response.status_code == 200:
+                data = response.json()
+                logger.debug("Gemini API Response: %s", data)
+
+                if 'candidates' in data and len(data['candidates']) > 0:
+                    candidate = data['candidates'][0]
+                    answer_text = ""
+
+                    # Try to get text even if interrupted
+                    if 'content' in candidate and 'parts' in candidate['content']:
+                        answer_text = candidate['content']['parts'][0]['text']
+
+                    if 'finishReason' in candidate and candidate['finishReason'] != 'STOP':
                         if answer_text:
-                            return answer_text
+                            return f"{answer_text}\n\n[Note: La réponse a été interrompue ({candidate['finishReason']})]", False
                         else:
-                            return "Désolé, la réponse de l'IA est vide ou illisible."
-                    else:
-                        return "Désolé, je n'ai pas pu générer de réponse (Aucun candidat)."
-                elif response.status_code == 429:
-                    # Rate limit hit
-                    if attempt < max_retries - 1:
-                        time.sleep(2 * (attempt + 1)) # Backoff: 2s, 4s...
-                        continue
+                            return f"La réponse a été interrompue. Raison: {candidate['finishReason']}", False
+
+                    if answer_text:
+                        return answer_text, True
                     else:
-                        return "Le service est actuellement surchargé (limite de quota). Veuillez réessayer dans quelques instants."
+                        return "Désolé, la réponse de l'IA est vide ou illisible.", False
                 else:
-                    print(f"Gemini API Error: {response.status_code} - {response.text}")
-                    return f"Erreur API ({response.status_code}): {response.text}"
-            
+                    return "Désolé, je n'ai pas pu générer de réponse (Aucun candidat).", False
+            elif response.status_code == 429:
+                # Rate limit hit
+                raise AIRateLimitError(response.text)
+            else:
+                logger.warning("Gemini API Error: %s - %s", response.status_code, response.text)
+                return f"Erreur API ({response.status_code}): {response.text}", False
+
+        except AIRateLimitError:
+            raise
         except Exception as e:
-            print(f"Gemini Service Exception: {str(e)}")
-            import traceback
-            traceback.print_exc()
-            return f"Désolé, je rencontre une difficulté technique pour répondre : {str(e)}"
+            logger.exception("Gemini Service Exception")
+            return f"Désolé, je rencontre une difficulté technique pour répondre : {str(e)}", False
 
     @staticmethod
-    def generate_daily_rhema():
-        """Génère un Rhema du jour complet (Titre, Verset, Contenu, Méditation)"""
-        prompt = (
-            "Tu es un pasteur inspiré. Génère le 'Rhema du Jour' pour aujourd'hui. "
-            "Réponds UNIQUEMENT avec un objet JSON au format suivant : "
+    def generate_answer(question, language='fr'):
+        """(réponse, complète) sans nouvel essai : les consultations passent par ConsultationJobService"""
+        try:
+            return BiblicalAIService.request_answer(question, language)
+        except AIRateLimitError:
+            return RATE_LIMIT_MESSAGE, False
+
+    @staticmethod
+    async def stream_answer(question, language='fr'):
+        """
+        Réponse de l'IA au fil de la génération (streamGenerateContent en SSE),
+        via un client HTTP asynchrone : le worker n'est pas bloqué pendant l'appel.
+        Produit des couples (fragment, finishReason) ; finishReason vaut 'STOP'
+        sur le dernier fragment d'une réponse complète, 'ERROR' en cas d'échec
+        (le fragment est alors le message d'erreur destiné au membre).
+        """
+        if not settings.GEMINI_API_KEY:
+            yield "Erreur de configuration : La clé API Google Gemini est manquante.", 'ERROR'
+            return
+
+        url = f"{gemini.get_url('streamGenerateContent')}?alt=sse"
+        headers = {'x-goog-api-key': settings.GEMINI_API_KEY}
+        payload = BiblicalAIService.get_answer_payload(question, language)
+        max_retries = 3
+        try:
+            # Client partagé (ai_assistant/client.py) : connexions gardées ouvertes entre les questions
+            client = gemini.get_async_client()
+            for attempt in range(max_retries):
+                started = time.perf_counter()
+                async with client.stream('POST', url, json=payload, headers=headers) as response:
+                    # Mesure jusqu'aux en-têtes de réponse (proche du délai avant le premier fragment)
+                    gemini.record('streamGenerateContent', (time.perf_counter() - started) * 1000,
+                                  response.status_code == 200)
+                    if response.status_code == 429:
+                        if attempt < max_retries - 1:
+                            await asyncio.sleep(2 * (attempt + 1))
+                            continue
+                        yield RATE_LIMIT_MESSAGE, 'ERROR'
+                        return
+                    if response.status_code != 200:
+                        body = (await response.aread()).decode('utf-8', errors='replace')
+                        logger.warning("Gemini API Error: %s - %s", response.status_code, body)
+                        yield f"Erreur API ({response.status_code}): {body}", 'ERROR'
+                        return
+
+                    async for line in response.aiter_lines():
+                        if not line.startswith('data:'):
+                            continue
+                        try:
+                            chunk = json.loads(line[5:])
+                        except ValueError:
+                            continue
+                        candidates = chunk.get('candidates') or []
+                        if not candidates:
+                            continue
+                        candidate = candidates[0]
+                        parts = candidate.get('content', {}).get('parts', [])
+                        yield ''.join(part.get('text', '') for part in parts), candidate.get('finishReason')
+                    return
+        except Exception as e:
+            logger.exception("Gemini stream exception")
+            yield f"Désolé, je rencontre une difficulté technique pour répondre : {str(e)}", 'ERROR'
+
+    @staticmethod
+    def generate_daily_rhema(for_date=None):
+        """
+        Génère un Rhema du jour complet (Titre, Verset, Contenu, Méditation)
+        en français et en anglais, dans un seul appel :
+        {"fr": {...}, "en": {...}}
+        """
+        day = f"le {for_date.strftime('%d/%m/%Y')}" if for_date else "aujourd'hui"
+        variant = (
             "{"
             "  \"title\": \"Titre inspirant\", "
             "  \"verse\": \"Référence Biblique (ex: Jean 3:16)\", "
             "  \"content\": \"La Parole de Dieu ou le verset complet\", "
             "  \"meditation\": \"Une courte méditation ou encouragement pastoral (2-3 phrases)\""
             "}"
+        )
+        prompt = (
+            f"Tu es un pasteur inspiré. Génère le 'Rhema du Jour' pour {day}. "
+            "Réponds UNIQUEMENT avec un objet JSON au format suivant : "
+            f"{{\"fr\": {variant}, \"en\": {variant}}} "
+            "La clé \"fr\" contient le Rhema en français, la clé \"en\" le même Rhema en anglais "
+            "(verset cité dans une traduction anglaise, référence en anglais, ex: John 3:16). "
             "Le contenu doit être profond, encourageant et spirituel."
         )
 
@@ -108,25 +203,93 @@ class BiblicalAIService:
             if not settings.GEMINI_API_KEY:
                 return None
 
-            url = f"https://generativelanguage.googleapis.com/v1beta/models/gemini-flash-latest:generateContent?key={settings.GEMINI_API_KEY}"
-            
             payload = {
                 "contents": [{"parts": [{"text": prompt}]}],
                 "generationConfig": {
                     "temperature": 0.8,
-                    "maxOutputTokens": 1024,
+                    "maxOutputTokens": 2048,
                     "responseMimeType": "application/json"
                 }
             }
-            
-            response = requests.post(url, json=payload, timeout=30)
+
+            response = gemini.post('generateContent', payload)
             if response.status_code == 200:
                 data = response.json()
                 if 'candidates' in data and len(data['candidates']) > 0:
-                    import json
                     text = data['candidates'][0]['content']['parts'][0]['text']
                     return json.loads(text)
             return None
         except Exception as e:
-            print(f"Error generating AI Rhema: {e}")
+            logger.warning("Error generating AI Rhema: %s", e)
             return None
+
+
+class ConsultationJobService:
+    """
+    Consultations traitées en arrière-plan.
+
+    AskAIView crée la consultation en attente (PENDING) et répond aussitôt ;
+    le pool de cyprus_api/tasks.py appelle l'IA. Un quota atteint replanifie
+    la consultation après une attente exponentielle (minuterie, aucun thread
+    endormi) ; le client suit l'avancement par
+    GET /api/ai/consultations/<public_id>/.
+    """
+
+    @staticmethod
+    def submit(consultation):
+        run_in_background(ConsultationJobService.process, consultation.pk)
+
+    @staticmethod
+    def get_retry_delay(attempts):
+        return min(settings.AI_JOB_RETRY_DELAY * 2 ** (attempts - 1), settings.AI_JOB_MAX_RETRY_DELAY)
+
+    @staticmethod
+    def process(pk):
+        """Traite une consultation en attente ; retourne la consultation, ou None si elle est déjà prise"""
+        Status = AIConsultation.Status
+        now = timezone.now()
+        claimed = AIConsultation.objects.filter(pk=pk, status=Status.PENDING).update(
+            status=Status.RUNNING, started_at=now, next_attempt_at=None, attempts=F('attempts') + 1,
+        )
+        if not claimed:
+            return None
+        consultation = AIConsultation.objects.get(pk=pk)
+
+        try:
+            answer, complete = BiblicalAIService.request_answer(consultation.question, consultation.language)
+        except AIRateLimitError:
+            if consultation.attempts < settings.AI_JOB_MAX_ATTEMPTS:
+                delay = ConsultationJobService.get_retry_delay(consultation.attempts)
+                AIConsultation.objects.filter(pk=pk).update(
+                    status=Status.PENDING, next_attempt_at=now + timedelta(seconds=delay),
+                )
+                run_later(delay, ConsultationJobService.process, pk)
+                return consultation
+            answer, complete = RATE_LIMIT_MESSAGE, False
+
+        consultation.answer = answer
+        consultation.reusable = complete
+        consultation.status = Status.DONE if complete else Status.FAILED
+        consultation.save(update_fields=['answer', 'reusable', 'status'])
+        if complete:
+            answer_cache.store_answer(consultation.question, consultation.language, answer)
+        return consultation
+
+    @staticmethod
+    def resume_if_stale(consultation):
+        """Relance une consultation perdue (processus redémarré pendant l'attente ou l'appel)"""
+        Status = AIConsultation.Status
+        now = timezone.now()
+        stale = now - timedelta(seconds=settings.AI_JOB_STALE_AFTER)
+        waiting = Q(status=Status.PENDING) & (
+            Q(next_attempt_at__lt=stale) | Q(next_attempt_at__isnull=True, created_at__lt=stale)
+        )
+        running = Q(status=Status.RUNNING, started_at__lt=stale)
+        # next_attempt_at = maintenant : pas de nouvelle relance avant AI_JOB_STALE_AFTER
+        resumed = AIConsultation.objects.filter(waiting | running, pk=consultation.pk).update(
+            status=Status.PENDING, next_attempt_at=now,
+        )
+        if resumed:
+            logger.warning("Consultation IA %s relancée", consultation.pk)
+            ConsultationJobService.submit(consultation)
+        return bool(resumed)
@@ -0,0 +1,33 @@
+import logging
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from .models import AIAnswerCache, AIConsultation, AIQuestionIndex
+from . import similarity
+
+logger = logging.getLogger(__name__)
+
+
+@receiver(post_save, sender=AIConsultation)
+def index_reusable_consultation(sender, instance, raw=False, update_fields=None, **kwargs):
+    """Réponse complète de l'IA : ajoutée à l'index des questions proches après le commit"""
+    if update_fields is not None and 'reusable' not in update_fields:
+        return
+    if raw or not instance.reusable or not settings.AI_SIMILAR_QUESTIONS_ENABLED:
+        return
+
+    def index():
+        try:
+            similarity.index_consultation(instance)
+        except Exception:
+            logger.exception("Indexation de la consultation %s impossible", instance.pk)
+
+    transaction.on_commit(index)
+
+
+@receiver(post_delete, sender=AIAnswerCache)
+def drop_similar_entries(sender, instance, **kwargs):
+    """Réponse expirée, évincée ou supprimée par un administrateur : plus servie aux questions proches non plus"""
+    AIQuestionIndex.objects.filter(cache_key=instance.key).delete()
@@ -0,0 +1,170 @@
+"""
+Questions proches pour l'assistant biblique (MinHash / LSH, sans service externe).
+
+Le cache exact (cache.py) ne reconnaît pas « Comment pardonner à mon frère ? »
+quand « Comment puis-je pardonner à mon frère » a déjà reçu une réponse.
+Chaque question ayant reçu une réponse complète de l'IA est réduite à un
+ensemble de termes (normalisation du cache, mots vides retirés, pluriels
+simples ramenés au singulier), puis à une signature MinHash de NUM_PERM
+valeurs découpée en BANDS bandes. Chaque bande donne un seau (AIQuestionBucket,
+indexé) : une recherche est une seule requête sur BANDS seaux, suivie du
+calcul exact de la similarité de Jaccard sur les quelques candidats. Le coût
+ne dépend donc pas du nombre de questions indexées.
+
+L'index est alimenté au fil de l'eau (signal post_save des consultations
+réutilisables) ; une question déjà couverte par une question proche n'est
+pas réindexée, ce qui garde les seaux courts. Une entrée expire comme la
+réponse du cache exact (AI_ANSWER_CACHE_TTL) et disparaît avec elle
+(éviction, suppression par un administrateur pour forcer une nouvelle réponse). La commande
+`rebuild_question_index` le reconstruit depuis l'historique.
+"""
+import hashlib
+import logging
+import random
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .cache import get_key, normalize_question
+from .models import AIConsultation, AIQuestionBucket, AIQuestionIndex
+
+logger = logging.getLogger(__name__)
+
+NUM_PERM = 32
+BANDS = 8
+ROWS = NUM_PERM // BANDS
+# Au-delà, les candidats restants sont ignorés (seaux anormalement peuplés)
+MAX_CANDIDATES = 200
+
+_PRIME = (1 << 61) - 1
+# Graine fixe : les signatures sont stockées en base et doivent être identiques d'un processus à l'autre
+_rng = random.Random(20575)
+_PERMUTATIONS = [(_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME)) for _ in range(NUM_PERM)]
+
+# Ni mots interrogatifs (qui, que, où...) ni négations (ne, pas...) : « Qui est Dieu ? » et
+# « Où est Dieu ? », « Dois-je pardonner ? » et « Ne dois-je pas pardonner ? » restent distincts
+STOP_WORDS = {
+    # Français
+    'a', 'au', 'aux', 'avec', 'ce', 'ces', 'cette', 'd', 'dans', 'de', 'des', 'du', 'elle', 'en', 'est',
+    'et', 'etre', 'il', 'ils', 'j', 'je', 'l', 'la', 'le', 'les', 'leur', 'lui', 'm', 'ma', 'me', 'mes',
+    'moi', 'mon', 'nos', 'notre', 'nous', 'on', 'par', 'peut', 'peux', 'pour',
+    'puis', 's', 'sa', 'se', 'ses', 'son', 'sur', 't', 'ta', 'te', 'tes', 'ton', 'tu',
+    'un', 'une', 'vos', 'votre', 'vous', 'y', 'dit', 'bible', 'dois', 'doit', 'faut', 'faire',
+    # Anglais
+    'an', 'and', 'are', 'as', 'be', 'can', 'do', 'does', 'for', 'i', 'in', 'is', 'it', 'me', 'my', 'of',
+    'on', 'say', 'says', 'should', 'that', 'the', 'this', 'to', 'we', 'with', 'you', 'your',
+}
+
+
+def get_tokens(question):
+    """Ensemble des termes significatifs d'une question"""
+    tokens = set()
+    for word in normalize_question(question).split():
+        if word in STOP_WORDS:
+            continue
+        if len(word) > 3 and word[-1] in 'sx':
+            word = word[:-1]
+        tokens.add(word)
+    return tokens
+
+
+def _hash_token(token):
+    return int.from_bytes(hashlib.blake2b(token.encode('utf-8'), digest_size=8).digest(), 'big')
+
+
+def get_signature(tokens):
+    hashes = [_hash_token(token) for token in tokens]
+    return [min((a * value + b) % _PRIME for value in hashes) for a, b in _PERMUTATIONS]
+
+
+def get_buckets(tokens, language):
+    """Un seau par bande, propre à la langue ; entier signé 64 bits (BigIntegerField)"""
+    signature = get_signature(tokens)
+    buckets = []
+    for band in range(BANDS):
+        values = signature[band * ROWS:(band + 1) * ROWS]
+        raw = f"{language}:{band}:" + ','.join(map(str, values))
+        digest = hashlib.blake2b(raw.encode('utf-8'), digest_size=8).digest()
+        buckets.append(int.from_bytes(digest, 'big', signed=True))
+    return buckets
+
+
+def jaccard(first, second):
+    if not first or not second:
+        return 0.0
+    return len(first & second) / len(first | second)
+
+
+def find_similar(tokens, language, threshold=None):
+    """
+    (consultation_id, score) de la question indexée encore valide la plus proche
+    au-dessus du seuil, ou None. Une question trop courte (moins de
+    AI_SIMILAR_QUESTION_MIN_TOKENS termes) n'est jamais rapprochée d'une autre.
+    """
+    if len(tokens) < settings.AI_SIMILAR_QUESTION_MIN_TOKENS:
+        return None
+    threshold = settings.AI_SIMILAR_QUESTION_THRESHOLD if threshold is None else threshold
+    candidates = (
+        AIQuestionIndex.objects
+        .filter(language=language, expires_at__gt=timezone.now(),
+                buckets__bucket__in=get_buckets(tokens, language))
+        .values_list('consultation_id', 'tokens')
+        .distinct()[:MAX_CANDIDATES]
+    )
+    best = None
+    for consultation_id, stored in candidates:
+        score = jaccard(tokens, set(stored.split()))
+        if score >= threshold and (best is None or score > best[1]):
+            best = (consultation_id, score)
+    return best
+
+
+def get_answer(question, language):
+    """Réponse d'une question proche déjà traitée par l'IA, ou None"""
+    if not settings.AI_SIMILAR_QUESTIONS_ENABLED:
+        return None
+    match = find_similar(get_tokens(question), language)
+    if match is None:
+        return None
+    consultation_id, score = match
+    answer = AIConsultation.objects.filter(pk=consultation_id).values_list('answer', flat=True).first()
+    if answer is not None:
+        logger.debug("Question proche (%.2f) servie depuis la consultation %s", score, consultation_id)
+    return answer
+
+
+def index_consultation(consultation):
+    """Ajoute une consultation réutilisable à l'index ; retourne l'entrée, ou None si déjà couverte"""
+    tokens = get_tokens(consultation.question)
+    if len(tokens) < settings.AI_SIMILAR_QUESTION_MIN_TOKENS:
+        return None
+    if find_similar(tokens, consultation.language) is not None:
+        return None
+    # Même durée de vie que l'entrée du cache exact, supprimée avec elle (signals.py)
+    defaults = {
+        'language': consultation.language,
+        'tokens': ' '.join(sorted(tokens)),
+        'cache_key': get_key(normalize_question(consultation.question), consultation.language),
+        'expires_at': consultation.created_at + timedelta(seconds=settings.AI_ANSWER_CACHE_TTL),
+    }
+    with transaction.atomic():
+        entry, created = AIQuestionIndex.objects.get_or_create(consultation=consultation, defaults=defaults)
+        if created:
+            AIQuestionBucket.objects.bulk_create(
+                AIQuestionBucket(entry=entry, bucket=bucket)
+                for bucket in get_buckets(tokens, consultation.language)
+            )
+    return entry
+
+
+def rebuild_index():
+    """Reconstruit l'index depuis l'historique (les plus récentes réponses d'abord)"""
+    AIQuestionIndex.objects.all().delete()
+    indexed = 0
+    queryset = AIConsultation.objects.filter(reusable=True).order_by('-created_at')
+    for consultation in queryset.only('id', 'question', 'language', 'created_at').iterator(chunk_size=1000):
+        if index_consultation(consultation) is not None:
+            indexed += 1
+    return indexed
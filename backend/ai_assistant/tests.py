@@ -0,0 +1,249 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from cyprus_api.tasks import run_later
+from .cache import normalize_question
+from .client import gemini
+from .models import AIAnswerCache, AIConsultation, AIQuestionIndex
+from .services import AIRateLimitError, BiblicalAIService
+from .similarity import get_tokens
+
+User = get_user_model()
+
+
+@override_settings(BACKGROUND_TASKS_EAGER=True)
+class AnswerCacheTests(APITestCase):
+    def ask(self, question, language='fr'):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post('/api/ai/ask/', {'question': question, 'language': language}, format='json')
+
+    def test_normalization(self):
+        self.assertEqual(
+            normalize_question("  Que dit la BIBLE sur le Pardon ?! "),
+            normalize_question("que dit la bible sur le pardon"),
+        )
+        self.assertEqual(normalize_question('Éternel, où es-tu ?'), 'eternel ou es tu')
+
+    @mock.patch('ai_assistant.services.BiblicalAIService.request_answer', return_value=('Pardonnez.', True))
+    def test_repeated_question_is_served_from_cache(self, generate):
+        self.ask('Que dit la Bible sur le pardon ?')
+        response = self.ask('que dit la bible sur le PARDON')
+        self.assertEqual(response.data['answer'], 'Pardonnez.')
+        self.assertTrue(response.data['cache_hit'])
+        generate.assert_called_once()
+
+        # Autre langue : autre entrée
+        self.ask('Que dit la Bible sur le pardon ?', language='en')
+        self.assertEqual(generate.call_count, 2)
+
+        # L'historique reste complet
+        self.assertEqual(AIConsultation.objects.count(), 3)
+        self.assertEqual(AIAnswerCache.objects.get(language='fr').hits, 1)
+
+    @mock.patch('ai_assistant.services.BiblicalAIService.request_answer', return_value=('Surchargé', False))
+    def test_failed_answers_are_not_cached(self, generate):
+        self.ask('La foi ?')
+        self.ask('La foi ?')
+        self.assertEqual(generate.call_count, 2)
+        self.assertFalse(AIAnswerCache.objects.exists())
+
+    @override_settings(AI_ANSWER_CACHE_MAX_ENTRIES=2)
+    @mock.patch('ai_assistant.services.BiblicalAIService.request_answer', return_value=('Réponse', True))
+    def test_least_recently_used_entries_are_evicted(self, generate):
+        self.ask('Question un')
+        self.ask('Question deux')
+        self.ask('Question un')  # utilisée : devient la plus récente
+        self.ask('Question trois')
+        self.assertEqual(
+            set(AIAnswerCache.objects.values_list('normalized_question', flat=True)),
+            {'question un', 'question trois'},
+        )
+
+        admin = User.objects.create_user(
+            username='admin', email='admin@example.com', password='testpassword123', role='ADMIN'
+        )
+        self.client.force_authenticate(admin)
+        stats = self.client.get('/api/ai/cache/stats/').data
+        self.assertEqual((stats['requests'], stats['hits'], stats['misses']), (4, 1, 3))
+
+
+@override_settings(BACKGROUND_TASKS_EAGER=True)
+class SimilarQuestionTests(APITestCase):
+    def ask(self, question, language='fr'):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post('/api/ai/ask/', {'question': question, 'language': language}, format='json')
+
+    def test_tokens_ignore_stop_words_and_plurals(self):
+        self.assertEqual(
+            get_tokens('Comment puis-je pardonner à mes ennemis ?'),
+            get_tokens('Comment pardonner à son ennemi'),
+        )
+
+    def test_question_words_and_negations_are_kept(self):
+        self.assertNotEqual(get_tokens('Qui est Dieu ?'), get_tokens('Où est Dieu ?'))
+        self.assertNotEqual(get_tokens('Dois-je pardonner ?'), get_tokens('Ne dois-je pas pardonner ?'))
+
+    @mock.patch('ai_assistant.services.BiblicalAIService.request_answer', return_value=('Réponse', True))
+    def test_short_and_expired_questions_are_not_matched(self, generate):
+        # Un seul terme significatif : jamais rapproché d'une autre question
+        self.ask('Le pardon ?')
+        self.ask('Les pardons ?')
+        self.assertEqual(generate.call_count, 2)
+
+        self.ask('Comment puis-je pardonner à mon frère ?')
+        # L'administrateur supprime la réponse en cache pour forcer une nouvelle réponse
+        AIAnswerCache.objects.filter(normalized_question__contains='frere').delete()
+        self.assertFalse(AIQuestionIndex.objects.exists())
+        self.ask('Comment pardonner à son frère')
+        self.assertEqual(generate.call_count, 4)
+
+    @mock.patch('ai_assistant.services.BiblicalAIService.request_answer', return_value=('Pardonnez.', True))
+    def test_near_duplicate_is_served_from_index(self, generate):
+        self.ask('Comment puis-je pardonner à mon frère ?')
+        self.assertEqual(AIQuestionIndex.objects.count(), 1)
+
+        response = self.ask('Comment pardonner à son frère')
+        self.assertEqual(response.data['answer'], 'Pardonnez.')
+        self.assertTrue(response.data['cache_hit'])
+        generate.assert_called_once()
+        # Réponse réutilisée : ni réindexée ni marquée réutilisable
+        self.assertEqual(AIQuestionIndex.objects.count(), 1)
+
+        # Sous le seuil, ou dans une autre langue : nouvel appel à l'IA
+        self.ask('Comment pardonner à ma sœur ?')
+        self.ask('How to forgive my brother?', language='en')
+        self.assertEqual(generate.call_count, 3)
+        self.assertEqual(AIQuestionIndex.objects.count(), 3)
+
+
+@override_settings(BACKGROUND_TASKS_EAGER=True)
+class ConsultationJobTests(APITestCase):
+    @mock.patch('ai_assistant.services.BiblicalAIService.request_answer',
+                side_effect=[AIRateLimitError(), AIRateLimitError(), ('Aimez-vous.', True)])
+    def test_rate_limited_consultation_is_retried_in_background(self, request_answer):
+        with self.captureOnCommitCallbacks() as callbacks:
+            response = self.client.post('/api/ai/ask/', {'question': "L'amour ?"}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data['status'], AIConsultation.Status.PENDING)
+
+        # Traitement (nouveaux essais immédiats en mode EAGER)
+        with mock.patch('ai_assistant.services.run_later', wraps=run_later) as later:
+            with self.captureOnCommitCallbacks(execute=True):
+                for callback in callbacks:
+                    callback()
+        self.assertEqual([call.args[0] for call in later.call_args_list], [2, 4])
+
+        poll = self.client.get(f"/api/ai/consultations/{response.data['public_id']}/")
+        self.assertEqual(poll.data['status'], AIConsultation.Status.DONE)
+        self.assertEqual(poll.data['answer'], 'Aimez-vous.')
+        self.assertEqual(AIConsultation.objects.get().attempts, 3)
+
+    @override_settings(AI_JOB_MAX_ATTEMPTS=2)
+    @mock.patch('ai_assistant.services.BiblicalAIService.request_answer', side_effect=AIRateLimitError())
+    def test_gives_up_after_max_attempts(self, request_answer):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post('/api/ai/ask/', {'question': "L'amour ?"}, format='json')
+        consultation = AIConsultation.objects.get()
+        self.assertEqual((consultation.status, consultation.attempts), (AIConsultation.Status.FAILED, 2))
+        self.assertFalse(AIAnswerCache.objects.exists())
+
+
+class StreamingAnswerTests(TestCase):
+    async def fake_stream(self, question, language='fr'):
+        for text, finish_reason in (('Pardonnez ', None), ('comme Christ.', 'STOP')):
+            yield text, finish_reason
+
+    async def test_tokens_are_relayed_and_answer_persisted(self):
+        with mock.patch('ai_assistant.views.BiblicalAIService.stream_answer', self.fake_stream):
+            response = await self.async_client.post(
+                '/api/ai/ask/stream/', {'question': 'Le pardon ?'}, content_type='application/json'
+            )
+            self.assertEqual(response['Content-Type'], 'text/event-stream')
+            body = b''.join([chunk async for chunk in response.streaming_content]).decode()
+
+        self.assertEqual(body.count('event: token'), 2)
+        self.assertIn('"complete": true', body)
+        consultation = await AIConsultation.objects.aget()
+        self.assertEqual(consultation.answer, 'Pardonnez comme Christ.')
+        self.assertTrue(consultation.reusable)
+        self.assertFalse(consultation.cache_hit)
+
+    async def test_missing_question(self):
+        response = await self.async_client.post('/api/ai/ask/stream/', {}, content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+
+
+class StubGeminiHandler(BaseHTTPRequestHandler):
+    """Faux Gemini local : réponses préparées dans server.responses, requêtes notées dans server.received"""
+    protocol_version = 'HTTP/1.1'  # keep-alive
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers['Content-Length']))
+        self.server.received.append((self.path, self.headers.get('x-goog-api-key'), self.client_address))
+        status_code, body = self.server.responses.pop(0)
+        data = json.dumps(body).encode()
+        self.send_response(status_code)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+class GeminiClientTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), StubGeminiHandler)
+        cls.server.daemon_threads = True
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def setUp(self):
+        self.server.responses = []
+        self.server.received = []
+        gemini.reset()
+        self.addCleanup(gemini.reset)
+        overrides = override_settings(
+            GEMINI_API_KEY='test-key',
+            GEMINI_API_URL=f"http://127.0.0.1:{self.server.server_port}/v1beta/models/stub",
+        )
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+
+    def answer(self, text):
+        return 200, {'candidates': [{'content': {'parts': [{'text': text}]}, 'finishReason': 'STOP'}]}
+
+    def test_connection_is_reused_and_calls_are_measured(self):
+        self.server.responses = [self.answer('Un.'), self.answer('Deux.')]
+        self.assertEqual(BiblicalAIService.request_answer('Q1'), ('Un.', True))
+        self.assertEqual(BiblicalAIService.request_answer('Q2'), ('Deux.', True))
+
+        paths, keys, clients = zip(*self.server.received)
+        self.assertEqual(set(paths), {'/v1beta/models/stub:generateContent'})
+        self.assertEqual(set(keys), {'test-key'})
+        # Même port client : une seule connexion TCP pour les deux appels
+        self.assertEqual(len(set(clients)), 1)
+
+        metrics = gemini.get_metrics()['generateContent']
+        self.assertEqual((metrics['calls'], metrics['errors']), (2, 0))
+
+    def test_rate_limit_is_raised_to_the_caller(self):
+        self.server.responses = [(429, {'error': {'code': 429}})]
+        with self.assertRaises(AIRateLimitError):
+            BiblicalAIService.request_answer('Q')
+        self.assertEqual(gemini.get_metrics()['generateContent']['errors'], 1)
@@ -1,6 +1,9 @@
 from django.urls import path
-from .views import AskAIView
+from .views import AICacheStatsView, AIConsultationDetailView, AskAIView, ask_ai_stream
 
 urlpatterns = [
     path('ask/', AskAIView.as_view(), name='ai_ask'),
+    path('ask/stream/', ask_ai_stream, name='ai_ask_stream'),
+    path('consultations/<uuid:public_id>/', AIConsultationDetailView.as_view(), name='ai_consultation_detail'),
+    path('cache/stats/', AICacheStatsView.as_view(), name='ai_cache_stats'),
 ]
@@ -1,7 +1,21 @@
-from rest_framework import views, status, permissions
+import json
+
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse, StreamingHttpResponse
+from rest_framework import generics, views, status, permissions
+from rest_framework.exceptions import AuthenticationFailed
 from rest_framework.response import Response
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from .client import gemini
+from .models import AIConsultation
 from .serializers import AIConsultationSerializer
-from .services import BiblicalAIService
+from .services import BiblicalAIService, ConsultationJobService
+from . import cache as answer_cache
+from . import similarity
+from users.permissions import IsAdmin
+
+SUPPORTED_LANGUAGES = ('fr', 'en')
+
 
 class AskAIView(views.APIView):
     permission_classes = [permissions.AllowAny] # Open for all as requested
@@ -11,13 +25,128 @@ class AskAIView(views.APIView):
         if serializer.is_valid():
             question = serializer.validated_data.get('question')
             language = request.data.get('language', 'fr') # Default to French
-            
-            # Call the AI service
-            answer = BiblicalAIService.ask_bible(question, language)
-            
-            # Save the consultation to history
+            if language not in SUPPORTED_LANGUAGES:
+                language = 'fr'
+
+            # Question déjà posée (à la casse, aux accents et à la ponctuation près) : pas d'appel IA
+            answer = answer_cache.get_answer(question, language)
+            # Sinon, question proche déjà traitée (« comment puis-je pardonner » / « comment pardonner »)
+            if answer is None:
+                answer = similarity.get_answer(question, language)
             user = request.user if request.user.is_authenticated else None
-            serializer.save(user=user, answer=answer)
-            
-            return Response(serializer.data, status=status.HTTP_200_OK)
+            if answer is not None:
+                # Save the consultation to history (cached answers included)
+                serializer.save(user=user, answer=answer, cache_hit=True, language=language)
+                return Response(serializer.data, status=status.HTTP_200_OK)
+
+            # Appel à l'IA en arrière-plan : le client suit la consultation (GET consultations/<public_id>/)
+            consultation = serializer.save(user=user, language=language, status=AIConsultation.Status.PENDING)
+            ConsultationJobService.submit(consultation)
+            return Response(serializer.data, status=status.HTTP_202_ACCEPTED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+class AIConsultationDetailView(generics.RetrieveAPIView):
+    """Suivi d'une consultation (statut puis réponse) par son identifiant public"""
+    permission_classes = [permissions.AllowAny]
+    serializer_class = AIConsultationSerializer
+    queryset = AIConsultation.objects.all()
+    lookup_field = 'public_id'
+
+    def get_object(self):
+        consultation = super().get_object()
+        if consultation.status in (AIConsultation.Status.PENDING, AIConsultation.Status.RUNNING):
+            ConsultationJobService.resume_if_stale(consultation)
+        return consultation
+
+
+def sse_event(event, data):
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+def get_stream_user(request):
+    """Membre du jeton JWT (comme AskAIView), None pour un visiteur"""
+    result = JWTAuthentication().authenticate(request)
+    return result[0] if result else None
+
+
+async def ask_ai_stream(request):
+    """
+    Variante en flux de AskAIView (Server-Sent Events, servie par ASGI).
+
+    Les fragments de la réponse sont relayés au navigateur dès leur génération
+    (événements `token` {"text": ...}) ; la consultation est enregistrée à la
+    fin, puis l'événement `done` {"id", "cache_hit", "complete"} clôt le flux.
+    Pendant l'appel à l'IA, aucun worker n'est bloqué.
+    """
+    if request.method != 'POST':
+        return JsonResponse({'detail': 'Méthode non autorisée.'}, status=405)
+    try:
+        data = json.loads(request.body or b'{}')
+    except ValueError:
+        return JsonResponse({'detail': 'JSON invalide.'}, status=400)
+    question = data.get('question') if isinstance(data, dict) else None
+    if not isinstance(question, str) or not question.strip():
+        return JsonResponse({'question': ['Ce champ est obligatoire.']}, status=400)
+    language = data.get('language', 'fr')
+    if language not in SUPPORTED_LANGUAGES:
+        language = 'fr'
+    try:
+        user = await sync_to_async(get_stream_user)(request)
+    except AuthenticationFailed as e:
+        return JsonResponse({'detail': str(e.detail)}, status=401)
+
+    async def events():
+        answer = await sync_to_async(answer_cache.get_answer)(question, language)
+        if answer is None:
+            answer = await sync_to_async(similarity.get_answer)(question, language)
+        cache_hit = answer is not None
+        complete = False
+        if cache_hit:
+            yield sse_event('token', {'text': answer})
+        else:
+            parts = []
+            finish_reason = None
+            async for text, finish_reason in BiblicalAIService.stream_answer(question, language):
+                if text:
+                    parts.append(text)
+                    yield sse_event('token', {'text': text})
+            complete = finish_reason == 'STOP' and bool(parts)
+            # Mêmes messages que la réponse non diffusée (generate_answer)
+            note = None
+            if not parts:
+                note = "Désolé, la réponse de l'IA est vide ou illisible."
+            elif finish_reason not in ('STOP', 'ERROR'):
+                note = f"\n\n[Note: La réponse a été interrompue ({finish_reason})]"
+            if note:
+                parts.append(note)
+                yield sse_event('token', {'text': note})
+            answer = ''.join(parts)
+            if complete:
+                await sync_to_async(answer_cache.store_answer)(question, language, answer)
+
+        consultation = await AIConsultation.objects.acreate(
+            user=user, question=question, answer=answer, language=language,
+            cache_hit=cache_hit, reusable=complete,
+            status=AIConsultation.Status.DONE if cache_hit or complete else AIConsultation.Status.FAILED,
+        )
+        yield sse_event('done', {'id': consultation.pk, 'cache_hit': cache_hit, 'complete': complete})
+
+    response = StreamingHttpResponse(events(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    # Pas de mise en tampon par un proxy nginx
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+# Authentification par jeton (comme les vues DRF) ; csrf_exempt ne gère pas les vues asynchrones en Django 4.2
+ask_ai_stream.csrf_exempt = True
+
+
+class AICacheStatsView(views.APIView):
+    """Statistiques du cache des réponses et latences de l'API Gemini (administrateurs)"""
+    permission_classes = [IsAdmin]
+
+    def get(self, request):
+        # Latences des appels à Gemini : mesurées par processus
+        return Response({**answer_cache.get_stats(), 'gemini': gemini.get_metrics()})
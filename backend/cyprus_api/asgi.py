@@ -12,5 +12,7 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'cyprus_api.settings')
+# Lu par les réglages : pas de connexions persistantes à la base sous ASGI
+os.environ['DJANGO_ASGI'] = '1'
 
 application = get_asgi_application()
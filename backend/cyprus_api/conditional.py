@@ -0,0 +1,92 @@
+"""
+GET conditionnel (ETag / Last-Modified) pour Cyprus For Christ API.
+
+Les validateurs sont calculés par une requête d'agrégat légère ; si le client
+possède déjà la version courante, la vue répond 304 sans exécuter la requête
+principale ni le serializer.
+"""
+import hashlib
+
+from django.conf import settings
+from django.http import HttpResponseNotModified
+from django.utils.cache import patch_vary_headers
+from django.utils.http import http_date, parse_http_date_safe
+
+
+def etag_matches(header, etag):
+    if not header:
+        return False
+    if header.strip() == '*':
+        return True
+    # Comparaison faible : un proxy peut avoir préfixé l'ETag par W/
+    tags = [tag.strip() for tag in header.split(',')]
+    return etag in tags or f'W/{etag}' in tags
+
+
+def is_not_modified(request, etag, last_modified):
+    if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+    if if_none_match:
+        # If-None-Match prime sur If-Modified-Since (RFC 9110 §13.1.3)
+        return etag_matches(if_none_match, etag)
+    if last_modified is None:
+        return False
+    since = parse_http_date_safe(request.META.get('HTTP_IF_MODIFIED_SINCE', ''))
+    return since is not None and last_modified <= since
+
+
+def make_etag(*parts):
+    """ETag fort à partir des éléments qui déterminent la représentation"""
+    digest = hashlib.sha256('|'.join(str(part) for part in parts).encode('utf-8'))
+    return f'"{digest.hexdigest()[:32]}"'
+
+
+class ConditionalGetMixin:
+    """
+    Mixin de ViewSet : list et retrieve répondent 304 quand les validateurs
+    correspondent. Les vues fournissent `get_list_validators()` et
+    `get_detail_validators()`, qui retournent (etag, last_modified) ou None
+    (None = pas de réponse conditionnelle, la vue suit son cours normal).
+    last_modified peut être None : ne le fournir que si la date couvre tout
+    ce qui entre dans l'ETag, sinon If-Modified-Since validerait une
+    réponse périmée.
+    """
+    conditional_actions = ('list', 'retrieve')
+
+    def get_cache_control(self):
+        return settings.API_CACHE_CONTROL
+
+    def get_list_validators(self):
+        return None
+
+    def get_detail_validators(self):
+        return None
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional(request, self.get_list_validators, super().list, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional(request, self.get_detail_validators, super().retrieve, *args, **kwargs)
+
+    def conditional(self, request, get_validators, handler, *args, **kwargs):
+        if self.action not in self.conditional_actions or request.method not in ('GET', 'HEAD'):
+            return handler(request, *args, **kwargs)
+
+        validators = get_validators()
+        if validators is None:
+            return handler(request, *args, **kwargs)
+
+        etag, last_modified = validators
+        if is_not_modified(request, etag, last_modified):
+            response = HttpResponseNotModified()
+        else:
+            response = handler(request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+        response['ETag'] = etag
+        if last_modified is not None:
+            response['Last-Modified'] = http_date(last_modified)
+        response['Cache-Control'] = self.get_cache_control()
+        # Réponse publique en cache partagé (s-maxage) : un jeton invalide ou un rôle
+        # différent peut changer la réponse, le cache doit la distinguer par jeton
+        patch_vary_headers(response, ('Authorization',))
+        return response
@@ -107,18 +107,24 @@ print(f"DEBUG: MYSQL_URL present: {'MYSQL_URL' in os.environ}")
 
 DATABASES = {}
 
+# Sous ASGI (cyprus_api/asgi.py), Django 4.2 exécute chaque vue synchrone dans
+# un thread propre à la requête : une connexion persistante y serait ouverte
+# puis jamais réutilisée ni fermée (ticket Django #33497) et épuiserait
+# max_connections. Connexions persistantes seulement sous WSGI.
+DB_CONN_MAX_AGE = 0 if os.environ.get('DJANGO_ASGI') == '1' else 600
+
 if os.environ.get('DATABASE_URL'):
     print("DEBUG: Configuration Method -> DATABASE_URL")
     DATABASES['default'] = dj_database_url.config(
         default=os.environ.get('DATABASE_URL'),
-        conn_max_age=600,
+        conn_max_age=DB_CONN_MAX_AGE,
         conn_health_checks=True,
     )
 elif os.environ.get('MYSQL_URL'):
     print("DEBUG: Configuration Method -> MYSQL_URL")
     DATABASES['default'] = dj_database_url.config(
         default=os.environ.get('MYSQL_URL'),
-        conn_max_age=600,
+        conn_max_age=DB_CONN_MAX_AGE,
         conn_health_checks=True,
     )
 elif os.environ.get('MYSQLHOST'):
@@ -255,6 +261,12 @@ OPENAI_MODEL = config('OPENAI_MODEL', default='gpt-3.5-turbo')
 # Google Gemini (Active) - Using REST API
 GEMINI_API_KEY = config('GEMINI_API_KEY', default='')
 GEMINI_MODEL = config('GEMINI_MODEL', default='models/text-bison-001')
+# Point d'accès du modèle utilisé par l'assistant et les Rhemas (méthode ajoutée : `:generateContent`)
+GEMINI_API_URL = config('GEMINI_API_URL', default='https://generativelanguage.googleapis.com/v1beta/models/gemini-flash-latest')
+# Client partagé (ai_assistant/client.py) : connexions gardées ouvertes par processus, délais en secondes
+GEMINI_POOL_MAXSIZE = config('GEMINI_POOL_MAXSIZE', default=10, cast=int)
+GEMINI_CONNECT_TIMEOUT = config('GEMINI_CONNECT_TIMEOUT', default=5, cast=float)
+GEMINI_READ_TIMEOUT = config('GEMINI_READ_TIMEOUT', default=30, cast=float)
 
 # PayPal Configuration
 PAYPAL_MODE = config('PAYPAL_MODE', default='sandbox')
@@ -296,6 +308,85 @@ ALLOWED_IMAGE_EXTENSIONS = config(
     'ALLOWED_IMAGE_EXTENSIONS',
     default='jpg,jpeg,png,webp'
 ).split(',')
+# Réécriture des PDF de sermons après upload (flux compressés, objets orphelins retirés)
+SERMON_PDF_OPTIMIZATION = config('SERMON_PDF_OPTIMIZATION', default=False, cast=bool)
+# Pages de PDF découpées à la demande (/api/sermons/{id}/pages/{n}/)
+SERMON_PAGE_CACHE_DIR = config('SERMON_PAGE_CACHE_DIR', default=str(MEDIA_ROOT / 'cache' / 'sermon_pages'))
+SERMON_PAGE_RANGE_MAX = config('SERMON_PAGE_RANGE_MAX', default=10, cast=int)
+# Intervalle (s) d'écriture des compteurs de vues/téléchargements ; 0 = pas de thread
+SERMON_COUNTER_FLUSH_INTERVAL = config('SERMON_COUNTER_FLUSH_INTERVAL', default=10, cast=int)
+# Intervalle (s) d'écriture des positions de lecture (« Reprendre la lecture ») ; 0 = pas de thread
+SERMON_PROGRESS_FLUSH_INTERVAL = config('SERMON_PROGRESS_FLUSH_INTERVAL', default=15, cast=int)
+SERMON_PROGRESS_BATCH_MAX = config('SERMON_PROGRESS_BATCH_MAX', default=50, cast=int)
+# Nombre de sermons similaires précalculés par sermon
+SERMON_RELATED_COUNT = config('SERMON_RELATED_COUNT', default=6, cast=int)
+# Nombre d'épisodes dans le flux RSS/podcast
+SERMON_FEED_LIMIT = config('SERMON_FEED_LIMIT', default=50, cast=int)
+# URL publique de l'API : liens absolus du flux (stocké et partagé, donc indépendant de l'en-tête Host)
+SITE_URL = config('SITE_URL', default='https://cyprusforchrist-production.up.railway.app').rstrip('/')
+# Durée max (s) des compteurs de filtres en cache ; invalidés par signal à chaque modification
+SERMON_FACETS_CACHE_TIMEOUT = config('SERMON_FACETS_CACHE_TIMEOUT', default=3600, cast=int)
+
+# Rhema du jour : pré-génération IA (commande generate_rhemas, planifiée chaque nuit)
+RHEMA_PREGENERATE_DAYS = config('RHEMA_PREGENERATE_DAYS', default=3, cast=int)
+# Une génération « en cours » depuis plus longtemps est considérée abandonnée (s)
+RHEMA_GENERATION_LOCK_TIMEOUT = config('RHEMA_GENERATION_LOCK_TIMEOUT', default=300, cast=int)
+# Délai avant de retenter une génération échouée (s)
+RHEMA_GENERATION_RETRY_DELAY = config('RHEMA_GENERATION_RETRY_DELAY', default=600, cast=int)
+# Durée en cache (s) du Rhema de repli servi tant que celui du jour n'existe pas
+RHEMA_FALLBACK_CACHE_TIMEOUT = config('RHEMA_FALLBACK_CACHE_TIMEOUT', default=300, cast=int)
+
+# Assistant biblique : cache des réponses par question normalisée (voir ai_assistant/cache.py)
+AI_ANSWER_CACHE_ENABLED = config('AI_ANSWER_CACHE_ENABLED', default=True, cast=bool)
+AI_ANSWER_CACHE_TTL = config('AI_ANSWER_CACHE_TTL', default=30 * 24 * 3600, cast=int)
+AI_ANSWER_CACHE_MAX_ENTRIES = config('AI_ANSWER_CACHE_MAX_ENTRIES', default=5000, cast=int)
+# Questions proches (ai_assistant/similarity.py) : seuil de similarité de Jaccard entre les termes
+AI_SIMILAR_QUESTIONS_ENABLED = config('AI_SIMILAR_QUESTIONS_ENABLED', default=True, cast=bool)
+AI_SIMILAR_QUESTION_THRESHOLD = config('AI_SIMILAR_QUESTION_THRESHOLD', default=0.75, cast=float)
+AI_SIMILAR_QUESTION_MIN_TOKENS = config('AI_SIMILAR_QUESTION_MIN_TOKENS', default=2, cast=int)
+# Consultations IA en arrière-plan (ConsultationJobService) : tentatives sur quota atteint (429),
+# attente exponentielle en secondes, relance d'une consultation perdue après AI_JOB_STALE_AFTER
+AI_JOB_MAX_ATTEMPTS = config('AI_JOB_MAX_ATTEMPTS', default=5, cast=int)
+AI_JOB_RETRY_DELAY = config('AI_JOB_RETRY_DELAY', default=2, cast=int)
+AI_JOB_MAX_RETRY_DELAY = config('AI_JOB_MAX_RETRY_DELAY', default=60, cast=int)
+AI_JOB_STALE_AFTER = config('AI_JOB_STALE_AFTER', default=120, cast=int)
+
+# Conditional GET des endpoints publics (voir cyprus_api/conditional.py) :
+# un proxy partagé garde la réponse 60 s puis la revalide (304 le plus souvent)
+API_CACHE_CONTROL = config('API_CACHE_CONTROL', default='public, max-age=0, s-maxage=60, must-revalidate')
+
+# Cache : Redis partagé entre les workers si REDIS_URL est défini (Railway).
+# Sans Redis en production, cache en base (table créée par `createcachetable`
+# au démarrage) : les invalidations (Rhema du jour, facettes des sermons)
+# doivent atteindre tous les workers. Cache mémoire local en développement.
+REDIS_URL = config('REDIS_URL', default='')
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+            'KEY_PREFIX': 'cfc',
+        }
+    }
+elif not DEBUG:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+            'LOCATION': 'cfc_cache',
+            'KEY_PREFIX': 'cfc',
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'cyprus-api',
+        }
+    }
+
+# Background Tasks (pool de threads par processus, voir cyprus_api/tasks.py)
+BACKGROUND_TASK_WORKERS = config('BACKGROUND_TASK_WORKERS', default=2, cast=int)
+BACKGROUND_TASKS_EAGER = config('BACKGROUND_TASKS_EAGER', default=False, cast=bool)
 
 # Church Information (for receipts and emails)
 CHURCH_INFO = {
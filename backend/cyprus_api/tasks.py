@@ -0,0 +1,63 @@
+"""
+Exécution de tâches en arrière-plan pour Cyprus For Christ API.
+
+Pas de broker (Celery/Redis) : un pool de threads par processus, alimenté
+après le commit de la transaction courante. Suffisant pour les traitements
+post-upload (extraction PDF, etc.) sans bloquer la requête HTTP.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.db import connection, transaction
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.BACKGROUND_TASK_WORKERS,
+                thread_name_prefix='cfc-background',
+            )
+        return _executor
+
+
+def _run(func, args, kwargs):
+    try:
+        func(*args, **kwargs)
+    except Exception:
+        logger.exception(f"Erreur dans la tâche d'arrière-plan {func.__name__}")
+    finally:
+        # Chaque thread a sa propre connexion : la libérer en fin de tâche
+        connection.close()
+
+
+def run_in_background(func, *args, **kwargs):
+    """
+    Planifie func(*args, **kwargs) après le commit de la transaction courante.
+    Avec BACKGROUND_TASKS_EAGER=True la tâche s'exécute immédiatement (tests, debug).
+    """
+    if settings.BACKGROUND_TASKS_EAGER:
+        transaction.on_commit(lambda: func(*args, **kwargs))
+        return
+    transaction.on_commit(lambda: get_executor().submit(_run, func, args, kwargs))
+
+
+def run_later(delay, func, *args, **kwargs):
+    """
+    Planifie func(*args, **kwargs) dans le pool après `delay` secondes, sans
+    occuper de thread du pool pendant l'attente (minuterie dédiée).
+    Avec BACKGROUND_TASKS_EAGER=True la tâche s'exécute immédiatement.
+    """
+    if settings.BACKGROUND_TASKS_EAGER:
+        func(*args, **kwargs)
+        return
+    timer = threading.Timer(delay, lambda: get_executor().submit(_run, func, args, kwargs))
+    timer.daemon = True
+    timer.start()
@@ -2,7 +2,7 @@
 Cyprus For Christ API - URL Configuration
 """
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, re_path, include
 from django.conf import settings
 from django.conf.urls.static import static
 from django.views.generic import RedirectView
@@ -10,6 +10,7 @@ from django.http import JsonResponse
 from rest_framework import permissions
 from drf_yasg.views import get_schema_view
 from drf_yasg import openapi
+from sermons.media_views import serve_sermon_media
 
 # API Documentation
 schema_view = get_schema_view(
@@ -72,6 +73,15 @@ urlpatterns = [
     path('api/admin/', include('about.admin_urls')),
 ]
 
+# Sermon PDFs and covers (Range, ETag, Last-Modified) - also in production
+urlpatterns += [
+    re_path(
+        rf"^{settings.MEDIA_URL.lstrip('/')}sermons/(?P<folder>pdfs|covers)/(?P<path>.+)$",
+        serve_sermon_media,
+        name='sermon_media',
+    ),
+]
+
 # Serve media files in development
 if settings.DEBUG:
     urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
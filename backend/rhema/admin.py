@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Rhema
+from .models import Rhema, RhemaGeneration
 
 @admin.register(Rhema)
 class RhemaAdmin(admin.ModelAdmin):
@@ -12,3 +12,10 @@ class RhemaAdmin(admin.ModelAdmin):
         if not obj.pastor_id:
             obj.pastor = request.user
         super().save_model(request, obj, form, change)
+
+
+@admin.register(RhemaGeneration)
+class RhemaGenerationAdmin(admin.ModelAdmin):
+    list_display = ('date', 'status', 'attempts', 'started_at', 'finished_at')
+    list_filter = ('status',)
+    readonly_fields = ('date', 'status', 'attempts', 'error', 'started_at', 'finished_at')
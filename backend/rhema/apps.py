@@ -5,3 +5,6 @@ class RhemaConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'rhema'
     verbose_name = 'Rhéma Quotidien'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+from rhema.services import RhemaGenerationService
+
+
+class Command(BaseCommand):
+    help = (
+        "Pré-génère par l'IA les Rhemas des prochains jours (à planifier chaque nuit, "
+        "ex: cron Railway `python manage.py generate_rhemas`)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=None, help="Nombre de jours à préparer, aujourd'hui compris")
+
+    def handle(self, *args, **options):
+        results = RhemaGenerationService.pregenerate(options['days'])
+        for date, rhema in results.items():
+            if rhema:
+                self.stdout.write(f"{date} : {rhema.title}")
+            else:
+                self.stderr.write(f"{date} : non généré (en cours ailleurs ou échec, voir les logs)")
+        ready = sum(1 for rhema in results.values() if rhema)
+        self.stdout.write(self.style.SUCCESS(f"{ready}/{len(results)} Rhema(s) prêts."))
@@ -0,0 +1,30 @@
+# Generated by Django 4.2.30 on 2026-10-18 18:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rhema', '0003_alter_rhema_pastor'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RhemaGeneration',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(unique=True, verbose_name='Date du Rhema')),
+                ('status', models.CharField(choices=[('RUNNING', 'En cours'), ('DONE', 'Terminée'), ('FAILED', 'Échouée')], default='RUNNING', max_length=10, verbose_name='Statut')),
+                ('attempts', models.PositiveIntegerField(default=1, verbose_name='Tentatives')),
+                ('error', models.TextField(blank=True, verbose_name='Erreur')),
+                ('started_at', models.DateTimeField(verbose_name='Démarrée le')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='Terminée le')),
+            ],
+            options={
+                'verbose_name': 'Génération de Rhema',
+                'verbose_name_plural': 'Générations de Rhema',
+                'ordering': ['-date'],
+            },
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.30 on 2026-10-18 18:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rhema', '0004_rhemageneration'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='rhema',
+            name='content_en',
+            field=models.TextField(blank=True, verbose_name='Contenu (anglais)'),
+        ),
+        migrations.AddField(
+            model_name='rhema',
+            name='meditation_en',
+            field=models.TextField(blank=True, verbose_name='Méditation (anglais)'),
+        ),
+        migrations.AddField(
+            model_name='rhema',
+            name='title_en',
+            field=models.CharField(blank=True, max_length=255, verbose_name='Titre (anglais)'),
+        ),
+        migrations.AddField(
+            model_name='rhema',
+            name='verse_en',
+            field=models.CharField(blank=True, max_length=255, verbose_name='Référence Biblique (anglais)'),
+        ),
+    ]
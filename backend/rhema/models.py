@@ -8,6 +8,12 @@ class Rhema(models.Model):
     content = models.TextField(_('Contenu de la Parole'))
     verse = models.CharField(_('Référence Biblique'), max_length=255)
     meditation = models.TextField(_('Méditation / Note du Pasteur'), blank=True, null=True)
+
+    # Variante anglaise (LANGUAGES) ; vide = le français est servi à tous
+    title_en = models.CharField(_('Titre (anglais)'), max_length=255, blank=True)
+    content_en = models.TextField(_('Contenu (anglais)'), blank=True)
+    verse_en = models.CharField(_('Référence Biblique (anglais)'), max_length=255, blank=True)
+    meditation_en = models.TextField(_('Méditation (anglais)'), blank=True)
     
     pastor = models.ForeignKey(
         settings.AUTH_USER_MODEL,
@@ -34,3 +40,42 @@ class Rhema(models.Model):
 
     def __str__(self):
         return f"{self.published_at} - {self.title}"
+
+    TRANSLATED_FIELDS = ('title', 'content', 'verse', 'meditation')
+
+    def get_variant(self, language):
+        """Champs traduits dans `language` (repli sur le français champ par champ)"""
+        variant = {field: getattr(self, field) for field in self.TRANSLATED_FIELDS}
+        if language and language != 'fr':
+            for field in self.TRANSLATED_FIELDS:
+                value = getattr(self, f'{field}_{language}', '')
+                if value:
+                    variant[field] = value
+        return variant
+
+
+class RhemaGeneration(models.Model):
+    """
+    Verrou single-flight de la génération IA d'un Rhema : une ligne par date.
+    L'insertion (clé unique) ou la reprise conditionnelle d'une tentative
+    expirée garantit qu'une seule génération tourne à la fois pour une date.
+    """
+    class Status(models.TextChoices):
+        RUNNING = 'RUNNING', _('En cours')
+        DONE = 'DONE', _('Terminée')
+        FAILED = 'FAILED', _('Échouée')
+
+    date = models.DateField(_('Date du Rhema'), unique=True)
+    status = models.CharField(_('Statut'), max_length=10, choices=Status.choices, default=Status.RUNNING)
+    attempts = models.PositiveIntegerField(_('Tentatives'), default=1)
+    error = models.TextField(_('Erreur'), blank=True)
+    started_at = models.DateTimeField(_('Démarrée le'))
+    finished_at = models.DateTimeField(_('Terminée le'), null=True, blank=True)
+
+    class Meta:
+        verbose_name = _('Génération de Rhema')
+        verbose_name_plural = _('Générations de Rhema')
+        ordering = ['-date']
+
+    def __str__(self):
+        return f"{self.date} - {self.get_status_display()}"
@@ -6,5 +6,31 @@ class RhemaSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Rhema
-        fields = ('id', 'title', 'content', 'verse', 'meditation', 'pastor', 'pastor_name', 'published_at', 'created_at')
+        fields = (
+            'id', 'title', 'content', 'verse', 'meditation',
+            'title_en', 'content_en', 'verse_en', 'meditation_en',
+            'pastor', 'pastor_name', 'published_at', 'created_at'
+        )
         read_only_fields = ('pastor', 'created_at')
+
+
+class LocalizedRhemaSerializer(serializers.ModelSerializer):
+    """
+    Lecture publique (Rhema du jour) : title / content / verse / meditation
+    dans la langue de la requête (contexte `language`), sans les variantes brutes.
+    """
+    pastor_name = serializers.ReadOnlyField(source='pastor.username')
+
+    class Meta:
+        model = Rhema
+        fields = ('id', 'title', 'content', 'verse', 'meditation',
+                  'pastor', 'pastor_name', 'published_at', 'created_at')
+        read_only_fields = fields
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        language = self.context.get('language')
+        data.update(instance.get_variant(language))
+        # Langue réellement servie (français si la variante n'existe pas)
+        data['language'] = language if language and getattr(instance, f'title_{language}', '') else 'fr'
+        return data
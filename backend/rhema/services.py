@@ -0,0 +1,151 @@
+import logging
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import Rhema, RhemaGeneration
+
+logger = logging.getLogger(__name__)
+
+
+class RhemaGenerationService:
+    """
+    Génération IA des Rhemas, hors du chemin des requêtes HTTP.
+
+    La commande `generate_rhemas` (planifiée chaque nuit) prépare les N
+    prochains jours ; l'action `today` ne fait que lire la base et, si le
+    Rhema du jour manque malgré tout, déclenche une génération en arrière-plan.
+    """
+
+    @staticmethod
+    def acquire(date):
+        """Prend le verrou de génération de `date` ; False si une génération est en cours ou faite"""
+        now = timezone.now()
+        try:
+            with transaction.atomic():
+                RhemaGeneration.objects.create(date=date, started_at=now)
+            return True
+        except IntegrityError:
+            pass
+
+        # Reprise d'une tentative échouée (après le délai) ou abandonnée (processus tué)
+        stale = Q(status=RhemaGeneration.Status.RUNNING,
+                  started_at__lt=now - timedelta(seconds=settings.RHEMA_GENERATION_LOCK_TIMEOUT))
+        retry = Q(status=RhemaGeneration.Status.FAILED,
+                  finished_at__lt=now - timedelta(seconds=settings.RHEMA_GENERATION_RETRY_DELAY))
+        taken = RhemaGeneration.objects.filter(stale | retry, date=date).update(
+            status=RhemaGeneration.Status.RUNNING, started_at=now, finished_at=None,
+            error='', attempts=F('attempts') + 1,
+        )
+        return taken == 1
+
+    @staticmethod
+    def release(date, error=''):
+        RhemaGeneration.objects.filter(date=date).update(
+            status=RhemaGeneration.Status.FAILED if error else RhemaGeneration.Status.DONE,
+            error=error, finished_at=timezone.now(),
+        )
+
+    @staticmethod
+    def to_fields(ai_data):
+        """Champs du modèle à partir de la réponse bilingue {"fr": {...}, "en": {...}} de l'IA"""
+        if not isinstance(ai_data, dict) or not ai_data:
+            raise ValueError("Réponse de l'IA vide ou invalide")
+        # Ancien format (français seul, à plat) toléré
+        french = ai_data.get('fr', ai_data)
+        if not isinstance(french, dict) or not french.get('content'):
+            raise ValueError("Réponse de l'IA sans contenu français")
+        fields = {
+            'title': french.get('title') or 'Rhema du Jour',
+            'content': french['content'],
+            'verse': french.get('verse', ''),
+            'meditation': french.get('meditation', ''),
+        }
+        for language, _ in settings.LANGUAGES:
+            variant = ai_data.get(language)
+            if language == 'fr' or not isinstance(variant, dict) or not hasattr(Rhema, f'title_{language}'):
+                continue
+            for field in Rhema.TRANSLATED_FIELDS:
+                fields[f'{field}_{language}'] = variant.get(field) or ''
+        return fields
+
+    @staticmethod
+    def generate_for_date(date):
+        """Crée le Rhema de `date` via l'IA ; retourne le Rhema, ou None si rien n'a été fait"""
+        from ai_assistant.services import BiblicalAIService
+
+        existing = Rhema.objects.filter(published_at=date).first()
+        if existing or not RhemaGenerationService.acquire(date):
+            return existing
+
+        try:
+            # Un pasteur a pu publier entre-temps
+            rhema = Rhema.objects.filter(published_at=date).first()
+            if rhema is None:
+                ai_data = BiblicalAIService.generate_daily_rhema(for_date=date)
+                rhema = Rhema.objects.create(published_at=date, **RhemaGenerationService.to_fields(ai_data))
+        except Exception as e:
+            logger.warning("Génération du Rhema du %s impossible: %s", date, e)
+            RhemaGenerationService.release(date, error=str(e) or e.__class__.__name__)
+            return None
+        RhemaGenerationService.release(date)
+        return rhema
+
+    @staticmethod
+    def pregenerate(days=None):
+        """Prépare aujourd'hui et les `days - 1` jours suivants ; retourne les Rhemas créés ou existants"""
+        days = days or settings.RHEMA_PREGENERATE_DAYS
+        today = timezone.localdate()
+        results = {}
+        for offset in range(days):
+            date = today + timedelta(days=offset)
+            results[date] = RhemaGenerationService.generate_for_date(date)
+        return results
+
+
+class TodayRhemaCache:
+    """
+    Réponse sérialisée de /api/rhema/today/, par date et par langue, dans le
+    cache partagé (Redis en production) jusqu'à minuit heure locale
+    (TIME_ZONE, Europe/Nicosia). Les signaux de Rhema l'effacent.
+    """
+    KEY = 'rhema:today:{date}:{language}'
+
+    @staticmethod
+    def get_key(date, language):
+        # published_at peut encore être une chaîne sur une instance tout juste créée
+        date = date if isinstance(date, str) else date.isoformat()
+        return TodayRhemaCache.KEY.format(date=date, language=language)
+
+    @staticmethod
+    def seconds_until_midnight():
+        now = timezone.localtime()
+        midnight = timezone.make_aware(datetime.combine(now.date() + timedelta(days=1), time.min))
+        return max(int((midnight - now).total_seconds()), 1)
+
+    @staticmethod
+    def get(date, language):
+        return cache.get(TodayRhemaCache.get_key(date, language))
+
+    @staticmethod
+    def set(date, language, payload, fallback=False):
+        # Rhema de repli (celui du jour n'existe pas encore) : gardé peu de temps
+        # pour que la génération en arrière-plan soit relancée si elle a échoué
+        timeout = TodayRhemaCache.seconds_until_midnight()
+        if fallback:
+            timeout = min(timeout, settings.RHEMA_FALLBACK_CACHE_TIMEOUT)
+        cache.set(TodayRhemaCache.get_key(date, language), payload, timeout)
+
+    @staticmethod
+    def invalidate(*dates):
+        """Efface les réponses en cache pour ces dates et pour aujourd'hui (le repli dépend des autres jours)"""
+        dates = set(dates) | {timezone.localdate()}
+        cache.delete_many([
+            TodayRhemaCache.get_key(date, language)
+            for date in dates
+            for language, _ in settings.LANGUAGES
+        ])
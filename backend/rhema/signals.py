@@ -0,0 +1,15 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from .models import Rhema
+from .services import TodayRhemaCache
+
+
+@receiver(post_save, sender=Rhema)
+@receiver(post_delete, sender=Rhema)
+def invalidate_today_cache(sender, instance, raw=False, **kwargs):
+    """Après le commit : un lecteur concurrent ne peut pas remettre en cache l'ancienne version"""
+    if raw:
+        return
+    published_at = instance.published_at
+    transaction.on_commit(lambda: TodayRhemaCache.invalidate(published_at))
@@ -0,0 +1,96 @@
+from datetime import datetime, timedelta
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import override_settings
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from .models import Rhema, RhemaGeneration
+from .services import RhemaGenerationService, TodayRhemaCache
+
+AI_RHEMA = {
+    'fr': {'title': 'Paix', 'verse': 'Jean 14:27', 'content': 'Je vous laisse la paix.', 'meditation': 'Recevez-la.'},
+    'en': {'title': 'Peace', 'verse': 'John 14:27', 'content': 'Peace I leave with you.', 'meditation': 'Receive it.'},
+}
+
+
+@override_settings(BACKGROUND_TASKS_EAGER=True)
+class RhemaGenerationTests(APITestCase):
+    @mock.patch('ai_assistant.services.BiblicalAIService.generate_daily_rhema', return_value=AI_RHEMA)
+    def test_pregenerate_creates_upcoming_days_once(self, generate):
+        results = RhemaGenerationService.pregenerate(days=3)
+        self.assertEqual(len(results), 3)
+        self.assertEqual(Rhema.objects.count(), 3)
+
+        RhemaGenerationService.pregenerate(days=3)
+        self.assertEqual(generate.call_count, 3)
+        rhema = Rhema.objects.first()
+        self.assertEqual((rhema.title, rhema.title_en, rhema.verse_en), ('Paix', 'Peace', 'John 14:27'))
+
+    @mock.patch('ai_assistant.services.BiblicalAIService.generate_daily_rhema', return_value=AI_RHEMA)
+    def test_single_flight_per_date(self, generate):
+        today = timezone.localdate()
+        self.assertTrue(RhemaGenerationService.acquire(today))
+        # Génération déjà en cours (autre processus) : rien ne se passe
+        self.assertIsNone(RhemaGenerationService.generate_for_date(today))
+        generate.assert_not_called()
+
+        # Verrou abandonné : repris après le délai
+        RhemaGeneration.objects.filter(date=today).update(started_at=timezone.now() - timedelta(hours=1))
+        self.assertIsNotNone(RhemaGenerationService.generate_for_date(today))
+        self.assertEqual(RhemaGeneration.objects.get(date=today).status, RhemaGeneration.Status.DONE)
+
+    @mock.patch('ai_assistant.services.BiblicalAIService.generate_daily_rhema', return_value=None)
+    def test_today_never_serves_future_and_records_failure(self, generate):
+        today = timezone.localdate()
+        Rhema.objects.create(title='Hier', content='...', verse='Ps 23', published_at=today - timedelta(days=1))
+        Rhema.objects.create(title='Demain', content='...', verse='Ps 91', published_at=today + timedelta(days=1))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.get('/api/rhema/today/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['title'], 'Hier')
+        self.assertEqual(RhemaGeneration.objects.get(date=today).status, RhemaGeneration.Status.FAILED)
+
+        # Échec récent : pas de nouvel appel avant RHEMA_GENERATION_RETRY_DELAY
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.get('/api/rhema/today/')
+        self.assertEqual(generate.call_count, 1)
+
+
+class TodayRhemaCacheTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.rhema = Rhema.objects.create(
+            title='Aujourd\'hui', content='...', verse='Ps 118:24', published_at=timezone.localdate()
+        )
+
+    def test_today_is_cached_until_rhema_changes(self):
+        response = self.client.get('/api/rhema/today/')
+        self.assertEqual(response.data['title'], "Aujourd'hui")
+        with self.assertNumQueries(0):
+            self.client.get('/api/rhema/today/')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.rhema.title = 'Corrigé'
+            self.rhema.save()
+        self.assertEqual(self.client.get('/api/rhema/today/').data['title'], 'Corrigé')
+
+    def test_cache_expires_at_local_midnight(self):
+        # 23:59:30 à Nicosie = 20:59:30 UTC en été
+        late = timezone.make_aware(datetime(2026, 7, 1, 23, 59, 30))
+        with mock.patch('rhema.services.timezone.localtime', return_value=late):
+            self.assertEqual(TodayRhemaCache.seconds_until_midnight(), 30)
+
+    def test_today_variant_follows_accept_language(self):
+        Rhema.objects.filter(pk=self.rhema.pk).update(title_en='Today', content_en='...')
+        cache.clear()
+
+        response = self.client.get('/api/rhema/today/', HTTP_ACCEPT_LANGUAGE='en-GB,en;q=0.9')
+        self.assertEqual((response.data['title'], response.data['language']), ('Today', 'en'))
+        self.assertEqual(response.data['verse'], 'Ps 118:24')  # pas de variante : repli sur le français
+
+        response = self.client.get('/api/rhema/today/', HTTP_ACCEPT_LANGUAGE='fr')
+        self.assertEqual((response.data['title'], response.data['language']), ("Aujourd'hui", 'fr'))
@@ -1,15 +1,38 @@
 from rest_framework import viewsets, permissions, status
 from rest_framework.response import Response
 from rest_framework.decorators import action
+from django.conf import settings
+from django.db.models import Count, Max
 from django.utils import timezone
+from cyprus_api.conditional import ConditionalGetMixin, make_etag
+from cyprus_api.tasks import run_in_background
 from .models import Rhema
-from .serializers import RhemaSerializer
+from .serializers import LocalizedRhemaSerializer, RhemaSerializer
+from .services import RhemaGenerationService, TodayRhemaCache
 from users.permissions import IsPastorOrAdmin
 
-class RhemaViewSet(viewsets.ModelViewSet):
-    queryset = Rhema.objects.all()
+class RhemaViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
+    queryset = Rhema.objects.select_related('pastor')
     serializer_class = RhemaSerializer
 
+    def get_list_validators(self):
+        stats = Rhema.objects.aggregate(last_update=Max('updated_at'), total=Count('id'))
+        last_update = stats['last_update']
+        if last_update is None:
+            return None
+        # Pas de Last-Modified : la suppression d'un Rhema ne change pas max(updated_at)
+        etag = make_etag('rhemas', self.request.build_absolute_uri(), last_update.isoformat(), stats['total'])
+        return etag, None
+
+    def get_detail_validators(self):
+        if not str(self.kwargs['pk']).isdigit():
+            return None
+        last_update = Rhema.objects.filter(pk=self.kwargs['pk']).values_list('updated_at', flat=True).first()
+        if last_update is None:
+            return None
+        etag = make_etag('rhema', self.request.build_absolute_uri(), last_update.isoformat())
+        return etag, None
+
     def get_permissions(self):
         if self.action in ['list', 'retrieve', 'today']:
             return [permissions.AllowAny()]
@@ -21,31 +44,30 @@ class RhemaViewSet(viewsets.ModelViewSet):
 
     @action(detail=False, methods=['get'])
     def today(self, request):
-        today = timezone.now().date()
-        rhema = Rhema.objects.filter(published_at=today).first()
-        
-        if not rhema:
-            from ai_assistant.services import BiblicalAIService
-            ai_data = BiblicalAIService.generate_daily_rhema()
-            
-            if ai_data:
-                try:
-                    rhema = Rhema.objects.create(
-                        title=ai_data.get('title', 'Rhema du Jour'),
-                        content=ai_data.get('content', ''),
-                        verse=ai_data.get('verse', ''),
-                        meditation=ai_data.get('meditation', ''),
-                        published_at=today
-                    )
-                except Exception as e:
-                    print(f"Error saving AI Rhema: {e}")
-            
-            if not rhema:
-                # Fallback to the most recent rhema if AI fails or was already returned
-                rhema = Rhema.objects.all().first()
-            
+        """
+        Rhema du jour, servi depuis le cache partagé (une lecture en base par
+        date et par langue) ; jamais d'appel réseau ici.
+        S'il n'a pas été pré-généré, la génération part en arrière-plan
+        (une seule à la fois par date) et le dernier Rhema publié est servi.
+        La variante (fr/en) suit Accept-Language via LocaleMiddleware.
+        """
+        today = timezone.localdate()
+        language = getattr(request, 'LANGUAGE_CODE', settings.LANGUAGE_CODE)
+        payload = TodayRhemaCache.get(today, language)
+        if payload is not None:
+            return Response(payload)
+
+        rhema = Rhema.objects.select_related('pastor').filter(published_at=today).first()
+        fallback = rhema is None
+        if fallback:
+            run_in_background(RhemaGenerationService.generate_for_date, today)
+            # Dernier Rhema passé : les Rhemas pré-générés des jours suivants restent cachés
+            rhema = Rhema.objects.select_related('pastor').filter(published_at__lt=today).first()
+
         if rhema:
-            serializer = self.get_serializer(rhema)
-            return Response(serializer.data)
-        
+            serializer = LocalizedRhemaSerializer(rhema, context={'request': request, 'language': language})
+            payload = dict(serializer.data)
+            TodayRhemaCache.set(today, language, payload, fallback=fallback)
+            return Response(payload)
+
         return Response({"detail": "Pas de Rhema disponible."}, status=status.HTTP_404_NOT_FOUND)
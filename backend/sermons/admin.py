@@ -1,17 +1,20 @@
 from django.contrib import admin
-from .models import Sermon, SermonComment
+from .models import Sermon, SermonComment, SermonDocument, SermonSeries
 
 @admin.register(Sermon)
 class SermonAdmin(admin.ModelAdmin):
-    list_display = ('title', 'pastor', 'is_published', 'created_at')
+    list_display = ('title', 'pastor', 'is_published', 'comment_count', 'view_count',
+                    'download_count', 'youtube_click_count', 'created_at')
     list_filter = ('is_published', 'pastor', 'created_at')
     search_fields = ('title', 'description')
     prepopulated_fields = {'slug': ('title',)}
     fieldsets = (
-        (None, {'fields': ('title', 'slug', 'description', 'pastor', 'category')}),
+        (None, {'fields': ('title', 'slug', 'description', 'pastor', 'category', 'series')}),
         ('Media', {'fields': ('youtube_url', 'cover_image', 'pdf_file')}),
         ('Publication', {'fields': ('is_published',)}),
+        ('Statistiques', {'fields': ('view_count', 'download_count', 'youtube_click_count', 'comment_count')}),
     )
+    readonly_fields = ('view_count', 'download_count', 'youtube_click_count', 'comment_count')
     
     def save_model(self, request, obj, form, change):
         if not obj.pastor_id:
@@ -23,3 +26,20 @@ class SermonCommentAdmin(admin.ModelAdmin):
     list_display = ('user', 'sermon', 'created_at')
     list_filter = ('created_at',)
     search_fields = ('content', 'user__username', 'sermon__title')
+
+@admin.register(SermonDocument)
+class SermonDocumentAdmin(admin.ModelAdmin):
+    list_display = ('sermon', 'status', 'page_count', 'byte_size', 'original_size', 'extracted_at')
+    list_filter = ('status',)
+    search_fields = ('sermon__title',)
+    readonly_fields = ('sermon', 'source_name', 'status', 'page_count', 'byte_size',
+                       'text_digest', 'error', 'extracted_at', 'original_file', 'original_size',
+                       'optimized_size', 'optimized_at')
+
+@admin.register(SermonSeries)
+class SermonSeriesAdmin(admin.ModelAdmin):
+    list_display = ('title', 'order', 'sermon_count', 'latest_sermon_at')
+    list_editable = ('order',)
+    search_fields = ('title',)
+    prepopulated_fields = {'slug': ('title',)}
+    readonly_fields = ('sermon_count', 'latest_sermon_at')
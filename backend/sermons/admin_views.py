@@ -1,38 +1,44 @@
+import csv
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from sermons.models import Sermon
-from sermons.serializers import SermonSerializer
+from sermons.serializers import SermonSerializer, SermonListSerializer
+from sermons.search import rank_queryset
+from sermons.services import SermonImportService, SlugService
 from users.permissions import IsAdmin
-from django.db.models import Q
+
+ADMIN_SEARCH_FIELDS = ('title', 'pastor__first_name', 'pastor__last_name', 'description')
+
 
 class AdminSermonViewSet(viewsets.ModelViewSet):
     """
     ViewSet for admin sermon management
     """
-    queryset = Sermon.objects.all().order_by('-created_at')
+    queryset = Sermon.objects.select_related('pastor', 'document').order_by('-created_at')
     serializer_class = SermonSerializer
     permission_classes = [IsAdmin]
     
     def get_queryset(self):
         queryset = super().get_queryset()
         
-        # Search filter
-        search = self.request.query_params.get('search', None)
-        if search:
-            queryset = queryset.filter(
-                Q(title__icontains=search) |
-                Q(pastor__first_name__icontains=search) |
-                Q(pastor__last_name__icontains=search) |
-                Q(description__icontains=search)
-            )
-        
         # Category filter
         category = self.request.query_params.get('category', None)
         if category:
             queryset = queryset.filter(category=category)
-        
+
+        # Search filter : index plein texte (pertinence), complété par une correspondance
+        # partielle pour la saisie en cours ; pas de plafond, la liste est paginée
+        search = self.request.query_params.get('search', None)
+        if search:
+            queryset = rank_queryset(queryset, search, contains_fields=ADMIN_SEARCH_FIELDS)
+
         return queryset
+
+    def get_serializer_class(self):
+        if self.action == 'list':
+            return SermonListSerializer
+        return SermonSerializer
     
     @action(detail=True, methods=['post'])
     def duplicate(self, request, pk=None):
@@ -40,6 +46,9 @@ class AdminSermonViewSet(viewsets.ModelViewSet):
         sermon = self.get_object()
         sermon.pk = None
         sermon.title = f"{sermon.title} (Copie)"
+        sermon.slug = SlugService.allocate([sermon.title])[0]
+        # La copie n'a ni commentaires ni statistiques
+        sermon.comment_count = sermon.view_count = sermon.download_count = sermon.youtube_click_count = 0
         sermon.save()
         
         return Response({
@@ -48,15 +57,25 @@ class AdminSermonViewSet(viewsets.ModelViewSet):
         })
 
     def perform_create(self, serializer):
-        title = serializer.validated_data.get('title')
-        from django.utils.text import slugify
-        slug = slugify(title)
-        
-        # Ensure slug uniqueness
-        original_slug = slug
-        counter = 1
-        while Sermon.objects.filter(slug=slug).exists():
-            slug = f"{original_slug}-{counter}"
-            counter += 1
-            
-        serializer.save(pastor=self.request.user, slug=slug)
+        SlugService.save_with_unique_slug(serializer, pastor=self.request.user)
+
+    @action(detail=False, methods=['post'], url_path='import')
+    def bulk_import(self, request):
+        """
+        Import en masse : fichier CSV/JSON (multipart, champ `file`) ou JSON
+        {"sermons": [...]}. Les sermons sont attribués à l'administrateur connecté.
+        """
+        upload = request.FILES.get('file')
+        try:
+            if upload:
+                rows = SermonImportService.parse(upload.read())
+            else:
+                rows = request.data.get('sermons') if isinstance(request.data, dict) else request.data
+                if not isinstance(rows, list):
+                    raise ValueError("Fournir un fichier ou une liste `sermons`")
+        except (ValueError, UnicodeDecodeError, csv.Error) as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        result = SermonImportService.import_rows(rows, request.user)
+        response_status = status.HTTP_201_CREATED if result['created'] else status.HTTP_200_OK
+        return Response(result, status=response_status)
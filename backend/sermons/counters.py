@@ -0,0 +1,147 @@
+"""
+Compteurs de sermons en écriture différée (write-behind).
+
+Les événements (vue, téléchargement PDF, clic YouTube) s'accumulent en mémoire
+dans chaque processus et sont écrits périodiquement par un thread de fond :
+un UPDATE ... SET x = x + n par groupe de sermons ayant le même incrément,
+au lieu d'un UPDATE par requête sur les lignes des sermons les plus vus.
+"""
+import atexit
+import logging
+import operator
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import F
+
+logger = logging.getLogger(__name__)
+
+EVENT_FIELDS = {
+    'view': 'view_count',
+    'download': 'download_count',
+    'youtube_click': 'youtube_click_count',
+}
+
+
+class WriteBehindBuffer:
+    """
+    Tampon en écriture différée : les entrées (clé -> valeur) sont fusionnées
+    en mémoire par `merge` (par défaut la plus récente l'emporte), puis un
+    thread démon par processus appelle flush() toutes les N secondes
+    (réglage `interval_setting` ; 0 = pas de thread, flush() explicite).
+
+    `write(pending)` écrit un lot et retourne (nombre écrit, entrées à
+    réessayer) ; si elle lève une exception, tout le lot est remis en attente.
+    Une entrée remise en attente ne remplace pas une entrée plus récente.
+    """
+
+    def __init__(self, thread_name, interval_setting, write, merge=None):
+        self.thread_name = thread_name
+        self.interval_setting = interval_setting
+        self._write = write
+        self._merge = merge or (lambda old, new: new)
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stop = threading.Event()
+
+    def get_flush_interval(self):
+        return getattr(settings, self.interval_setting)
+
+    def add(self, key, value):
+        with self._lock:
+            self._pending[key] = self._merge(self._pending[key], value) if key in self._pending else value
+        self._ensure_flusher()
+
+    def requeue(self, entries):
+        with self._lock:
+            for key, value in entries.items():
+                self._pending[key] = self._merge(value, self._pending[key]) if key in self._pending else value
+
+    def flush(self):
+        """Écrit les entrées en attente ; retourne ce que `write` a écrit"""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return 0
+        try:
+            written, retry = self._write(pending)
+        except Exception:
+            logger.exception("Écriture différée impossible (%s), nouvel essai au prochain cycle", self.thread_name)
+            self.requeue(pending)
+            return 0
+        if retry:
+            self.requeue(retry)
+        return written
+
+    def _ensure_flusher(self):
+        interval = self.get_flush_interval()
+        if interval <= 0 or (self._thread and self._thread.is_alive()):
+            return
+        with self._lock:
+            if self._thread and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(
+                target=self._run, args=(interval,), name=self.thread_name, daemon=True
+            )
+            self._thread.start()
+
+    def _run(self, interval):
+        while not self._stop.wait(interval):
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Écriture différée impossible (%s)", self.thread_name)
+            finally:
+                connection.close()
+
+
+def write_counters(pending):
+    """
+    Incréments {(sermon_id, champ): n} ; retourne (nombre d'UPDATE, incréments non écrits).
+    Regroupement des sermons par incréments identiques : sur un pic de trafic
+    la plupart des sermons ont +1 vue, soit un seul UPDATE ... WHERE id IN (...)
+    """
+    from .models import Sermon
+
+    by_sermon = defaultdict(dict)
+    for (sermon_id, field), amount in pending.items():
+        by_sermon[sermon_id][field] = amount
+    groups = defaultdict(list)
+    for sermon_id, increments in by_sermon.items():
+        groups[tuple(sorted(increments.items()))].append(sermon_id)
+
+    written, failed = 0, {}
+    for increments, sermon_ids in groups.items():
+        try:
+            Sermon.objects.filter(pk__in=sermon_ids).update(
+                **{field: F(field) + amount for field, amount in increments}
+            )
+            written += 1
+        except Exception:
+            logger.exception("Écriture des compteurs de sermons impossible, nouvel essai au prochain cycle")
+            for sermon_id in sermon_ids:
+                for field, amount in increments:
+                    failed[(sermon_id, field)] = amount
+    return written, failed
+
+
+class SermonCounterBuffer(WriteBehindBuffer):
+    def __init__(self):
+        super().__init__('sermon-counters', 'SERMON_COUNTER_FLUSH_INTERVAL', write_counters, merge=operator.add)
+
+    def record(self, sermon_id, event, amount=1):
+        self.add((sermon_id, EVENT_FIELDS[event]), amount)
+
+
+counters = SermonCounterBuffer()
+
+
+@atexit.register
+def _flush_on_exit():
+    try:
+        counters.flush()
+    except Exception:
+        logger.exception("Compteurs de sermons perdus à l'arrêt du processus")
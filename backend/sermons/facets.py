@@ -0,0 +1,67 @@
+"""
+Compteurs des filtres du catalogue (catégories, séries, pasteurs).
+
+Une requête GROUP BY par dimension, résultat mis en cache (CACHES) ;
+les signaux de Sermon effacent le cache après chaque commit, la barre de
+filtres ne coûte donc qu'une lecture de cache.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count
+
+CACHE_KEY = 'sermons:facets:{variant}'
+VARIANTS = {'all': None, 'published': True, 'unpublished': False}
+
+
+def get_variant(is_published):
+    if is_published is None:
+        return 'all'
+    return 'published' if is_published else 'unpublished'
+
+
+def compute_facets(is_published=None):
+    from .models import Sermon
+
+    sermons = Sermon.objects.all()
+    if is_published is not None:
+        sermons = sermons.filter(is_published=is_published)
+
+    # Une ancienne valeur absente des choix garde son code comme libellé
+    labels = dict(Sermon.Category.choices)
+    categories = [
+        {'value': value, 'label': str(labels.get(value, value)), 'count': count}
+        for value, count in sermons.values_list('category').annotate(count=Count('id')).order_by('-count', 'category')
+    ]
+    series = [
+        {'value': value, 'count': count}
+        for value, count in (
+            sermons.exclude(series__isnull=True).exclude(series='')
+            .values_list('series').annotate(count=Count('id')).order_by('-count', 'series')
+        )
+    ]
+    pastors = [
+        {'id': pastor_id, 'name': f"{first_name} {last_name}".strip() or username, 'count': count}
+        for pastor_id, username, first_name, last_name, count in (
+            sermons.values_list('pastor_id', 'pastor__username', 'pastor__first_name', 'pastor__last_name')
+            .annotate(count=Count('id')).order_by('-count', 'pastor_id')
+        )
+    ]
+    return {
+        'total': sum(item['count'] for item in categories),
+        'categories': categories,
+        'series': series,
+        'pastors': pastors,
+    }
+
+
+def get_facets(is_published=None):
+    key = CACHE_KEY.format(variant=get_variant(is_published))
+    facets = cache.get(key)
+    if facets is None:
+        facets = compute_facets(is_published)
+        cache.set(key, facets, settings.SERMON_FACETS_CACHE_TIMEOUT)
+    return facets
+
+
+def invalidate_facets():
+    cache.delete_many([CACHE_KEY.format(variant=variant) for variant in VARIANTS])
@@ -0,0 +1,146 @@
+"""
+Flux RSS / podcast des sermons.
+
+Le XML est rendu une fois puis stocké dans SermonFeed (partagé entre les
+workers). Un enregistrement ou une suppression de sermon efface les flux
+stockés ; le prochain lecteur déclenche la régénération. Les agrégateurs qui
+renvoient If-None-Match / If-Modified-Since reçoivent un 304 après une seule
+lecture de SermonFeed. Le flux étant partagé, ses liens absolus viennent de
+SITE_URL et non de l'en-tête Host du premier lecteur ; une série inconnue
+donne un 404 sans rien stocker.
+"""
+import hashlib
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.http import Http404, HttpResponse, HttpResponseNotModified
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.feedgenerator import Enclosure, Rss201rev2Feed
+from django.utils.http import http_date
+from django.views.decorators.http import require_http_methods
+
+from cyprus_api.conditional import is_not_modified
+
+from .models import Sermon, SermonDocument, SermonFeed
+
+FEED_CACHE_CONTROL = 'public, max-age=300'
+
+
+class PodcastFeed(Rss201rev2Feed):
+    """RSS 2.0 avec l'espace de noms iTunes attendu par les applications de podcast"""
+
+    def rss_attributes(self):
+        attrs = super().rss_attributes()
+        attrs['xmlns:itunes'] = 'http://www.itunes.com/dtds/podcast-1.0.dtd'
+        return attrs
+
+    def add_root_elements(self, handler):
+        super().add_root_elements(handler)
+        handler.addQuickElement('itunes:author', settings.CHURCH_INFO['name'])
+        handler.addQuickElement('itunes:explicit', 'false')
+
+
+def invalidate_feeds():
+    SermonFeed.objects.all().delete()
+
+
+def get_feed_key(category=None, series=None):
+    if category:
+        return f"category:{category}"
+    if series:
+        return f"series:{series}"
+    return 'all'
+
+
+def get_feed_url(category=None, series=None):
+    params = {'category': category} if category else {'series': series} if series else {}
+    url = settings.SITE_URL + reverse('sermon_feed')
+    return f"{url}?{urlencode(params)}" if params else url
+
+
+def render_feed(category=None, series=None):
+    website = settings.CHURCH_INFO['website'].rstrip('/')
+    title = f"{settings.CHURCH_INFO['name']} - Sermons"
+    if category:
+        title = f"{title} - {Sermon.Category(category).label}"
+    elif series:
+        title = f"{title} - {series}"
+
+    feed = PodcastFeed(
+        title=title,
+        link=f"{website}/sermons",
+        description=f"Prédications et enseignements de {settings.CHURCH_INFO['name']}",
+        language=settings.LANGUAGE_CODE,
+        feed_url=get_feed_url(category, series),
+    )
+
+    sermons = Sermon.objects.filter(is_published=True).select_related('pastor', 'document')
+    if category:
+        sermons = sermons.filter(category=category)
+    if series:
+        sermons = sermons.filter(series=series)
+
+    for sermon in sermons.order_by('-created_at', 'id')[:settings.SERMON_FEED_LIMIT]:
+        enclosures = []
+        if sermon.pdf_file:
+            try:
+                length = sermon.document.byte_size
+            except SermonDocument.DoesNotExist:
+                length = None
+            enclosures.append(Enclosure(
+                settings.SITE_URL + sermon.pdf_file.url, str(length or 0), 'application/pdf'
+            ))
+        feed.add_item(
+            title=sermon.title,
+            link=sermon.youtube_url or f"{website}/sermons",
+            description=sermon.description,
+            author_name=sermon.pastor.get_full_name() or sermon.pastor.username,
+            pubdate=sermon.created_at,
+            updateddate=sermon.updated_at,
+            unique_id=f"{website}/sermons/{sermon.slug}",
+            unique_id_is_permalink=False,
+            categories=[str(sermon.get_category_display())],
+            enclosures=enclosures,
+        )
+    return feed.writeString('utf-8')
+
+
+def get_or_render_feed(category=None, series=None):
+    key = get_feed_key(category, series)
+    stored = SermonFeed.objects.filter(key=key).first()
+    if stored is None:
+        if series and not Sermon.objects.filter(is_published=True, series=series).exists():
+            raise Http404("Série inconnue")
+        content = render_feed(category, series)
+        stored, _ = SermonFeed.objects.update_or_create(key=key, defaults={
+            'content': content,
+            'etag': f'"{hashlib.sha256(content.encode("utf-8")).hexdigest()[:32]}"',
+            'generated_at': timezone.now(),
+        })
+    return stored
+
+
+@require_http_methods(['GET', 'HEAD'])
+def sermon_feed(request):
+    """/api/sermons/feed.xml[?category=...|?series=...]"""
+    category = request.GET.get('category') or None
+    series = request.GET.get('series') or None
+    if category and category not in Sermon.Category.values:
+        raise Http404("Catégorie inconnue")
+
+    stored = get_or_render_feed(category, series)
+    last_modified = int(stored.generated_at.timestamp())
+    headers = {
+        'ETag': stored.etag,
+        'Last-Modified': http_date(last_modified),
+        'Cache-Control': FEED_CACHE_CONTROL,
+    }
+
+    if is_not_modified(request, stored.etag, last_modified):
+        response = HttpResponseNotModified()
+    else:
+        response = HttpResponse(stored.content, content_type='application/rss+xml; charset=utf-8')
+    for name, value in headers.items():
+        response[name] = value
+    return response
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+from sermons.models import Sermon
+
+
+class Command(BaseCommand):
+    help = "Calcule youtube_id et thumbnail des sermons existants (champs dérivés à l'enregistrement)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help='Sermons par UPDATE groupé')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        sermons = Sermon.objects.only('pk', 'youtube_url', 'cover_image', 'youtube_id', 'thumbnail')
+        pending = []
+        updated = 0
+        for sermon in sermons.iterator(chunk_size=batch_size):
+            if sermon.refresh_derived_fields():
+                pending.append(sermon)
+            if len(pending) >= batch_size:
+                updated += Sermon.objects.bulk_update(pending, ['youtube_id', 'thumbnail'])
+                pending = []
+        if pending:
+            updated += Sermon.objects.bulk_update(pending, ['youtube_id', 'thumbnail'])
+        self.stdout.write(self.style.SUCCESS(f"{updated} sermon(s) mis à jour."))
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from sermons.recommendations import rebuild_all
+
+
+class Command(BaseCommand):
+    help = "Recalcule les sermons similaires de toutes les archives (TF-IDF)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top', type=int, default=None, help='Nombre de voisins par sermon')
+
+    def handle(self, *args, **options):
+        count = rebuild_all(k=options['top'])
+        self.stdout.write(self.style.SUCCESS(f"Sermons similaires recalculés pour {count} sermon(s)."))
@@ -0,0 +1,43 @@
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from django.core.management.base import BaseCommand
+from django.db import connections
+from sermons.models import Sermon, SermonDocument
+from sermons.services import PDFExtractionService
+
+
+def _extract(sermon_id, force):
+    document = PDFExtractionService.extract(sermon_id, force=force)
+    return sermon_id, document.status if document else None
+
+
+class Command(BaseCommand):
+    help = "Extrait le texte et les métadonnées des PDF de sermons existants (en parallèle)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=2, help='Nombre de processus')
+        parser.add_argument('--force', action='store_true', help='Ré-extraire même les PDF déjà traités')
+
+    def handle(self, *args, **options):
+        sermons = Sermon.objects.exclude(pdf_file='').exclude(pdf_file__isnull=True)
+        if not options['force']:
+            sermons = sermons.exclude(document__status=SermonDocument.Status.DONE)
+        sermon_ids = list(sermons.values_list('pk', flat=True))
+        if not sermon_ids:
+            self.stdout.write("Aucun PDF à traiter.")
+            return
+
+        # Les processus fils ne doivent pas hériter de la connexion du parent
+        connections.close_all()
+
+        failed = 0
+        with ProcessPoolExecutor(max_workers=max(1, options['workers'])) as executor:
+            futures = [executor.submit(_extract, pk, options['force']) for pk in sermon_ids]
+            for future in as_completed(futures):
+                sermon_id, status = future.result()
+                if status != SermonDocument.Status.DONE:
+                    failed += 1
+                    self.stderr.write(f"Sermon {sermon_id}: {status}")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{len(sermon_ids) - failed}/{len(sermon_ids)} PDF extrait(s)."
+        ))
@@ -0,0 +1,34 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from sermons.services import SermonImportService
+
+
+class Command(BaseCommand):
+    help = "Importe des sermons en masse depuis un export CSV/JSON (ex: chaîne YouTube)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Fichier CSV ou JSON')
+        parser.add_argument('--pastor', required=True, help="Nom d'utilisateur du pasteur auteur")
+        parser.add_argument('--format', choices=['csv', 'json'], default=None, help='Détecté si absent')
+        parser.add_argument('--batch-size', type=int, default=None, help='Sermons par INSERT')
+
+    def handle(self, *args, **options):
+        User = get_user_model()
+        try:
+            pastor = User.objects.get(username=options['pastor'])
+        except User.DoesNotExist:
+            raise CommandError(f"Utilisateur introuvable : {options['pastor']}")
+
+        try:
+            with open(options['path'], 'rb') as stream:
+                rows = SermonImportService.parse(stream.read(), options['format'])
+        except (OSError, ValueError) as e:
+            raise CommandError(f"Lecture impossible : {e}")
+
+        result = SermonImportService.import_rows(rows, pastor, batch_size=options['batch_size'])
+        for error in result['errors']:
+            self.stderr.write(f"Ligne {error['row']} : {error['error']}")
+        self.stdout.write(self.style.SUCCESS(
+            f"{result['created']} sermon(s) importé(s), {result['skipped']} déjà présent(s), "
+            f"{len(result['errors'])} erreur(s)."
+        ))
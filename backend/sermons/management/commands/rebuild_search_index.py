@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+from sermons.models import Sermon
+from sermons.search import index_sermon
+
+
+class Command(BaseCommand):
+    help = "Reconstruit l'index de recherche plein texte des sermons"
+
+    def handle(self, *args, **options):
+        sermons = Sermon.objects.select_related('pastor').order_by('pk')
+        count = 0
+        for sermon in sermons.iterator(chunk_size=200):
+            index_sermon(sermon)
+            count += 1
+        self.stdout.write(self.style.SUCCESS(f"{count} sermon(s) indexé(s)."))
@@ -0,0 +1,187 @@
+"""
+Diffusion des médias de sermons (PDF et couvertures) en production.
+
+Hors DEBUG, Django ne sert pas MEDIA_ROOT : cette vue prend le relais pour
+sermons/pdfs/ et sermons/covers/ avec lecture par blocs, requêtes Range
+(lecteurs PDF mobiles), ETag fort et Last-Modified (réponses 304 / 206).
+Chaque téléchargement d'un PDF de sermon est compté (voir sermons/counters.py).
+"""
+import mimetypes
+import os
+import re
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import Http404, HttpResponse, HttpResponseNotModified, StreamingHttpResponse
+from django.utils._os import safe_join
+from django.utils.http import http_date
+from django.views.decorators.http import require_http_methods
+
+from cyprus_api.conditional import is_not_modified
+
+from .counters import counters
+from .models import Sermon
+
+CHUNK_SIZE = 64 * 1024
+CACHE_CONTROL = 'public, max-age=86400'
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+def get_validators(stat):
+    """ETag fort dérivé de la taille et de la date de modification (ns)"""
+    etag = f'"{stat.st_size:x}-{stat.st_mtime_ns:x}"'
+    return etag, int(stat.st_mtime)
+
+
+def parse_range(header, size):
+    """
+    Retourne (début, fin) inclusifs pour un en-tête `Range: bytes=...` simple,
+    None s'il faut servir le fichier entier, ou 'unsatisfiable'.
+    Les plages multiples sont ignorées : on renvoie alors tout le fichier.
+    """
+    match = RANGE_RE.match(header.strip()) if header else None
+    if not match:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        # Suffixe : les N derniers octets
+        length = int(last)
+        if length == 0:
+            return 'unsatisfiable'
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or end < start:
+        return 'unsatisfiable'
+    return start, end
+
+
+def iter_file(path, start, length):
+    with open(path, 'rb') as stream:
+        stream.seek(start)
+        remaining = length
+        while remaining > 0:
+            chunk = stream.read(min(CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+async def aiter_file(path, start, length):
+    """
+    Variante asynchrone pour ASGI : Django 4.2 lit entièrement en mémoire un
+    itérateur synchrone avant d'envoyer le premier octet. Les lectures passent
+    par un thread, hors du thread partagé des vues synchrones.
+    """
+    read = sync_to_async(lambda stream, size: stream.read(size), thread_sensitive=False)
+    stream = await sync_to_async(open, thread_sensitive=False)(path, 'rb')
+    try:
+        await sync_to_async(stream.seek, thread_sensitive=False)(start)
+        remaining = length
+        while remaining > 0:
+            chunk = await read(stream, min(CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+    finally:
+        stream.close()
+
+
+def get_file_iterator(request, path, start, length):
+    """Itérateur adapté au serveur : asynchrone sous ASGI, synchrone sous WSGI"""
+    # Les vues DRF passent leur Request, qui enveloppe la requête Django
+    if isinstance(getattr(request, '_request', request), ASGIRequest):
+        return aiter_file(path, start, length)
+    return iter_file(path, start, length)
+
+
+def is_download_start(request, response):
+    """
+    Début d'un téléchargement : GET complet (200) ou première plage (206 à
+    partir de l'octet 0). Les plages suivantes, les 304 et les HEAD d'un même
+    lecteur ne sont pas recomptés.
+    """
+    if request.method != 'GET':
+        return False
+    if response.status_code == 200:
+        return True
+    return response.status_code == 206 and response['Content-Range'].startswith('bytes 0-')
+
+
+@require_http_methods(['GET', 'HEAD'])
+def serve_sermon_media(request, folder, path):
+    try:
+        # Confiné au dossier demandé : pas de remontée vers le reste de MEDIA_ROOT
+        full_path = safe_join(settings.MEDIA_ROOT, 'sermons', folder, path)
+    except SuspiciousFileOperation:
+        raise Http404("Fichier introuvable")
+    response = serve_file(request, full_path)
+    if folder == 'pdfs' and is_download_start(request, response):
+        sermon_id = Sermon.objects.filter(pdf_file=f'sermons/pdfs/{path}').values_list('pk', flat=True).first()
+        if sermon_id is not None:
+            counters.record(sermon_id, 'download')
+    return response
+
+
+def serve_file(request, full_path):
+    """Réponse GET/HEAD pour un fichier local : 200, 206, 304 ou 416"""
+    try:
+        stat = os.stat(full_path)
+    except OSError:
+        raise Http404("Fichier introuvable")
+    if not os.path.isfile(full_path):
+        raise Http404("Fichier introuvable")
+
+    etag, last_modified = get_validators(stat)
+    headers = {
+        'ETag': etag,
+        'Last-Modified': http_date(last_modified),
+        'Cache-Control': CACHE_CONTROL,
+        'Accept-Ranges': 'bytes',
+    }
+
+    if is_not_modified(request, etag, last_modified):
+        response = HttpResponseNotModified()
+        for name, value in headers.items():
+            response[name] = value
+        return response
+
+    size = stat.st_size
+    byte_range = parse_range(request.META.get('HTTP_RANGE'), size)
+    if_range = request.META.get('HTTP_IF_RANGE')
+    if byte_range is not None and if_range and if_range.strip() != etag:
+        # Le fichier a changé depuis la première requête : renvoyer tout le fichier
+        byte_range = None
+
+    if byte_range == 'unsatisfiable':
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+        return response
+
+    if byte_range is None:
+        start, end, status = 0, size - 1, 200
+    else:
+        (start, end), status = byte_range, 206
+    length = end - start + 1 if size else 0
+
+    if request.method == 'HEAD':
+        response = HttpResponse(status=status)
+    else:
+        response = StreamingHttpResponse(get_file_iterator(request, full_path, start, length), status=status)
+
+    content_type, encoding = mimetypes.guess_type(full_path)
+    response['Content-Type'] = content_type or 'application/octet-stream'
+    if encoding:
+        response['Content-Encoding'] = encoding
+    response['Content-Length'] = str(length)
+    if status == 206:
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+    for name, value in headers.items():
+        response[name] = value
+    return response
@@ -0,0 +1,35 @@
+# Generated by Django 4.2.30 on 2026-10-18 18:08
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_comment_count(apps, schema_editor):
+    Sermon = apps.get_model('sermons', 'Sermon')
+    SermonComment = apps.get_model('sermons', 'SermonComment')
+    counts = (
+        SermonComment.objects.filter(sermon=OuterRef('pk'))
+        .order_by().values('sermon').annotate(total=Count('id')).values('total')
+    )
+    Sermon.objects.update(comment_count=Coalesce(Subquery(counts), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sermons', '0005_alter_sermon_category'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='sermon',
+            name='comment_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Nombre de commentaires'),
+        ),
+        migrations.RunPython(backfill_comment_count, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='sermoncomment',
+            index=models.Index(fields=['sermon', '-created_at', '-id'], name='sermon_comment_keyset_idx'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.30 on 2026-10-18 18:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sermons', '0006_sermon_comment_count'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='sermon',
+            index=models.Index(fields=['-created_at', 'id'], name='sermon_catalog_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='sermon',
+            index=models.Index(fields=['category', '-created_at', 'id'], name='sermon_category_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='sermon',
+            index=models.Index(fields=['series', '-created_at', 'id'], name='sermon_series_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='sermon',
+            index=models.Index(fields=['pastor', '-created_at', 'id'], name='sermon_pastor_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='sermon',
+            index=models.Index(fields=['is_published', '-created_at', 'id'], name='sermon_published_idx'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 4.2.30 on 2026-10-18 18:10
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sermons', '0007_sermon_catalog_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SermonSearchTerm',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('term', models.CharField(max_length=64, verbose_name='Terme')),
+                ('weight', models.PositiveIntegerField(default=1, verbose_name='Poids')),
+                ('sermon', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_terms', to='sermons.sermon')),
+            ],
+            options={
+                'verbose_name': 'Terme de recherche',
+                'verbose_name_plural': 'Termes de recherche',
+                'indexes': [models.Index(fields=['term', 'sermon', 'weight'], name='sermon_search_term_idx')],
+                'unique_together': {('sermon', 'term')},
+            },
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 4.2.30 on 2026-10-18 18:11
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sermons', '0008_sermonsearchterm'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SermonDocument',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source_name', models.CharField(blank=True, max_length=255, verbose_name='Fichier source')),
+                ('status', models.CharField(choices=[('PENDING', 'En attente'), ('PROCESSING', 'En cours'), ('DONE', 'Terminé'), ('FAILED', 'Échoué')], default='PENDING', max_length=20, verbose_name='Statut')),
+                ('page_count', models.PositiveIntegerField(blank=True, null=True, verbose_name='Nombre de pages')),
+                ('byte_size', models.PositiveBigIntegerField(blank=True, null=True, verbose_name='Taille (octets)')),
+                ('text_digest', models.CharField(blank=True, max_length=64, verbose_name='Empreinte SHA-256 du texte')),
+                ('error', models.TextField(blank=True, verbose_name='Erreur')),
+                ('extracted_at', models.DateTimeField(blank=True, null=True, verbose_name='Extrait le')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('sermon', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='document', to='sermons.sermon')),
+            ],
+            options={
+                'verbose_name': 'Document de sermon',
+                'verbose_name_plural': 'Documents de sermons',
+            },
+        ),
+        migrations.CreateModel(
+            name='SermonDocumentPage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('number', models.PositiveIntegerField(verbose_name='Page')),
+                ('text', models.TextField(blank=True, verbose_name='Texte')),
+                ('document', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='pages', to='sermons.sermondocument')),
+            ],
+            options={
+                'verbose_name': 'Page de document',
+                'verbose_name_plural': 'Pages de documents',
+                'ordering': ['number'],
+                'unique_together': {('document', 'number')},
+            },
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.30 on 2026-10-18 18:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sermons', '0009_sermondocument'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='sermondocument',
+            name='optimized_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Optimisé le'),
+        ),
+        migrations.AddField(
+            model_name='sermondocument',
+            name='optimized_size',
+            field=models.PositiveBigIntegerField(blank=True, null=True, verbose_name='Taille optimisée (octets)'),
+        ),
+        migrations.AddField(
+            model_name='sermondocument',
+            name='original_file',
+            field=models.FileField(blank=True, null=True, upload_to='sermons/pdfs/originals/', verbose_name='PDF original'),
+        ),
+        migrations.AddField(
+            model_name='sermondocument',
+            name='original_size',
+            field=models.PositiveBigIntegerField(blank=True, null=True, verbose_name='Taille originale (octets)'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 4.2.30 on 2026-10-18 18:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sermons', '0010_sermondocument_optimization'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='sermon',
+            name='download_count',
+            field=models.PositiveBigIntegerField(default=0, editable=False, verbose_name='Téléchargements PDF'),
+        ),
+        migrations.AddField(
+            model_name='sermon',
+            name='view_count',
+            field=models.PositiveBigIntegerField(default=0, editable=False, verbose_name='Vues'),
+        ),
+        migrations.AddField(
+            model_name='sermon',
+            name='youtube_click_count',
+            field=models.PositiveBigIntegerField(default=0, editable=False, verbose_name='Clics YouTube'),
+        ),
+    ]
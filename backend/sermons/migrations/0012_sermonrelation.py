@@ -0,0 +1,31 @@
+# Generated by Django 4.2.30 on 2026-10-18 18:18
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sermons', '0011_sermon_counters'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SermonRelation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.FloatField(verbose_name='Score de similarité')),
+                ('rank', models.PositiveSmallIntegerField(verbose_name='Rang')),
+                ('related', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='related_to', to='sermons.sermon')),
+                ('sermon', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='relations', to='sermons.sermon')),
+            ],
+            options={
+                'verbose_name': 'Sermon similaire',
+                'verbose_name_plural': 'Sermons similaires',
+                'ordering': ['sermon', 'rank'],
+                'indexes': [models.Index(fields=['sermon', 'rank'], name='sermon_relation_rank_idx')],
+                'unique_together': {('sermon', 'related')},
+            },
+        ),
+    ]
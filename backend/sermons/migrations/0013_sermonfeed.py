@@ -0,0 +1,27 @@
+# Generated by Django 4.2.30 on 2026-10-18 18:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sermons', '0012_sermonrelation'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SermonFeed',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=300, unique=True, verbose_name='Clé')),
+                ('content', models.TextField(verbose_name='Contenu XML')),
+                ('etag', models.CharField(max_length=80, verbose_name='ETag')),
+                ('generated_at', models.DateTimeField(verbose_name='Généré le')),
+            ],
+            options={
+                'verbose_name': 'Flux RSS',
+                'verbose_name_plural': 'Flux RSS',
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.30 on 2026-10-18 18:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sermons', '0013_sermonfeed'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='sermon',
+            name='thumbnail',
+            field=models.CharField(blank=True, default='', editable=False, max_length=500, verbose_name='Miniature'),
+        ),
+        migrations.AddField(
+            model_name='sermon',
+            name='youtube_id',
+            field=models.CharField(blank=True, db_index=True, default='', editable=False, max_length=11, verbose_name='Identifiant YouTube'),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 4.2.30 on 2026-10-18 18:27
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('sermons', '0014_sermon_youtube_id_thumbnail'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SermonProgress',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('position', models.PositiveIntegerField(default=0, verbose_name='Position (s)')),
+                ('duration', models.PositiveIntegerField(blank=True, null=True, verbose_name='Durée (s)')),
+                ('completed', models.BooleanField(default=False, verbose_name='Terminé')),
+                ('last_watched_at', models.DateTimeField(verbose_name='Dernière lecture')),
+                ('sermon', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='progress', to='sermons.sermon')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='sermon_progress', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Progression de lecture',
+                'verbose_name_plural': 'Progressions de lecture',
+                'indexes': [models.Index(fields=['user', 'completed', '-last_watched_at'], name='sermon_progress_resume_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='sermonprogress',
+            constraint=models.UniqueConstraint(fields=('user', 'sermon'), name='unique_sermon_progress'),
+        ),
+    ]
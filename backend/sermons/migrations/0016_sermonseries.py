@@ -0,0 +1,86 @@
+# Generated by Django 4.2.30 on 2026-10-18 18:29
+
+from django.db import migrations, models
+import django.db.models.deletion
+from django.db.models import Count, Max
+from django.db.models.functions import Trim
+from django.utils.text import slugify
+
+
+def backfill_series(apps, schema_editor):
+    """Une fiche par valeur distincte de Sermon.series (sans tenir compte de la casse)"""
+    Sermon = apps.get_model('sermons', 'Sermon')
+    SermonSeries = apps.get_model('sermons', 'SermonSeries')
+
+    series_by_key = {}
+    used_slugs = set()
+    titles = Sermon.objects.exclude(series__isnull=True).exclude(series='').values_list('series', flat=True)
+    for title in titles.order_by('series').distinct():
+        title = title.strip()
+        if not title or title.lower() in series_by_key:
+            continue
+        base = slugify(title)[:42].strip('-') or 'serie'
+        slug, counter = base, 1
+        while slug in used_slugs:
+            slug = f"{base}-{counter}"
+            counter += 1
+        used_slugs.add(slug)
+        series_by_key[title.lower()] = SermonSeries.objects.create(title=title, slug=slug)
+
+    for series in series_by_key.values():
+        # Même comparaison que pour créer les fiches : espaces de tête et de fin ignorés
+        # (identifiants matérialisés : MySQL refuse un UPDATE sur une sous-requête de la même table)
+        sermon_ids = (
+            Sermon.objects.annotate(series_trimmed=Trim('series'))
+            .filter(series_trimmed__iexact=series.title).values_list('pk', flat=True)
+        )
+        Sermon.objects.filter(pk__in=list(sermon_ids)).update(series_ref=series)
+        stats = Sermon.objects.filter(series_ref=series, is_published=True).aggregate(
+            count=Count('id'), latest=Max('created_at')
+        )
+        SermonSeries.objects.filter(pk=series.pk).update(
+            sermon_count=stats['count'], latest_sermon_at=stats['latest']
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sermons', '0015_sermonprogress'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SermonSeries',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('title', models.CharField(max_length=255, unique=True, verbose_name='Titre')),
+                ('slug', models.SlugField(unique=True)),
+                ('description', models.TextField(blank=True, verbose_name='Description')),
+                ('order', models.PositiveIntegerField(default=0, help_text="Les petites valeurs s'affichent en premier.", verbose_name='Ordre')),
+                ('sermon_count', models.PositiveIntegerField(default=0, editable=False, verbose_name='Nombre de sermons')),
+                ('latest_sermon_at', models.DateTimeField(blank=True, editable=False, null=True, verbose_name='Dernier sermon')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Série',
+                'verbose_name_plural': 'Séries',
+                'ordering': ['order', '-latest_sermon_at', 'id'],
+            },
+        ),
+        migrations.AddField(
+            model_name='sermon',
+            name='series_ref',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='sermons', to='sermons.sermonseries'),
+        ),
+        migrations.RunPython(backfill_series, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='sermon',
+            index=models.Index(fields=['series_ref', 'created_at', 'id'], name='sermon_series_ref_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='sermonseries',
+            index=models.Index(fields=['order', '-latest_sermon_at', 'id'], name='sermon_series_order_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.30 on 2026-10-18 19:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sermons', '0016_sermonseries'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='sermon',
+            index=models.Index(fields=['pdf_file'], name='sermon_pdf_file_idx'),
+        ),
+    ]
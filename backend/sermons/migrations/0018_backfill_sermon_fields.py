@@ -0,0 +1,40 @@
+from django.db import migrations
+
+from sermons.youtube import get_thumbnail_url, parse_youtube_id
+
+BATCH_SIZE = 500
+
+
+def backfill_derived_fields(apps, schema_editor):
+    """
+    youtube_id et thumbnail des sermons existants (même calcul que
+    Sermon.refresh_derived_fields, absente du modèle historique) ; la
+    commande backfill_sermon_fields reste disponible pour un recalcul.
+    """
+    Sermon = apps.get_model('sermons', 'Sermon')
+
+    pending = []
+    sermons = Sermon.objects.only('pk', 'youtube_url', 'cover_image', 'youtube_id', 'thumbnail')
+    for sermon in sermons.iterator(chunk_size=BATCH_SIZE):
+        youtube_id = parse_youtube_id(sermon.youtube_url)
+        thumbnail = sermon.cover_image.url if sermon.cover_image else get_thumbnail_url(youtube_id)
+        if (youtube_id, thumbnail) == (sermon.youtube_id, sermon.thumbnail):
+            continue
+        sermon.youtube_id, sermon.thumbnail = youtube_id, thumbnail
+        pending.append(sermon)
+        if len(pending) >= BATCH_SIZE:
+            Sermon.objects.bulk_update(pending, ['youtube_id', 'thumbnail'])
+            pending = []
+    if pending:
+        Sermon.objects.bulk_update(pending, ['youtube_id', 'thumbnail'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sermons', '0017_sermon_pdf_file_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_derived_fields, migrations.RunPython.noop),
+    ]
@@ -1,6 +1,7 @@
 from django.db import models
 from django.conf import settings
 from django.utils.translation import gettext_lazy as _
+from .youtube import get_thumbnail_url, parse_youtube_id
 
 class Sermon(models.TitleChoices if False else models.Model): # Placeholder for safety, using models.Model
     title = models.CharField(_('Titre'), max_length=255)
@@ -15,7 +16,15 @@ class Sermon(models.TitleChoices if False else models.Model): # Placeholder for
     )
     
     youtube_url = models.URLField(_('Lien YouTube'), blank=True, null=True)
+    # Dérivés à l'enregistrement (voir refresh_derived_fields)
+    youtube_id = models.CharField(_('Identifiant YouTube'), max_length=11, blank=True, default='', editable=False, db_index=True)
+    thumbnail = models.CharField(_('Miniature'), max_length=500, blank=True, default='', editable=False)
     series = models.CharField(_('Série'), max_length=255, blank=True, null=True)
+    # Fiche de la série, rattachée automatiquement d'après `series` (voir signals.assign_series)
+    series_ref = models.ForeignKey(
+        'SermonSeries', on_delete=models.SET_NULL, related_name='sermons',
+        null=True, blank=True, editable=False
+    )
     class Category(models.TextChoices):
         SUNDAY_SERVICE = 'SUNDAY_SERVICE', _('Culte Dimanche')
         PREACHING = 'PREACHING', _('Prédication')
@@ -39,6 +48,11 @@ class Sermon(models.TitleChoices if False else models.Model): # Placeholder for
     cover_image = models.ImageField(_('Image de couverture'), upload_to='sermons/covers/', blank=True, null=True)
     
     is_published = models.BooleanField(_('Publié'), default=True)
+    comment_count = models.PositiveIntegerField(_('Nombre de commentaires'), default=0, editable=False)
+    # Compteurs écrits en différé par sermons/counters.py
+    view_count = models.PositiveBigIntegerField(_('Vues'), default=0, editable=False)
+    download_count = models.PositiveBigIntegerField(_('Téléchargements PDF'), default=0, editable=False)
+    youtube_click_count = models.PositiveBigIntegerField(_('Clics YouTube'), default=0, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -46,6 +60,78 @@ class Sermon(models.TitleChoices if False else models.Model): # Placeholder for
         verbose_name = _('Sermon')
         verbose_name_plural = _('Sermons')
         ordering = ['-created_at']
+        indexes = [
+            # Pagination par clé (-created_at, id) du catalogue, avec ou sans filtre
+            models.Index(fields=['-created_at', 'id'], name='sermon_catalog_idx'),
+            models.Index(fields=['category', '-created_at', 'id'], name='sermon_category_idx'),
+            models.Index(fields=['series', '-created_at', 'id'], name='sermon_series_idx'),
+            models.Index(fields=['pastor', '-created_at', 'id'], name='sermon_pastor_idx'),
+            models.Index(fields=['is_published', '-created_at', 'id'], name='sermon_published_idx'),
+            # Sermons d'une série dans l'ordre chronologique (endpoint des séries)
+            models.Index(fields=['series_ref', 'created_at', 'id'], name='sermon_series_ref_idx'),
+            # Sermon d'un PDF servi par /media/ (compteur de téléchargements)
+            models.Index(fields=['pdf_file'], name='sermon_pdf_file_idx'),
+        ]
+
+    def __str__(self):
+        return self.title
+
+    def get_thumbnail_path(self):
+        """Couverture si présente, sinon miniature de la vidéo YouTube"""
+        if self.cover_image:
+            return self.cover_image.url
+        return get_thumbnail_url(self.youtube_id)
+
+    def refresh_derived_fields(self):
+        """Recalcule youtube_id et thumbnail ; retourne les champs modifiés"""
+        changed = []
+        youtube_id = parse_youtube_id(self.youtube_url)
+        if youtube_id != self.youtube_id:
+            self.youtube_id = youtube_id
+            changed.append('youtube_id')
+        thumbnail = self.get_thumbnail_path()
+        if thumbnail != self.thumbnail:
+            self.thumbnail = thumbnail
+            changed.append('thumbnail')
+        return changed
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'youtube_url' in update_fields and self.refresh_derived_fields():
+            kwargs['update_fields'] = set(update_fields) | {'youtube_id', 'thumbnail'}
+        elif update_fields is None:
+            self.refresh_derived_fields()
+        if update_fields is not None and 'series' in update_fields:
+            # series_ref suit le champ texte (signals.assign_series)
+            kwargs['update_fields'] = set(kwargs['update_fields']) | {'series_ref'}
+        super().save(*args, **kwargs)
+        # Le nom définitif d'une nouvelle couverture n'est connu qu'après l'écriture du fichier
+        thumbnail = self.get_thumbnail_path()
+        if thumbnail != self.thumbnail:
+            self.thumbnail = thumbnail
+            Sermon.objects.filter(pk=self.pk).update(thumbnail=thumbnail)
+
+class SermonSeries(models.Model):
+    """
+    Série / playlist de sermons. Les agrégats (nombre de sermons publiés, date
+    du dernier) sont stockés et recalculés à chaque modification d'un sermon.
+    """
+    title = models.CharField(_('Titre'), max_length=255, unique=True)
+    slug = models.SlugField(unique=True)
+    description = models.TextField(_('Description'), blank=True)
+    order = models.PositiveIntegerField(_('Ordre'), default=0, help_text=_("Les petites valeurs s'affichent en premier."))
+    sermon_count = models.PositiveIntegerField(_('Nombre de sermons'), default=0, editable=False)
+    latest_sermon_at = models.DateTimeField(_('Dernier sermon'), null=True, blank=True, editable=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = _('Série')
+        verbose_name_plural = _('Séries')
+        ordering = ['order', '-latest_sermon_at', 'id']
+        indexes = [
+            models.Index(fields=['order', '-latest_sermon_at', 'id'], name='sermon_series_order_idx'),
+        ]
 
     def __str__(self):
         return self.title
@@ -60,6 +146,132 @@ class SermonComment(models.Model):
         verbose_name = _('Commentaire de sermon')
         verbose_name_plural = _('Commentaires de sermons')
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['sermon', '-created_at', '-id'], name='sermon_comment_keyset_idx'),
+        ]
 
     def __str__(self):
         return f"Commentaire de {self.user.username} sur {self.sermon.title}"
+
+class SermonSearchTerm(models.Model):
+    """Index inversé de recherche (voir sermons/search.py)"""
+    sermon = models.ForeignKey(Sermon, on_delete=models.CASCADE, related_name='search_terms')
+    term = models.CharField(_('Terme'), max_length=64)
+    weight = models.PositiveIntegerField(_('Poids'), default=1)
+
+    class Meta:
+        verbose_name = _('Terme de recherche')
+        verbose_name_plural = _('Termes de recherche')
+        unique_together = ('sermon', 'term')
+        indexes = [
+            models.Index(fields=['term', 'sermon', 'weight'], name='sermon_search_term_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.term} ({self.sermon_id})"
+
+class SermonDocument(models.Model):
+    """Métadonnées et texte extraits du PDF d'un sermon (voir sermons/services.py)"""
+    class Status(models.TextChoices):
+        PENDING = 'PENDING', _('En attente')
+        PROCESSING = 'PROCESSING', _('En cours')
+        DONE = 'DONE', _('Terminé')
+        FAILED = 'FAILED', _('Échoué')
+
+    sermon = models.OneToOneField(Sermon, on_delete=models.CASCADE, related_name='document')
+    source_name = models.CharField(_('Fichier source'), max_length=255, blank=True)
+    status = models.CharField(_('Statut'), max_length=20, choices=Status.choices, default=Status.PENDING)
+    page_count = models.PositiveIntegerField(_('Nombre de pages'), null=True, blank=True)
+    byte_size = models.PositiveBigIntegerField(_('Taille (octets)'), null=True, blank=True)
+    text_digest = models.CharField(_('Empreinte SHA-256 du texte'), max_length=64, blank=True)
+    error = models.TextField(_('Erreur'), blank=True)
+    extracted_at = models.DateTimeField(_('Extrait le'), null=True, blank=True)
+
+    # Optimisation post-upload (SERMON_PDF_OPTIMIZATION) : l'original est conservé
+    original_file = models.FileField(_('PDF original'), upload_to='sermons/pdfs/originals/', blank=True, null=True)
+    original_size = models.PositiveBigIntegerField(_('Taille originale (octets)'), null=True, blank=True)
+    optimized_size = models.PositiveBigIntegerField(_('Taille optimisée (octets)'), null=True, blank=True)
+    optimized_at = models.DateTimeField(_('Optimisé le'), null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = _('Document de sermon')
+        verbose_name_plural = _('Documents de sermons')
+
+    def __str__(self):
+        return f"PDF de {self.sermon_id} ({self.get_status_display()})"
+
+class SermonDocumentPage(models.Model):
+    document = models.ForeignKey(SermonDocument, on_delete=models.CASCADE, related_name='pages')
+    number = models.PositiveIntegerField(_('Page'))
+    text = models.TextField(_('Texte'), blank=True)
+
+    class Meta:
+        verbose_name = _('Page de document')
+        verbose_name_plural = _('Pages de documents')
+        ordering = ['number']
+        unique_together = ('document', 'number')
+
+    def __str__(self):
+        return f"Page {self.number} du document {self.document_id}"
+
+class SermonRelation(models.Model):
+    """Voisins précalculés d'un sermon (voir sermons/recommendations.py)"""
+    sermon = models.ForeignKey(Sermon, on_delete=models.CASCADE, related_name='relations')
+    related = models.ForeignKey(Sermon, on_delete=models.CASCADE, related_name='related_to')
+    score = models.FloatField(_('Score de similarité'))
+    rank = models.PositiveSmallIntegerField(_('Rang'))
+
+    class Meta:
+        verbose_name = _('Sermon similaire')
+        verbose_name_plural = _('Sermons similaires')
+        ordering = ['sermon', 'rank']
+        unique_together = ('sermon', 'related')
+        indexes = [
+            models.Index(fields=['sermon', 'rank'], name='sermon_relation_rank_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.sermon_id} -> {self.related_id} ({self.score:.3f})"
+
+class SermonFeed(models.Model):
+    """Flux RSS/podcast déjà rendu, régénéré seulement après modification d'un sermon"""
+    key = models.CharField(_('Clé'), max_length=300, unique=True)
+    content = models.TextField(_('Contenu XML'))
+    etag = models.CharField(_('ETag'), max_length=80)
+    generated_at = models.DateTimeField(_('Généré le'))
+
+    class Meta:
+        verbose_name = _('Flux RSS')
+        verbose_name_plural = _('Flux RSS')
+
+    def __str__(self):
+        return self.key
+
+
+class SermonProgress(models.Model):
+    """
+    Dernière position de lecture d'un membre sur un sermon (« Reprendre la lecture »).
+    Écrite par lots par sermons/progress.py, jamais directement par la requête.
+    """
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='sermon_progress')
+    sermon = models.ForeignKey(Sermon, on_delete=models.CASCADE, related_name='progress')
+    position = models.PositiveIntegerField(_('Position (s)'), default=0)
+    duration = models.PositiveIntegerField(_('Durée (s)'), null=True, blank=True)
+    completed = models.BooleanField(_('Terminé'), default=False)
+    last_watched_at = models.DateTimeField(_('Dernière lecture'))
+
+    class Meta:
+        verbose_name = _('Progression de lecture')
+        verbose_name_plural = _('Progressions de lecture')
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'sermon'], name='unique_sermon_progress'),
+        ]
+        indexes = [
+            # Liste « Reprendre la lecture » : WHERE user = ? AND completed = 0 ORDER BY last_watched_at DESC
+            models.Index(fields=['user', 'completed', '-last_watched_at'], name='sermon_progress_resume_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.user} - {self.sermon} ({self.position}s)"
@@ -0,0 +1,95 @@
+"""
+Progression de lecture des sermons (« Reprendre la lecture »).
+
+Le lecteur envoie la position toutes les quelques secondes. Les battements
+sont fusionnés en mémoire (seule la dernière position par couple membre /
+sermon est gardée) puis écrits périodiquement par un upsert groupé par lot
+(bulk_create avec update_conflicts : INSERT ... ON DUPLICATE KEY UPDATE sous
+MySQL, ON CONFLICT ailleurs). Si un lot est refusé pour une ligne invalide,
+il est réécrit ligne par ligne et les lignes refusées sont abandonnées : une
+seule valeur hors limites ne bloque pas la progression de tous les membres.
+"""
+import atexit
+import logging
+
+from django.db import DataError, IntegrityError, connection, transaction
+from django.utils import timezone
+
+from .counters import WriteBehindBuffer
+
+logger = logging.getLogger(__name__)
+
+# Au-delà de cette proportion de la durée, le sermon est considéré comme terminé
+COMPLETION_RATIO = 0.95
+BATCH_SIZE = 500
+# Erreurs propres à une ligne (valeur hors limites, contrainte) ; les autres
+# (base indisponible...) remontent et le lot entier est remis en attente
+REJECTED_ROW_ERRORS = (DataError, IntegrityError, OverflowError)
+
+
+def write_progress(pending):
+    """Positions {(user_id, sermon_id): (position, durée, date)} ; retourne (lignes écrites, rien à réessayer)"""
+    from .models import Sermon, SermonProgress
+
+    # Un sermon supprimé entre-temps ferait échouer tout le lot (clé étrangère)
+    existing = set(Sermon.objects.filter(pk__in={sermon_id for _, sermon_id in pending}).values_list('pk', flat=True))
+    rows = [
+        SermonProgress(
+            user_id=user_id, sermon_id=sermon_id, position=position, duration=duration,
+            completed=bool(duration) and position >= duration * COMPLETION_RATIO,
+            last_watched_at=watched_at,
+        )
+        for (user_id, sermon_id), (position, duration, watched_at) in pending.items()
+        if sermon_id in existing
+    ]
+    try:
+        with transaction.atomic():
+            upsert_progress(rows)
+    except REJECTED_ROW_ERRORS:
+        # Une ligne invalide fait échouer tout le lot : réécriture ligne par ligne
+        written = 0
+        for row in rows:
+            try:
+                with transaction.atomic():
+                    upsert_progress([row])
+                written += 1
+            except REJECTED_ROW_ERRORS:
+                logger.exception(
+                    "Progression abandonnée (membre %s, sermon %s, position %s)",
+                    row.user_id, row.sermon_id, row.position,
+                )
+        return written, {}
+    return len(rows), {}
+
+
+def upsert_progress(rows):
+    from .models import SermonProgress
+
+    options = {}
+    # MySQL (ON DUPLICATE KEY UPDATE) n'accepte pas de cible de conflit, PostgreSQL/SQLite l'exigent
+    if connection.features.supports_update_conflicts_with_target:
+        options['unique_fields'] = ['user', 'sermon']
+    SermonProgress.objects.bulk_create(
+        rows, batch_size=BATCH_SIZE, update_conflicts=True,
+        update_fields=['position', 'duration', 'completed', 'last_watched_at'], **options,
+    )
+
+
+class SermonProgressBuffer(WriteBehindBuffer):
+    def __init__(self):
+        super().__init__('sermon-progress', 'SERMON_PROGRESS_FLUSH_INTERVAL', write_progress)
+
+    def record(self, user_id, sermon_id, position, duration=None):
+        # La dernière position l'emporte ; un lot remis en attente n'écrase pas un battement plus récent
+        self.add((user_id, sermon_id), (position, duration, timezone.now()))
+
+
+progress = SermonProgressBuffer()
+
+
+@atexit.register
+def _flush_on_exit():
+    try:
+        progress.flush()
+    except Exception:
+        logger.exception("Progressions de lecture perdues à l'arrêt du processus")
@@ -0,0 +1,138 @@
+"""
+Sermons similaires (« Dans la même veine ») précalculés.
+
+Les vecteurs de termes sont ceux de l'index de recherche (SermonSearchTerm :
+titre, série, catégorie, description, texte du PDF). La similarité entre
+deux sermons est un produit scalaire pondéré par l'IDF des termes communs,
+normalisé par la norme des vecteurs. Les K meilleurs voisins de chaque
+sermon sont stockés dans SermonRelation : l'action `related` n'est plus
+qu'une lecture indexée. Seuls les sermons publiés y figurent : un sermon
+dépublié perd ses relations dans les deux sens (un sermon supprimé les perd
+par CASCADE).
+"""
+import heapq
+import math
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F, Q, Sum
+
+# Un terme présent dans plus de la moitié des sermons ne discrimine rien
+MAX_DF_RATIO = 0.5
+MIN_SERMONS_FOR_DF_CUTOFF = 10
+
+
+def idf(document_count, df):
+    return math.log(1 + document_count / df)
+
+
+def is_too_common(document_count, df):
+    return document_count >= MIN_SERMONS_FOR_DF_CUTOFF and df / document_count > MAX_DF_RATIO
+
+
+def top_neighbours(sermon_id, vector, postings, df, norms, document_count, k):
+    """K meilleurs voisins de `sermon_id` : liste de (score, autre_id) décroissante"""
+    dots = defaultdict(float)
+    for term, weight in vector.items():
+        if is_too_common(document_count, df[term]):
+            continue
+        term_idf = idf(document_count, df[term])
+        for other_id, other_weight in postings[term]:
+            if other_id != sermon_id:
+                dots[other_id] += weight * other_weight * term_idf * term_idf
+
+    norm = norms.get(sermon_id) or 1.0
+    scored = ((dot / (norm * (norms.get(other_id) or 1.0)), other_id) for other_id, dot in dots.items())
+    return heapq.nlargest(k, scored)
+
+
+def save_relations(sermon_id, neighbours):
+    from .models import SermonRelation
+
+    with transaction.atomic():
+        SermonRelation.objects.filter(sermon_id=sermon_id).delete()
+        SermonRelation.objects.bulk_create([
+            SermonRelation(sermon_id=sermon_id, related_id=other_id, score=score, rank=rank)
+            for rank, (score, other_id) in enumerate(neighbours, start=1)
+        ])
+
+
+def published_terms():
+    """Base commune du calcul complet et incrémental : termes des sermons publiés (même IDF)"""
+    from .models import SermonSearchTerm
+
+    return SermonSearchTerm.objects.filter(sermon__is_published=True)
+
+
+def rebuild_all(k=None):
+    """Recalcul complet (commande build_related_sermons) ; retourne le nombre de sermons traités"""
+    k = k or settings.SERMON_RELATED_COUNT
+    vectors = defaultdict(dict)
+    postings = defaultdict(list)
+    rows = published_terms().values_list('sermon_id', 'term', 'weight').iterator(chunk_size=5000)
+    for sermon_id, term, weight in rows:
+        vectors[sermon_id][term] = weight
+        postings[term].append((sermon_id, weight))
+
+    document_count = len(vectors)
+    df = {term: len(entries) for term, entries in postings.items()}
+    norms = {
+        sermon_id: math.sqrt(sum(w * w for w in vector.values()))
+        for sermon_id, vector in vectors.items()
+    }
+    for sermon_id, vector in vectors.items():
+        save_relations(sermon_id, top_neighbours(sermon_id, vector, postings, df, norms, document_count, k))
+    return document_count
+
+
+def update_for_sermon(sermon_id, k=None):
+    """
+    Recalcul incrémental après l'enregistrement d'un sermon : ses propres voisins,
+    puis son insertion dans la liste de ses voisins s'il y bat le moins bon.
+    """
+    from .models import Sermon, SermonRelation, SermonSearchTerm
+
+    k = k or settings.SERMON_RELATED_COUNT
+    if not Sermon.objects.filter(pk=sermon_id, is_published=True).exists():
+        SermonRelation.objects.filter(Q(sermon_id=sermon_id) | Q(related_id=sermon_id)).delete()
+        return []
+    vector = dict(SermonSearchTerm.objects.filter(sermon_id=sermon_id).values_list('term', 'weight'))
+    if not vector:
+        SermonRelation.objects.filter(sermon_id=sermon_id).delete()
+        return []
+
+    document_count = published_terms().values('sermon_id').distinct().count()
+    df = dict(
+        published_terms().filter(term__in=list(vector))
+        .values('term').annotate(df=Count('sermon')).values_list('term', 'df')
+    )
+    # Un sermon supprimé entre-temps n'a plus de termes : rien à recalculer
+    vector = {t: w for t, w in vector.items() if t in df}
+    useful_terms = [t for t in vector if not is_too_common(document_count, df[t])]
+
+    postings = defaultdict(list)
+    rows = published_terms().filter(term__in=useful_terms).values_list('sermon_id', 'term', 'weight')
+    for other_id, term, weight in rows:
+        postings[term].append((other_id, weight))
+
+    candidate_ids = {other_id for entries in postings.values() for other_id, _ in entries}
+    norms = {sermon_id: math.sqrt(sum(w * w for w in vector.values()))}
+    norm_rows = (
+        SermonSearchTerm.objects.filter(sermon_id__in=candidate_ids - {sermon_id})
+        .values('sermon_id').annotate(norm2=Sum(F('weight') * F('weight')))
+        .values_list('sermon_id', 'norm2')
+    )
+    norms.update((other_id, math.sqrt(norm2)) for other_id, norm2 in norm_rows)
+
+    neighbours = top_neighbours(sermon_id, vector, postings, df, norms, document_count, k)
+    save_relations(sermon_id, neighbours)
+
+    # Symétrie : le sermon entre dans le top-K de ses voisins s'il y a sa place
+    existing = defaultdict(list)
+    for relation in SermonRelation.objects.filter(sermon_id__in=[o for _, o in neighbours]):
+        existing[relation.sermon_id].append((relation.score, relation.related_id))
+    for score, other_id in neighbours:
+        current = [item for item in existing[other_id] if item[1] != sermon_id]
+        save_relations(other_id, heapq.nlargest(k, current + [(score, sermon_id)]))
+    return neighbours
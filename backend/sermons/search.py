@@ -0,0 +1,149 @@
+"""
+Index de recherche plein texte des sermons.
+
+Chaque sermon est découpé en termes normalisés (minuscules, sans accents,
+sans mots vides FR/EN) stockés dans SermonSearchTerm avec un poids par champ.
+Une recherche est une seule requête sur l'index (term, sermon), restreinte
+aux sermons retenus par les filtres de la vue : son coût dépend du nombre de
+sermons contenant les termes cherchés, pas de la taille des archives.
+"""
+import re
+import unicodedata
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import Count, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+TOKEN_RE = re.compile(r'[a-z0-9]+')
+MIN_TERM_LENGTH = 2
+MAX_TERM_LENGTH = 64
+# Plafond d'occurrences par champ : un mot répété 200 fois dans un PDF
+# ne doit pas écraser un titre
+MAX_TERM_FREQUENCY = 5
+
+FIELD_WEIGHTS = {
+    'title': 8,
+    'series': 4,
+    'pastor': 3,
+    'category': 2,
+    'description': 2,
+    'pdf_text': 1,
+}
+
+STOP_WORDS = frozenset("""
+    au aux avec ce ces dans de des du elle en et eux il ils je la le les leur
+    lui ma mais me meme mes moi mon ne nos notre nous on ou par pas pour qu que
+    qui sa se ses son sur ta te tes toi ton tu un une vos votre vous est sont
+    etre avoir cette cet ca comme plus tout tous
+    a an and are as at be by for from has he in is it its of on or that the
+    this to was were will with you your
+""".split())
+
+
+def normalize(text):
+    """Minuscules et suppression des accents : 'Pâques' -> 'paques'"""
+    decomposed = unicodedata.normalize('NFKD', text or '')
+    stripped = ''.join(c for c in decomposed if not unicodedata.combining(c))
+    return stripped.lower()
+
+
+def stem(token):
+    """Racinisation minimale commune FR/EN : pluriels en -s / -x"""
+    if len(token) > 3 and token[-1] in 'sx' and not token.endswith('ss'):
+        return token[:-1]
+    return token
+
+
+def tokenize(text):
+    terms = []
+    for token in TOKEN_RE.findall(normalize(text)):
+        if len(token) < MIN_TERM_LENGTH or token in STOP_WORDS:
+            continue
+        terms.append(stem(token)[:MAX_TERM_LENGTH])
+    return terms
+
+
+def get_document_fields(sermon):
+    """Textes indexés pour un sermon, par champ"""
+    pastor = sermon.pastor
+    return {
+        'title': sermon.title,
+        'series': sermon.series or '',
+        'pastor': f"{pastor.first_name} {pastor.last_name} {pastor.username}",
+        'category': str(sermon.get_category_display()),
+        'description': sermon.description,
+    }
+
+
+def iter_pdf_text(sermon):
+    """Texte extrait du PDF, page par page (vide tant que l'extraction n'a pas eu lieu)"""
+    from .models import SermonDocumentPage
+
+    pages = SermonDocumentPage.objects.filter(document__sermon=sermon).order_by('number')
+    return pages.values_list('text', flat=True).iterator(chunk_size=50)
+
+
+def compute_term_weights(sermon):
+    weights = Counter()
+    for field, text in get_document_fields(sermon).items():
+        for term, count in Counter(tokenize(text)).items():
+            weights[term] += FIELD_WEIGHTS[field] * min(count, MAX_TERM_FREQUENCY)
+
+    pdf_counts = Counter()
+    for text in iter_pdf_text(sermon):
+        pdf_counts.update(tokenize(text))
+    for term, count in pdf_counts.items():
+        weights[term] += FIELD_WEIGHTS['pdf_text'] * min(count, MAX_TERM_FREQUENCY)
+    return weights
+
+
+def index_sermon(sermon):
+    """(Ré)indexe un sermon : remplace toutes ses entrées dans l'index"""
+    from .models import SermonSearchTerm
+
+    weights = compute_term_weights(sermon)
+    with transaction.atomic():
+        SermonSearchTerm.objects.filter(sermon=sermon).delete()
+        SermonSearchTerm.objects.bulk_create([
+            SermonSearchTerm(sermon=sermon, term=term, weight=weight)
+            for term, weight in weights.items()
+        ])
+
+
+def rank_queryset(queryset, query, limit=None, contains_fields=()):
+    """
+    Restreint `queryset` (déjà filtré par la vue) aux sermons correspondant à
+    `query`, triés par pertinence : d'abord le nombre de termes trouvés, puis
+    la somme des poids. Le filtre de la vue s'applique avant `limit` : une
+    recherche filtrée par catégorie ne perd pas de résultats.
+
+    `contains_fields` ajoute une correspondance partielle (icontains) sur ces
+    champs, pour la saisie en cours dans l'administration (« pard »). Ces
+    sermons viennent après ceux trouvés par l'index.
+    """
+    from .models import SermonSearchTerm
+
+    terms = list(dict.fromkeys(tokenize(query)))
+    condition = Q(pk__in=SermonSearchTerm.objects.filter(term__in=terms).values('sermon_id')) if terms else Q()
+    contains = Q()
+    for field in contains_fields:
+        contains |= Q(**{f'{field}__icontains': query.strip()})
+    if contains:
+        condition = condition | contains if terms else contains
+    elif not terms:
+        return queryset.none()
+
+    matches = (
+        SermonSearchTerm.objects.filter(term__in=terms, sermon=OuterRef('pk'))
+        .values('sermon').annotate(matched=Count('term'), score=Sum('weight'))
+    )
+    queryset = (
+        queryset.filter(condition)
+        .annotate(
+            search_matched=Coalesce(Subquery(matches.values('matched')), 0),
+            search_score=Coalesce(Subquery(matches.values('score')), 0),
+        )
+        .order_by('-search_matched', '-search_score', '-pk')
+    )
+    return queryset[:limit] if limit else queryset
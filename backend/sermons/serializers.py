@@ -1,9 +1,26 @@
 from rest_framework import serializers
-from .models import Sermon, SermonComment
+from .models import Sermon, SermonComment, SermonProgress, SermonSeries
 from django.contrib.auth import get_user_model
 
 User = get_user_model()
 
+class AbsoluteURLField(serializers.Field):
+    """Chemin stocké rendu absolu ; la base de l'URL est calculée une fois par requête"""
+
+    def to_representation(self, value):
+        if not value:
+            return None
+        if '://' in value:
+            return value
+        request = self.context.get('request')
+        if request is None:
+            return value
+        base = self.context.get('_absolute_url_base')
+        if base is None:
+            base = self.context['_absolute_url_base'] = request.build_absolute_uri('/').rstrip('/')
+        return f"{base}{value}"
+
+
 class SermonCommentSerializer(serializers.ModelSerializer):
     user_name = serializers.ReadOnlyField(source='user.username')
 
@@ -15,35 +32,75 @@ class SermonCommentSerializer(serializers.ModelSerializer):
 class SermonSerializer(serializers.ModelSerializer):
     pastor_name = serializers.ReadOnlyField(source='pastor.username')
     comments = SermonCommentSerializer(many=True, read_only=True)
-    thumbnail = serializers.SerializerMethodField()
-    date = serializers.SerializerMethodField()
-    youtube_id = serializers.SerializerMethodField()
+    # Colonnes calculées à l'enregistrement (Sermon.refresh_derived_fields)
+    thumbnail = AbsoluteURLField(read_only=True)
+    date = serializers.DateTimeField(source='created_at', format='%d %B %Y', read_only=True)
+    youtube_id = serializers.ReadOnlyField()
+    # Nombre de pages du PDF (null tant que l'extraction n'est pas terminée)
+    page_count = serializers.ReadOnlyField(source='document.page_count')
 
     class Meta:
         model = Sermon
         fields = (
-            'id', 'title', 'description', 'slug', 'pastor', 'pastor_name', 'category',
-            'youtube_url', 'pdf_file', 'cover_image', 'thumbnail', 'date', 'youtube_id',
-            'is_published', 'created_at', 'updated_at', 'comments'
+            'id', 'title', 'description', 'slug', 'pastor', 'pastor_name', 'category', 'series',
+            'youtube_url', 'pdf_file', 'page_count', 'cover_image', 'thumbnail', 'date', 'youtube_id',
+            'is_published', 'comment_count', 'view_count', 'download_count', 'youtube_click_count',
+            'created_at', 'updated_at', 'comments'
+        )
+        read_only_fields = (
+            'slug', 'pastor', 'comment_count', 'view_count', 'download_count', 'youtube_click_count',
+            'created_at', 'updated_at'
+        )
+
+
+class SermonListSerializer(SermonSerializer):
+    """
+    Représentation allégée pour le catalogue : pas de commentaires imbriqués,
+    seulement leur nombre (colonne dénormalisée `comment_count`).
+    Les commentaires se lisent via /api/sermons/{id}/comments/.
+    """
+
+    class Meta(SermonSerializer.Meta):
+        fields = (
+            'id', 'title', 'description', 'slug', 'pastor', 'pastor_name', 'category', 'series',
+            'youtube_url', 'pdf_file', 'page_count', 'cover_image', 'thumbnail', 'date', 'youtube_id',
+            'is_published', 'comment_count', 'view_count', 'download_count', 'youtube_click_count',
+            'created_at', 'updated_at'
         )
-        read_only_fields = ('slug', 'pastor', 'created_at', 'updated_at')
-
-    def get_thumbnail(self, obj):
-        if obj.cover_image:
-            request = self.context.get('request')
-            if request:
-                return request.build_absolute_uri(obj.cover_image.url)
-            return obj.cover_image.url
-        return None
-
-    def get_date(self, obj):
-        return obj.created_at.strftime('%d %B %Y')
-
-    def get_youtube_id(self, obj):
-        if obj.youtube_url:
-            # Simple extraction for youtube.com/watch?v= or youtu.be/
-            if "v=" in obj.youtube_url:
-                return obj.youtube_url.split("v=")[1].split("&")[0]
-            elif "youtu.be/" in obj.youtube_url:
-                return obj.youtube_url.split("/")[-1]
-        return None
+
+
+class SermonSeriesSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = SermonSeries
+        fields = ('id', 'title', 'slug', 'description', 'sermon_count', 'latest_sermon_at')
+
+
+class SermonSeriesDetailSerializer(SermonSeriesSerializer):
+    """Série avec le résumé de ses sermons publiés (préchargés, ordre chronologique)"""
+    sermons = SermonListSerializer(many=True, read_only=True, source='published_sermons')
+
+    class Meta(SermonSeriesSerializer.Meta):
+        fields = SermonSeriesSerializer.Meta.fields + ('sermons',)
+
+
+class SermonProgressSerializer(serializers.ModelSerializer):
+    sermon = SermonListSerializer(read_only=True)
+
+    class Meta:
+        model = SermonProgress
+        fields = ('sermon', 'position', 'duration', 'last_watched_at')
+
+
+class ProgressHeartbeatSerializer(serializers.Serializer):
+    """Un battement de lecture : position courante (s) dans la vidéo du sermon"""
+    # Aucune vidéo ne dépasse 24 h ; borne bien en deçà d'un INT UNSIGNED MySQL
+    MAX_SECONDS = 24 * 3600
+
+    sermon = serializers.IntegerField(min_value=1)
+    position = serializers.IntegerField(min_value=0, max_value=MAX_SECONDS)
+    duration = serializers.IntegerField(min_value=1, max_value=MAX_SECONDS, required=False, allow_null=True)
+
+    def validate(self, attrs):
+        if attrs.get('duration') and attrs['position'] > attrs['duration']:
+            raise serializers.ValidationError({'position': "La position dépasse la durée de la vidéo."})
+        return attrs
@@ -0,0 +1,550 @@
+import csv
+import hashlib
+import io
+import json
+import logging
+import os
+import shutil
+import tempfile
+from datetime import datetime, time
+from functools import reduce
+from operator import or_
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.files import File
+from django.core.validators import URLValidator
+from django.db import IntegrityError, transaction
+from django.db.models import Count, Max, Q
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from django.utils.text import slugify
+from PyPDF2 import PdfReader, PdfWriter
+
+from .models import Sermon, SermonDocument, SermonDocumentPage, SermonSeries
+from .youtube import parse_youtube_id
+from .search import index_sermon
+from .recommendations import rebuild_all, update_for_sermon
+from .feeds import invalidate_feeds
+from .facets import invalidate_facets
+from cyprus_api.tasks import run_in_background
+
+logger = logging.getLogger(__name__)
+
+
+class PDFExtractionService:
+    # Pages écrites par lots : la mémoire reste bornée quel que soit le PDF
+    PAGE_BATCH_SIZE = 20
+
+    @staticmethod
+    def needs_extraction(sermon):
+        """Nouveau PDF, PDF remplacé, ou PDF retiré dont le texte est encore indexé"""
+        document = SermonDocument.objects.filter(sermon=sermon).only('source_name', 'status').first()
+        if not sermon.pdf_file:
+            return document is not None
+        return document is None or document.source_name != sermon.pdf_file.name
+
+    @staticmethod
+    def extract(sermon_id, force=False):
+        """
+        Extrait page par page le texte du PDF d'un sermon, puis réindexe le sermon
+        pour que le texte du PDF soit cherchable. Retourne le SermonDocument.
+        """
+        sermon = Sermon.objects.select_related('pastor').filter(pk=sermon_id).first()
+        if sermon is None:
+            return None
+        if not sermon.pdf_file:
+            # PDF retiré : pages supprimées (CASCADE), texte retiré de l'index et des voisins
+            SermonDocument.objects.filter(sermon=sermon).delete()
+            index_sermon(sermon)
+            update_for_sermon(sermon.pk)
+            return None
+
+        document, _ = SermonDocument.objects.get_or_create(sermon=sermon)
+        source_name = sermon.pdf_file.name
+        if (not force and document.status == SermonDocument.Status.DONE
+                and document.source_name == source_name):
+            return document
+
+        document.status = SermonDocument.Status.PROCESSING
+        document.source_name = source_name
+        document.save(update_fields=['status', 'source_name', 'updated_at'])
+
+        try:
+            with transaction.atomic():
+                page_count, digest = PDFExtractionService._store_pages(document, sermon.pdf_file)
+                document.page_count = page_count
+                document.text_digest = digest
+                document.byte_size = sermon.pdf_file.size
+                document.status = SermonDocument.Status.DONE
+                document.error = ''
+                document.extracted_at = timezone.now()
+                document.save()
+        except Exception as e:
+            logger.warning(f"Extraction PDF impossible pour le sermon {sermon_id}: {e}")
+            document.status = SermonDocument.Status.FAILED
+            document.error = str(e)[:1000]
+            document.save(update_fields=['status', 'error', 'updated_at'])
+            return document
+
+        index_sermon(sermon)
+        update_for_sermon(sermon.pk)
+        return document
+
+    @staticmethod
+    def _store_pages(document, pdf_file):
+        SermonDocumentPage.objects.filter(document=document).delete()
+        digest = hashlib.sha256()
+        page_count = 0
+        batch = []
+        with pdf_file.open('rb') as stream:
+            reader = PdfReader(stream)
+            for number, page in enumerate(reader.pages, start=1):
+                text = (page.extract_text() or '').replace('\x00', '')
+                digest.update(text.encode('utf-8'))
+                batch.append(SermonDocumentPage(document=document, number=number, text=text))
+                page_count = number
+                if len(batch) >= PDFExtractionService.PAGE_BATCH_SIZE:
+                    SermonDocumentPage.objects.bulk_create(batch)
+                    batch = []
+        SermonDocumentPage.objects.bulk_create(batch)
+        return page_count, digest.hexdigest()
+
+
+class PDFOptimizationService:
+    # Au-delà, le fichier réécrit déborde du tampon mémoire vers le disque
+    SPOOL_MAX_SIZE = 8 * 1024 * 1024
+
+    @staticmethod
+    def optimize(sermon_id):
+        """
+        Réécrit le PDF d'un sermon avec PyPDF2 : flux de contenu compressés, seuls
+        les objets atteignables écrits (révisions orphelines retirées, ressources
+        partagées écrites une fois). Le fichier d'origine est conservé dans
+        SermonDocument.original_file ; en cas d'erreur ou de gain nul, rien ne change.
+        """
+        sermon = Sermon.objects.filter(pk=sermon_id).first()
+        if sermon is None or not sermon.pdf_file:
+            return None
+
+        document, _ = SermonDocument.objects.get_or_create(sermon=sermon)
+        source_name = sermon.pdf_file.name
+        original_size = sermon.pdf_file.size
+
+        with tempfile.SpooledTemporaryFile(max_size=PDFOptimizationService.SPOOL_MAX_SIZE) as output:
+            try:
+                with sermon.pdf_file.open('rb') as stream:
+                    reader = PdfReader(stream, strict=False)
+                    writer = PdfWriter()
+                    for page in reader.pages:
+                        # Compresser avant add_page : sinon PyPDF2 écrit aussi l'ancien flux
+                        page.compress_content_streams()
+                        writer.add_page(page)
+                    if reader.metadata:
+                        writer.add_metadata(reader.metadata)
+                    writer.write(output)
+            except Exception as e:
+                logger.warning(f"Optimisation PDF ignorée pour le sermon {sermon_id}: {e}")
+                return document
+
+            optimized_size = output.tell()
+            document.original_size = original_size
+            document.optimized_size = min(optimized_size, original_size)
+            document.optimized_at = timezone.now()
+            if optimized_size >= original_size:
+                document.save(update_fields=['original_size', 'optimized_size', 'optimized_at', 'updated_at'])
+                return document
+
+            output.seek(0)
+            stem, _ = os.path.splitext(os.path.basename(source_name))
+            storage = sermon.pdf_file.storage
+            new_name = storage.save(f"sermons/pdfs/{stem}_opt.pdf", File(output))
+
+        with transaction.atomic():
+            # update() : pas de post_save, donc pas de nouveau passage dans le pipeline
+            updated = Sermon.objects.filter(pk=sermon_id, pdf_file=source_name).update(
+                pdf_file=new_name, updated_at=timezone.now()
+            )
+            if updated:
+                # L'original reste sur le stockage, simplement référencé ailleurs ; le
+                # document suit le fichier servi (extraction à refaire sur celui-ci)
+                document.original_file.name = source_name
+                document.source_name = new_name
+                document.status = SermonDocument.Status.PENDING
+                document.save(update_fields=[
+                    'original_file', 'source_name', 'status',
+                    'original_size', 'optimized_size', 'optimized_at', 'updated_at',
+                ])
+        if not updated:
+            # Sermon modifié entre-temps : le fichier optimisé ne sert plus à rien
+            storage.delete(new_name)
+            return document
+        # L'URL de l'enclosure a changé
+        invalidate_feeds()
+        return document
+
+
+class PDFPageService:
+    """
+    Découpe du PDF d'un sermon en petits PDF autonomes (une page ou une plage),
+    mis en cache sur disque. Le dossier de cache dépend de Sermon.updated_at :
+    toute modification du sermon invalide les pages déjà découpées.
+    """
+
+    @staticmethod
+    def get_page_count(sermon):
+        try:
+            document = sermon.document
+        except SermonDocument.DoesNotExist:
+            document = None
+        if document and document.status == SermonDocument.Status.DONE and document.page_count:
+            return document.page_count
+        with sermon.pdf_file.open('rb') as stream:
+            return len(PdfReader(stream, strict=False).pages)
+
+    @staticmethod
+    def get_cache_dir(sermon):
+        version = int(sermon.updated_at.timestamp() * 1000)
+        return os.path.join(settings.SERMON_PAGE_CACHE_DIR, str(sermon.pk), str(version))
+
+    @staticmethod
+    def get_pages_file(sermon, first, last):
+        """Chemin d'un PDF contenant les pages first..last (1-indexées, incluses)"""
+        cache_dir = PDFPageService.get_cache_dir(sermon)
+        path = os.path.join(cache_dir, f"{first}-{last}.pdf")
+        if os.path.exists(path):
+            return path
+
+        # Nouvelle version du sermon : les anciennes découpes ne servent plus
+        sermon_dir = os.path.dirname(cache_dir)
+        if os.path.isdir(sermon_dir):
+            for entry in os.listdir(sermon_dir):
+                if entry != os.path.basename(cache_dir):
+                    shutil.rmtree(os.path.join(sermon_dir, entry), ignore_errors=True)
+        os.makedirs(cache_dir, exist_ok=True)
+
+        with sermon.pdf_file.open('rb') as stream:
+            reader = PdfReader(stream, strict=False)
+            writer = PdfWriter()
+            for index in range(first - 1, last):
+                writer.add_page(reader.pages[index])
+            # Écriture dans un fichier temporaire puis renommage atomique :
+            # deux requêtes concurrentes ne voient jamais un PDF à moitié écrit
+            fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix='.tmp')
+            with os.fdopen(fd, 'wb') as output:
+                writer.write(output)
+        os.replace(tmp_path, path)
+        return path
+
+
+def process_uploaded_pdf(sermon_id):
+    """Pipeline post-upload : optimisation (optionnelle) puis extraction"""
+    if settings.SERMON_PDF_OPTIMIZATION:
+        PDFOptimizationService.optimize(sermon_id)
+    return PDFExtractionService.extract(sermon_id)
+
+
+class SlugService:
+    """
+    Attribution de slugs uniques. Les slugs déjà pris sont lus en une passe
+    (une requête par lot de titres) au lieu d'un `exists()` par collision ;
+    la contrainte UNIQUE reste l'arbitre final en cas de création concurrente.
+    """
+    # Place laissée au suffixe "-N" dans le SlugField (50 caractères)
+    BASE_LENGTH = Sermon._meta.get_field('slug').max_length - 8
+    QUERY_CHUNK = 200
+    MAX_ATTEMPTS = 3
+
+    @staticmethod
+    def base_slug(title):
+        return slugify(title)[:SlugService.BASE_LENGTH].strip('-') or 'sermon'
+
+    @staticmethod
+    def taken_slugs(bases, model=Sermon):
+        """Slugs existants de la forme `base` ou `base-N` pour les bases données"""
+        bases = list(set(bases))
+        taken = set()
+        for start in range(0, len(bases), SlugService.QUERY_CHUNK):
+            chunk = bases[start:start + SlugService.QUERY_CHUNK]
+            condition = reduce(or_, (Q(slug__startswith=f'{base}-') for base in chunk), Q(slug__in=chunk))
+            taken.update(model.objects.filter(condition).values_list('slug', flat=True))
+        return taken
+
+    @staticmethod
+    def allocate(titles, taken=None, model=Sermon):
+        """Un slug unique par titre, dans l'ordre, y compris entre titres identiques du lot"""
+        bases = [SlugService.base_slug(title) for title in titles]
+        if taken is None:
+            taken = SlugService.taken_slugs(bases, model)
+        next_suffix = {}
+        slugs = []
+        for base in bases:
+            slug = base
+            if slug in taken:
+                counter = next_suffix.get(base, 1)
+                while f"{base}-{counter}" in taken:
+                    counter += 1
+                slug = f"{base}-{counter}"
+                next_suffix[base] = counter + 1
+            taken.add(slug)
+            slugs.append(slug)
+        return slugs
+
+    @staticmethod
+    def save_with_unique_slug(serializer, **kwargs):
+        """serializer.save() avec un slug libre ; nouvel essai si un autre processus l'a pris entre-temps"""
+        title = serializer.validated_data.get('title')
+        for attempt in range(1, SlugService.MAX_ATTEMPTS + 1):
+            slug = SlugService.allocate([title])[0]
+            try:
+                with transaction.atomic():
+                    return serializer.save(slug=slug, **kwargs)
+            except IntegrityError:
+                if attempt == SlugService.MAX_ATTEMPTS or not Sermon.objects.filter(slug=slug).exists():
+                    raise
+
+
+class SermonSeriesService:
+    """Fiches de séries rattachées au champ texte Sermon.series, et leurs agrégats stockés"""
+
+    @staticmethod
+    def get_or_create(title):
+        title = title.strip()
+        # iexact : même comportement que la collation insensible à la casse de MySQL
+        series = SermonSeries.objects.filter(title__iexact=title).first()
+        if series is not None:
+            return series
+        for attempt in range(1, SlugService.MAX_ATTEMPTS + 1):
+            slug = SlugService.allocate([title], model=SermonSeries)[0]
+            try:
+                with transaction.atomic():
+                    return SermonSeries.objects.create(title=title, slug=slug)
+            except IntegrityError:
+                # Créée entre-temps par une autre requête, ou slug pris : relire puis réessayer
+                series = SermonSeries.objects.filter(title__iexact=title).first()
+                if series is not None:
+                    return series
+                if attempt == SlugService.MAX_ATTEMPTS:
+                    raise
+
+    @staticmethod
+    def refresh_aggregates(series_ids):
+        """Recalcule sermon_count et latest_sermon_at (sermons publiés) : une requête groupée + un UPDATE par série"""
+        series_ids = {series_id for series_id in series_ids if series_id}
+        if not series_ids:
+            return
+        stats = {
+            row['series_ref']: row
+            for row in Sermon.objects.filter(series_ref__in=series_ids, is_published=True)
+            .values('series_ref').annotate(count=Count('id'), latest=Max('created_at')).order_by()
+        }
+        now = timezone.now()
+        for series_id in series_ids:
+            row = stats.get(series_id, {})
+            SermonSeries.objects.filter(pk=series_id).update(
+                sermon_count=row.get('count', 0), latest_sermon_at=row.get('latest'), updated_at=now
+            )
+
+
+class SermonImportService:
+    """
+    Import en masse des archives (export CSV/JSON de la chaîne YouTube).
+
+    Les slugs de chaque lot sont attribués en une passe, les sermons insérés par
+    `bulk_create` dans une transaction ; si une création concurrente prend un
+    slug entre-temps, le lot est annulé puis rejoué avec les slugs relus.
+    `bulk_create` ne déclenchant pas les signaux, l'index de recherche est
+    alimenté ici, les flux RSS et compteurs de filtres invalidés et les sermons
+    similaires recalculés une seule fois en fin d'import.
+    """
+    BATCH_SIZE = 200
+
+    # Colonnes acceptées, y compris celles de l'export YouTube (Google Takeout)
+    FIELD_ALIASES = {
+        'title': 'title',
+        'video_title': 'title',
+        'description': 'description',
+        'video_description': 'description',
+        'youtube_url': 'youtube_url',
+        'url': 'youtube_url',
+        'video_url': 'youtube_url',
+        'video_id': 'video_id',
+        'published_at': 'date',
+        'date': 'date',
+        'publish_date': 'date',
+        'video_publish_timestamp': 'date',
+        'video_create_timestamp': 'date',
+        'category': 'category',
+        'series': 'series',
+        'playlist': 'series',
+        'is_published': 'is_published',
+    }
+    TRUE_VALUES = {'1', 'true', 'yes', 'oui'}
+    FALSE_VALUES = {'0', 'false', 'no', 'non'}
+
+    @staticmethod
+    def parse(content, format=None):
+        """Lignes (dicts) d'un export CSV ou JSON ; `content` est du texte ou des octets"""
+        if isinstance(content, bytes):
+            content = content.decode('utf-8-sig')
+        format = format or ('json' if content.lstrip()[:1] in ('[', '{') else 'csv')
+        if format == 'json':
+            data = json.loads(content)
+            if isinstance(data, dict):
+                data = data.get('sermons', [])
+            if not isinstance(data, list):
+                raise ValueError("Le JSON doit être une liste de sermons")
+            return data
+        return list(csv.DictReader(io.StringIO(content)))
+
+    @staticmethod
+    def normalize_row(raw):
+        """Champs du modèle Sermon pour une ligne ; ValueError si la ligne est inutilisable"""
+        if not isinstance(raw, dict):
+            raise ValueError("Ligne invalide")
+        row = {}
+        for key, value in raw.items():
+            name = str(key).replace('(original)', '').strip().lower().replace(' ', '_')
+            field = SermonImportService.FIELD_ALIASES.get(name)
+            if not field or value in (None, '') or field in row:
+                continue
+            # JSON : nombres et booléens ramenés au texte, listes et objets refusés
+            if isinstance(value, (dict, list)):
+                raise ValueError(f"Valeur invalide pour {field}")
+            row[field] = str(value).strip()
+
+        title = row.get('title')
+        if not title:
+            raise ValueError("Titre manquant")
+
+        youtube_url = row.get('youtube_url')
+        if not youtube_url and row.get('video_id'):
+            youtube_url = f"https://www.youtube.com/watch?v={row['video_id']}"
+        if youtube_url:
+            try:
+                URLValidator()(youtube_url)
+            except ValidationError:
+                raise ValueError(f"Lien YouTube invalide : {youtube_url}")
+
+        # MySQL strict refuserait la ligne (DataError) et ferait échouer tout le lot
+        for field, value in (('title', title), ('youtube_url', youtube_url), ('series', row.get('series'))):
+            if value and len(value) > Sermon._meta.get_field(field).max_length:
+                raise ValueError(f"Valeur trop longue pour {field}")
+
+        category = row.get('category') or Sermon.Category.SUNDAY_SERVICE
+        if category not in Sermon.Category.values:
+            raise ValueError(f"Catégorie inconnue : {category}")
+
+        is_published = str(row.get('is_published', 'true')).lower()
+        if is_published not in SermonImportService.TRUE_VALUES | SermonImportService.FALSE_VALUES:
+            raise ValueError(f"Valeur is_published invalide : {is_published}")
+
+        return {
+            'title': title,
+            'description': row.get('description', ''),
+            'youtube_url': youtube_url or None,
+            'series': row.get('series') or None,
+            'category': category,
+            'is_published': is_published in SermonImportService.TRUE_VALUES,
+            'created_at': SermonImportService.parse_timestamp(row.get('date')),
+        }
+
+    @staticmethod
+    def parse_timestamp(value):
+        if not value:
+            return None
+        parsed = parse_datetime(value)
+        if parsed is None:
+            day = parse_date(value)
+            if day is None:
+                raise ValueError(f"Date invalide : {value}")
+            parsed = datetime.combine(day, time.min)
+        if timezone.is_naive(parsed):
+            parsed = timezone.make_aware(parsed)
+        return parsed
+
+    @staticmethod
+    def import_rows(rows, pastor, batch_size=None):
+        """
+        Importe les lignes ; retourne {'created', 'skipped', 'errors'}.
+        Les vidéos déjà présentes (même identifiant YouTube) sont ignorées, ce qui
+        permet de relancer l'import d'un export plus récent.
+        """
+        batch_size = batch_size or SermonImportService.BATCH_SIZE
+        result = {'created': 0, 'skipped': 0, 'errors': []}
+
+        entries = []
+        for number, raw in enumerate(rows, start=1):
+            try:
+                entries.append(SermonImportService.normalize_row(raw))
+            except ValueError as e:
+                result['errors'].append({'row': number, 'error': str(e)})
+
+        # Doublons repérés par identifiant de vidéo, quelle que soit la forme du lien
+        video_ids = [parse_youtube_id(entry['youtube_url']) for entry in entries]
+        wanted = [video_id for video_id in video_ids if video_id]
+        known_ids = set()
+        for start in range(0, len(wanted), SlugService.QUERY_CHUNK):
+            known_ids.update(
+                Sermon.objects.filter(youtube_id__in=wanted[start:start + SlugService.QUERY_CHUNK])
+                .values_list('youtube_id', flat=True)
+            )
+        fresh = []
+        for entry, video_id in zip(entries, video_ids):
+            if video_id in known_ids:
+                result['skipped'] += 1
+                continue
+            if video_id:
+                known_ids.add(video_id)
+            fresh.append(entry)
+
+        for start in range(0, len(fresh), batch_size):
+            result['created'] += SermonImportService._import_batch(fresh[start:start + batch_size], pastor)
+
+        if result['created']:
+            invalidate_feeds()
+            invalidate_facets()
+            run_in_background(rebuild_all)
+        return result
+
+    @staticmethod
+    def _import_batch(entries, pastor):
+        for attempt in range(1, SlugService.MAX_ATTEMPTS + 1):
+            slugs = SlugService.allocate([entry['title'] for entry in entries])
+            try:
+                with transaction.atomic():
+                    return SermonImportService._insert(entries, slugs, pastor)
+            except IntegrityError:
+                if attempt == SlugService.MAX_ATTEMPTS:
+                    raise
+                logger.info("Collision de slug pendant l'import, nouvel essai du lot")
+
+    @staticmethod
+    def _insert(entries, slugs, pastor):
+        sermons = [
+            Sermon(pastor=pastor, slug=slug, **{k: v for k, v in entry.items() if k != 'created_at'})
+            for entry, slug in zip(entries, slugs)
+        ]
+        series = {}
+        for sermon in sermons:
+            sermon.refresh_derived_fields()
+            if sermon.series:
+                key = sermon.series.strip().lower()
+                if key not in series:
+                    series[key] = SermonSeriesService.get_or_create(sermon.series)
+                sermon.series_ref = series[key]
+        Sermon.objects.bulk_create(sermons)
+        # created_at est en auto_now_add : la date d'origine est posée après l'insertion.
+        # Relecture par slug (unique) : MySQL ne renvoie pas les clés d'un INSERT multiple.
+        created = {s.slug: s for s in Sermon.objects.filter(slug__in=slugs).select_related('pastor')}
+        dated = []
+        for entry, slug in zip(entries, slugs):
+            sermon = created[slug]
+            if entry['created_at']:
+                sermon.created_at = entry['created_at']
+                dated.append(sermon)
+        Sermon.objects.bulk_update(dated, ['created_at'], batch_size=SlugService.QUERY_CHUNK)
+        for sermon in created.values():
+            index_sermon(sermon)
+        SermonSeriesService.refresh_aggregates(item.pk for item in series.values())
+        return len(created)
@@ -0,0 +1,96 @@
+from django.db import transaction
+from django.db.models import F
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+from .models import Sermon, SermonComment
+from .search import index_sermon
+from .recommendations import update_for_sermon
+from .feeds import invalidate_feeds
+from .facets import invalidate_facets
+from .services import PDFExtractionService, SermonSeriesService, process_uploaded_pdf
+from cyprus_api.tasks import run_in_background
+
+
+@receiver(post_save, sender=SermonComment)
+def increment_comment_count(sender, instance, created, **kwargs):
+    """Compteur dénormalisé : UPDATE atomique, sans relire les commentaires"""
+    if created:
+        Sermon.objects.filter(pk=instance.sermon_id).update(comment_count=F('comment_count') + 1)
+
+
+@receiver(post_delete, sender=SermonComment)
+def decrement_comment_count(sender, instance, **kwargs):
+    Sermon.objects.filter(pk=instance.sermon_id, comment_count__gt=0).update(
+        comment_count=F('comment_count') - 1
+    )
+
+
+@receiver(post_save, sender=Sermon)
+def update_search_index(sender, instance, raw=False, **kwargs):
+    """
+    Réindexe le sermon à chaque enregistrement, puis recalcule ses sermons
+    similaires en arrière-plan. La suppression n'a rien à faire : les entrées
+    de SermonSearchTerm et SermonRelation partent avec le sermon (CASCADE).
+    """
+    if raw:
+        return
+    index_sermon(instance)
+    run_in_background(update_for_sermon, instance.pk)
+
+
+@receiver(post_save, sender=Sermon)
+def schedule_pdf_extraction(sender, instance, raw=False, **kwargs):
+    """Nouveau PDF (ou PDF remplacé, ou retiré) : optimisation et extraction après la réponse HTTP"""
+    if raw:
+        return
+    if PDFExtractionService.needs_extraction(instance):
+        run_in_background(process_uploaded_pdf, instance.pk)
+
+
+@receiver(post_save, sender=Sermon)
+@receiver(post_delete, sender=Sermon)
+def invalidate_sermon_feeds(sender, instance, raw=False, **kwargs):
+    """
+    Les flux RSS stockés seront régénérés à la prochaine lecture, après le
+    commit : sinon un lecteur concurrent stockerait à nouveau l'ancien flux
+    """
+    if raw:
+        return
+    transaction.on_commit(invalidate_feeds)
+
+
+@receiver(post_save, sender=Sermon)
+@receiver(post_delete, sender=Sermon)
+def invalidate_sermon_facets(sender, instance, raw=False, **kwargs):
+    """Après le commit : un lecteur concurrent ne peut pas remettre en cache l'état d'avant"""
+    if raw:
+        return
+    transaction.on_commit(invalidate_facets)
+
+
+@receiver(pre_save, sender=Sermon)
+def assign_series(sender, instance, raw=False, update_fields=None, **kwargs):
+    """Rattache le sermon à la fiche de sa série (créée au besoin) d'après le champ texte"""
+    instance._previous_series_ref_id = instance.series_ref_id
+    if raw or (update_fields is not None and 'series' not in update_fields):
+        return
+    title = (instance.series or '').strip()
+    if not title:
+        instance.series_ref = None
+    elif instance.series_ref is None or instance.series_ref.title.lower() != title.lower():
+        instance.series_ref = SermonSeriesService.get_or_create(title)
+
+
+@receiver(post_save, sender=Sermon)
+def refresh_series_aggregates(sender, instance, raw=False, **kwargs):
+    """Nombre de sermons et date du dernier, pour l'ancienne et la nouvelle série"""
+    if raw:
+        return
+    SermonSeriesService.refresh_aggregates({
+        instance.series_ref_id, getattr(instance, '_previous_series_ref_id', None)
+    })
+
+
+@receiver(post_delete, sender=Sermon)
+def refresh_series_after_delete(sender, instance, **kwargs):
+    SermonSeriesService.refresh_aggregates({instance.series_ref_id})
@@ -0,0 +1,798 @@
+import io
+import os
+import shutil
+import tempfile
+from unittest import mock
+from rest_framework import status
+from rest_framework.test import APITestCase
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import DatabaseError, connection
+from django.test import override_settings
+from django.utils import timezone
+from PyPDF2 import PdfReader, PdfWriter
+from reportlab.pdfgen import canvas
+from .models import Sermon, SermonComment, SermonDocument, SermonFeed, SermonProgress, SermonRelation, SermonSeries
+from .services import PDFOptimizationService, PDFPageService, SermonImportService
+from .counters import counters
+from .progress import progress
+from .recommendations import rebuild_all
+from .youtube import parse_youtube_id
+
+User = get_user_model()
+
+def make_pdf(pages, lines=1):
+    buffer = io.BytesIO()
+    pdf = canvas.Canvas(buffer, pageCompression=0)
+    for text in pages:
+        for line in range(lines):
+            pdf.drawString(72, 720 - line * 14, text)
+        pdf.showPage()
+    pdf.save()
+    return buffer.getvalue()
+
+
+class SermonListTests(APITestCase):
+    def setUp(self):
+        self.pastor = User.objects.create_user(
+            username='pasteur', email='pasteur@example.com',
+            password='testpassword123', role='PASTOR'
+        )
+        self.member = User.objects.create_user(
+            username='membre', email='membre@example.com', password='testpassword123'
+        )
+
+    def _create_sermons(self, count, comments=2):
+        start = Sermon.objects.count()
+        for i in range(start, start + count):
+            sermon = Sermon.objects.create(title=f'Sermon {i}', slug=f'sermon-{i}', pastor=self.pastor)
+            for _ in range(comments):
+                SermonComment.objects.create(sermon=sermon, user=self.member, content='Amen')
+
+    def test_list_returns_comment_count_without_comments(self):
+        self._create_sermons(1, comments=3)
+        response = self.client.get('/api/sermons/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        sermon = response.data['results'][0]
+        self.assertEqual(sermon['comment_count'], 3)
+        self.assertNotIn('comments', sermon)
+
+    def test_list_query_count_is_constant(self):
+        self._create_sermons(2)
+        # Agrégat des validateurs (ETag) + page par clé : ni COUNT(*) paginé ni OFFSET
+        with self.assertNumQueries(2):
+            self.client.get('/api/sermons/')
+
+        self._create_sermons(10)
+        with self.assertNumQueries(2):
+            self.client.get('/api/sermons/')
+
+    def test_list_conditional_get(self):
+        self._create_sermons(2)
+        response = self.client.get('/api/sermons/?category=SUNDAY_SERVICE')
+        etag = response['ETag']
+        self.assertIn('public', response['Cache-Control'])
+        self.assertIn('Authorization', response['Vary'])
+        # ETag seul : une date ne couvrirait ni commentaires, ni compteurs, ni suppressions
+        self.assertFalse(response.has_header('Last-Modified'))
+
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/sermons/?category=SUNDAY_SERVICE', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        # Autres filtres, nouveau commentaire, suppression : autre version
+        response = self.client.get('/api/sermons/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        SermonComment.objects.create(sermon=Sermon.objects.first(), user=self.member, content='Gloire')
+        response = self.client.get('/api/sermons/?category=SUNDAY_SERVICE', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        etag = response['ETag']
+        Sermon.objects.last().delete()
+        response = self.client.get('/api/sermons/?category=SUNDAY_SERVICE', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_cursor_pagination_with_filters(self):
+        self._create_sermons(5, comments=0)
+        Sermon.objects.filter(title__in=['Sermon 1', 'Sermon 3']).update(series='Apocalypse')
+
+        url = '/api/sermons/?series=Apocalypse&page_size=1'
+        titles = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            titles.extend(s['title'] for s in response.data['results'])
+            url = response.data['next']
+        self.assertEqual(sorted(titles), ['Sermon 1', 'Sermon 3'])
+
+    def test_invalid_date_filter_is_rejected(self):
+        response = self.client.get('/api/sermons/?date_from=hier')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_retrieve_includes_comments(self):
+        self._create_sermons(1, comments=2)
+        sermon = Sermon.objects.get()
+        response = self.client.get(f'/api/sermons/{sermon.pk}/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['comments']), 2)
+
+        response = self.client.get(f'/api/sermons/{sermon.pk}/', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(self.client.get('/api/sermons/999999/').status_code, status.HTTP_404_NOT_FOUND)
+
+
+class SermonCommentTests(APITestCase):
+    def setUp(self):
+        self.pastor = User.objects.create_user(
+            username='pasteur', email='pasteur@example.com',
+            password='testpassword123', role='PASTOR'
+        )
+        self.member = User.objects.create_user(
+            username='membre', email='membre@example.com', password='testpassword123'
+        )
+        self.sermon = Sermon.objects.create(title='Sermon', slug='sermon', pastor=self.pastor)
+
+    def test_comment_count_follows_insert_and_delete(self):
+        comment = SermonComment.objects.create(sermon=self.sermon, user=self.member, content='Amen')
+        SermonComment.objects.create(sermon=self.sermon, user=self.member, content='Gloire')
+        self.sermon.refresh_from_db()
+        self.assertEqual(self.sermon.comment_count, 2)
+
+        comment.delete()
+        self.sermon.refresh_from_db()
+        self.assertEqual(self.sermon.comment_count, 1)
+
+    def test_comments_endpoint_walks_all_pages(self):
+        for i in range(5):
+            SermonComment.objects.create(sermon=self.sermon, user=self.member, content=f'Commentaire {i}')
+
+        url = f'/api/sermons/{self.sermon.pk}/comments/?page_size=2'
+        seen = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            seen.extend(c['id'] for c in response.data['results'])
+            url = response.data['next']
+
+        expected = list(SermonComment.objects.order_by('-created_at', '-id').values_list('id', flat=True))
+        self.assertEqual(seen, expected)
+
+    def test_invalid_cursor_is_rejected(self):
+        response = self.client.get(f'/api/sermons/{self.sermon.pk}/comments/?cursor=invalide')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class SermonSearchTests(APITestCase):
+    def setUp(self):
+        self.pastor = User.objects.create_user(
+            username='pasteur', email='pasteur@example.com', password='testpassword123',
+            role='PASTOR', first_name='Jérôme', last_name='Martin'
+        )
+        self.admin = User.objects.create_user(
+            username='admin', email='admin@example.com', password='testpassword123', role='ADMIN'
+        )
+        Sermon.objects.create(
+            title='Le pardon', slug='le-pardon', pastor=self.pastor,
+            description='Pardonner comme Christ nous a pardonné.'
+        )
+        Sermon.objects.create(
+            title='La foi', slug='la-foi', pastor=self.pastor,
+            description='Une foi qui reçoit le pardon.', series='Épîtres de Paul'
+        )
+
+    def test_search_is_ranked_and_accent_insensitive(self):
+        response = self.client.get('/api/sermons/search/?q=PARDON')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        titles = [s['title'] for s in response.data['results']]
+        self.assertEqual(titles, ['Le pardon', 'La foi'])
+
+        response = self.client.get('/api/sermons/search/?q=epitres')
+        self.assertEqual([s['title'] for s in response.data['results']], ['La foi'])
+
+    def test_index_follows_updates(self):
+        sermon = Sermon.objects.get(slug='la-foi')
+        sermon.title = 'Espérance'
+        sermon.save()
+        response = self.client.get('/api/sermons/search/?q=esperance')
+        self.assertEqual([s['slug'] for s in response.data['results']], ['la-foi'])
+
+    def test_admin_search_matches_pastor_name(self):
+        self.client.force_authenticate(user=self.admin)
+        response = self.client.get('/api/admin/sermons/?search=jerome')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['count'], 2)
+
+        # Saisie en cours : correspondance partielle
+        response = self.client.get('/api/admin/sermons/?search=pard')
+        self.assertEqual(response.data['count'], 2)
+        response = self.client.get('/api/admin/sermons/?search=Pardonne')
+        self.assertEqual([s['title'] for s in response.data['results']], ['Le pardon'])
+
+    def test_filters_apply_before_limit(self):
+        for i in range(3):
+            Sermon.objects.create(title=f'Pardon {i}', slug=f'pardon-{i}', pastor=self.pastor, category='BIBLE_STUDY')
+        response = self.client.get('/api/sermons/search/?q=pardon&limit=1&category=SUNDAY_SERVICE')
+        self.assertEqual([s['title'] for s in response.data['results']], ['Le pardon'])
+
+
+@override_settings(BACKGROUND_TASKS_EAGER=True)
+class SermonPDFExtractionTests(APITestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(
+            MEDIA_ROOT=self.media_root,
+            SERMON_PAGE_CACHE_DIR=os.path.join(self.media_root, 'cache'),
+        )
+        self.settings_override.enable()
+        self.pastor = User.objects.create_user(
+            username='pasteur', email='pasteur@example.com',
+            password='testpassword123', role='PASTOR'
+        )
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+
+    def test_upload_extracts_pages_and_feeds_search(self):
+        sermon = Sermon(title='Notes', slug='notes', pastor=self.pastor)
+        sermon.pdf_file.save('notes.pdf', ContentFile(make_pdf(['Introduction', 'La sanctification'])), save=False)
+        with self.captureOnCommitCallbacks(execute=True):
+            sermon.save()
+
+        document = SermonDocument.objects.get(sermon=sermon)
+        self.assertEqual(document.status, SermonDocument.Status.DONE)
+        self.assertEqual(document.page_count, 2)
+        self.assertEqual(document.byte_size, sermon.pdf_file.size)
+        self.assertEqual(len(document.text_digest), 64)
+        self.assertIn('sanctification', document.pages.get(number=2).text)
+
+        response = self.client.get('/api/sermons/search/?q=sanctification')
+        self.assertEqual([s['slug'] for s in response.data['results']], ['notes'])
+
+        # PDF retiré : document, pages et termes du PDF disparaissent
+        sermon.pdf_file = None
+        with self.captureOnCommitCallbacks(execute=True):
+            sermon.save()
+        self.assertFalse(SermonDocument.objects.filter(sermon=sermon).exists())
+        response = self.client.get('/api/sermons/search/?q=sanctification')
+        self.assertEqual(response.data['results'], [])
+
+    @override_settings(SERMON_COUNTER_FLUSH_INTERVAL=0)
+    def test_single_pages_are_served_and_cached_per_version(self):
+        sermon = Sermon(title='Pages', slug='pages', pastor=self.pastor)
+        sermon.pdf_file.save('pages.pdf', ContentFile(make_pdf(['Un', 'Deux', 'Trois'])), save=False)
+        with self.captureOnCommitCallbacks(execute=True):
+            sermon.save()
+
+        response = self.client.get(f'/api/sermons/{sermon.pk}/')
+        self.assertEqual(response.data['page_count'], 3)
+
+        response = self.client.get(f'/api/sermons/{sermon.pk}/pages/2-3/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'application/pdf')
+        reader = PdfReader(io.BytesIO(b''.join(response.streaming_content)))
+        self.assertEqual(len(reader.pages), 2)
+        self.assertIn('Deux', reader.pages[0].extract_text())
+
+        response = self.client.get(f'/api/sermons/{sermon.pk}/pages/2-3/', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        old_dir = PDFPageService.get_cache_dir(sermon)
+        sermon.title = 'Pages (révisé)'
+        sermon.save()
+        self.client.get(f'/api/sermons/{sermon.pk}/pages/1/')
+        self.assertFalse(os.path.exists(old_dir))
+
+        # Seule la page 1 compte comme téléchargement (pas la plage 2-3)
+        counters.flush()
+        sermon.refresh_from_db()
+        self.assertEqual(sermon.download_count, 1)
+
+        response = self.client.get(f'/api/sermons/{sermon.pk}/pages/4/')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    @override_settings(SERMON_PDF_OPTIMIZATION=True)
+    def test_optimization_keeps_original_and_records_sizes(self):
+        sermon = Sermon(title='Long', slug='long', pastor=self.pastor)
+        content = make_pdf(['Grâce et paix à vous'] * 30, lines=40)
+        sermon.pdf_file.save('long.pdf', ContentFile(content), save=False)
+        original_name = sermon.pdf_file.name
+        with self.captureOnCommitCallbacks(execute=True):
+            sermon.save()
+
+        sermon.refresh_from_db()
+        document = SermonDocument.objects.get(sermon=sermon)
+        self.assertEqual(document.original_size, len(content))
+        # reportlab écrit des flux non compressés : la réécriture doit être plus petite
+        self.assertLess(document.optimized_size, document.original_size)
+        self.assertNotEqual(sermon.pdf_file.name, original_name)
+        self.assertEqual(document.original_file.name, original_name)
+        self.assertEqual(document.byte_size, document.optimized_size)
+        self.assertEqual(document.status, SermonDocument.Status.DONE)
+        self.assertEqual(document.page_count, 30)
+        self.assertEqual(document.source_name, sermon.pdf_file.name)
+
+    @override_settings(SERMON_PDF_OPTIMIZATION=True)
+    def test_optimized_file_is_removed_if_sermon_changed_meanwhile(self):
+        sermon = Sermon(title='Long', slug='long', pastor=self.pastor)
+        sermon.pdf_file.save('long.pdf', ContentFile(make_pdf(['Grâce et paix'] * 10, lines=40)), save=False)
+        sermon.save()
+        write = PdfWriter.write
+
+        def write_then_replace(writer, stream):
+            write(writer, stream)
+            Sermon.objects.filter(pk=sermon.pk).update(pdf_file='sermons/pdfs/autre.pdf')
+
+        with mock.patch.object(PdfWriter, 'write', write_then_replace):
+            PDFOptimizationService.optimize(sermon.pk)
+        self.assertEqual(os.listdir(os.path.join(self.media_root, 'sermons', 'pdfs')), ['long.pdf'])
+        self.assertFalse(SermonDocument.objects.get(sermon=sermon).original_file)
+
+    @override_settings(SERMON_PDF_OPTIMIZATION=True)
+    def test_malformed_pdf_is_marked_failed(self):
+        sermon = Sermon(title='Cassé', slug='casse', pastor=self.pastor)
+        sermon.pdf_file.save('casse.pdf', ContentFile(b'pas un pdf'), save=False)
+        with self.captureOnCommitCallbacks(execute=True):
+            sermon.save()
+
+        document = SermonDocument.objects.get(sermon=sermon)
+        self.assertEqual(document.status, SermonDocument.Status.FAILED)
+
+
+class SermonMediaTests(APITestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        self.settings_override.enable()
+        os.makedirs(os.path.join(self.media_root, 'sermons', 'pdfs'))
+        self.content = make_pdf(['Page 1', 'Page 2'])
+        with open(os.path.join(self.media_root, 'sermons', 'pdfs', 'notes.pdf'), 'wb') as f:
+            f.write(self.content)
+        self.url = '/media/sermons/pdfs/notes.pdf'
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+
+    def test_full_download_then_not_modified(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), self.content)
+        self.assertEqual(response['Content-Type'], 'application/pdf')
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+    def test_range_requests(self):
+        response = self.client.get(self.url, HTTP_RANGE='bytes=0-9')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(b''.join(response.streaming_content), self.content[:10])
+        self.assertEqual(response['Content-Range'], f'bytes 0-9/{len(self.content)}')
+
+        response = self.client.get(self.url, HTTP_RANGE='bytes=-5')
+        self.assertEqual(b''.join(response.streaming_content), self.content[-5:])
+
+        response = self.client.get(self.url, HTTP_RANGE=f'bytes={len(self.content)}-')
+        self.assertEqual(response.status_code, 416)
+
+    async def test_asgi_response_is_streamed_asynchronously(self):
+        # Sous ASGI, un itérateur synchrone serait lu entièrement en mémoire avant l'envoi
+        response = await self.async_client.get(self.url)
+        self.assertTrue(response.is_async)
+        self.assertEqual(b''.join([chunk async for chunk in response.streaming_content]), self.content)
+
+    @override_settings(SERMON_COUNTER_FLUSH_INTERVAL=0)
+    def test_pdf_downloads_are_counted_once(self):
+        pastor = User.objects.create_user(username='pasteur', email='pasteur@example.com', password='x', role='PASTOR')
+        sermon = Sermon.objects.create(title='Notes', slug='notes', pastor=pastor, pdf_file='sermons/pdfs/notes.pdf')
+        response = self.client.get(self.url, HTTP_RANGE='bytes=0-9')
+        self.client.get(self.url, HTTP_RANGE='bytes=10-19')
+        self.client.get(self.url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.client.head(self.url)
+        counters.flush()
+        sermon.refresh_from_db()
+        self.assertEqual(sermon.download_count, 1)
+
+    def test_path_outside_sermon_media_is_refused(self):
+        response = self.client.get('/media/sermons/pdfs/../../../settings.py')
+        self.assertEqual(response.status_code, 404)
+
+
+@override_settings(SERMON_COUNTER_FLUSH_INTERVAL=0)
+class SermonCounterTests(APITestCase):
+    def setUp(self):
+        self.pastor = User.objects.create_user(
+            username='pasteur', email='pasteur@example.com',
+            password='testpassword123', role='PASTOR'
+        )
+        self.sermons = [
+            Sermon.objects.create(title=f'Sermon {i}', slug=f'sermon-{i}', pastor=self.pastor)
+            for i in range(3)
+        ]
+
+    def test_events_are_batched_until_flush(self):
+        for sermon in self.sermons:
+            self.client.post(f'/api/sermons/{sermon.pk}/track/', {'event': 'view'})
+        self.client.post(f'/api/sermons/{self.sermons[0].pk}/track/', {'event': 'download'})
+
+        self.sermons[1].refresh_from_db()
+        self.assertEqual(self.sermons[1].view_count, 0)
+
+        # Sermons 1 et 2 ont le même incrément : un seul UPDATE pour les deux
+        with self.assertNumQueries(2):
+            self.assertEqual(counters.flush(), 2)
+
+        response = self.client.get(f'/api/sermons/{self.sermons[0].pk}/')
+        self.assertEqual(response.data['view_count'], 1)
+        self.assertEqual(response.data['download_count'], 1)
+
+    def test_unknown_event_is_rejected(self):
+        response = self.client.post(f'/api/sermons/{self.sermons[0].pk}/track/', {'event': 'like'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+@override_settings(BACKGROUND_TASKS_EAGER=True, SERMON_RELATED_COUNT=2)
+class RelatedSermonTests(APITestCase):
+    def setUp(self):
+        self.pastor = User.objects.create_user(
+            username='pasteur', email='pasteur@example.com',
+            password='testpassword123', role='PASTOR'
+        )
+
+    def create(self, slug, title, description, series=None):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Sermon.objects.create(
+                title=title, slug=slug, pastor=self.pastor, description=description, series=series
+            )
+
+    def test_related_is_updated_incrementally(self):
+        grace = self.create('grace', 'La grâce', 'La grâce de Dieu et le pardon', series='Romains')
+        self.create('louange', 'Louange', 'Chanter et adorer')
+        pardon = self.create('pardon', 'Le pardon', 'Pardon et grâce pour tous', series='Romains')
+
+        response = self.client.get(f'/api/sermons/{grace.pk}/related/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['results'][0]['slug'], 'pardon')
+
+        # Le sermon ajouté après coup entre aussi dans la liste de son voisin
+        with self.assertNumQueries(1):
+            response = self.client.get(f'/api/sermons/{pardon.pk}/related/')
+        self.assertEqual(response.data['results'][0]['slug'], 'grace')
+
+    def test_unpublished_and_unknown_sermons(self):
+        grace = self.create('grace', 'La grâce', 'La grâce de Dieu et le pardon')
+        pardon = self.create('pardon', 'Le pardon', 'Pardon et grâce pour tous')
+        self.assertTrue(SermonRelation.objects.filter(sermon=grace, related=pardon).exists())
+        pardon.is_published = False
+        with self.captureOnCommitCallbacks(execute=True):
+            pardon.save()
+
+        self.assertFalse(SermonRelation.objects.filter(related=pardon).exists())
+        response = self.client.get(f'/api/sermons/{grace.pk}/related/')
+        self.assertEqual(response.data['results'], [])
+        response = self.client.get('/api/sermons/999999/related/')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_full_rebuild_matches_incremental(self):
+        sermons = [
+            self.create('foi', 'La foi', 'Foi et espérance'),
+            self.create('esperance', 'Espérance', 'Espérance et foi vivante'),
+            self.create('amour', 'Amour', 'Amour du prochain'),
+        ]
+        before = {s.pk: list(s.relations.values_list('related_id', flat=True)) for s in sermons}
+        rebuild_all()
+        after = {s.pk: list(s.relations.values_list('related_id', flat=True)) for s in sermons}
+        self.assertEqual(before, after)
+
+        # Un brouillon ne compte pas dans l'IDF : mêmes scores en incrémental et en complet
+        with self.captureOnCommitCallbacks(execute=True):
+            Sermon.objects.create(title='Brouillon', slug='brouillon', pastor=self.pastor,
+                                  description='Foi et amour', is_published=False)
+        charite = self.create('charite', 'Charité', 'Amour et foi en actes')
+        before = list(charite.relations.values_list('related_id', 'score'))
+        rebuild_all()
+        after = list(charite.relations.values_list('related_id', 'score'))
+        self.assertEqual([r for r, _ in before], [r for r, _ in after])
+        for (_, expected), (_, score) in zip(before, after):
+            self.assertAlmostEqual(expected, score)
+
+
+class SermonFeedTests(APITestCase):
+    def setUp(self):
+        self.pastor = User.objects.create_user(
+            username='pasteur', email='pasteur@example.com',
+            password='testpassword123', role='PASTOR'
+        )
+        Sermon.objects.create(title='Culte de Pâques', slug='paques', pastor=self.pastor)
+        Sermon.objects.create(title='Jeunesse', slug='jeunesse', pastor=self.pastor, category='YOUTH')
+
+    def test_feed_is_stored_and_conditional(self):
+        response = self.client.get('/api/sermons/feed.xml')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response['Content-Type'].startswith('application/rss+xml'))
+        self.assertIn('Culte de Pâques', response.content.decode())
+
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/sermons/feed.xml', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_feed_is_regenerated_after_save(self):
+        etag = self.client.get('/api/sermons/feed.xml')['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            Sermon.objects.create(title='Pentecôte', slug='pentecote', pastor=self.pastor)
+
+        response = self.client.get('/api/sermons/feed.xml', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('Pentecôte', response.content.decode())
+
+    def test_category_variant(self):
+        response = self.client.get('/api/sermons/feed.xml?category=YOUTH')
+        content = response.content.decode()
+        self.assertIn('<title>Jeunesse</title>', content)
+        self.assertNotIn('Pâques', content)
+        self.assertEqual(self.client.get('/api/sermons/feed.xml?category=NOPE').status_code, 404)
+
+    @override_settings(SITE_URL='https://api.example.org', ALLOWED_HOSTS=['*'])
+    def test_series_variant_and_links(self):
+        Sermon.objects.create(title='Romains 1', slug='romains-1', pastor=self.pastor, series='Romains')
+        response = self.client.get('/api/sermons/feed.xml?series=Romains', HTTP_HOST='evil.example.com')
+        content = response.content.decode()
+        self.assertIn('https://api.example.org/api/sermons/feed.xml?series=Romains', content)
+        self.assertNotIn('evil.example.com', content)
+
+        # Série inconnue : 404, aucun flux stocké
+        response = self.client.get('/api/sermons/feed.xml?series=nimporte-quoi')
+        self.assertEqual(response.status_code, 404)
+        self.assertFalse(SermonFeed.objects.filter(key='series:nimporte-quoi').exists())
+
+
+@override_settings(BACKGROUND_TASKS_EAGER=True)
+class SermonImportTests(APITestCase):
+    CSV = (
+        "Video ID,Video title (original),Video description (original),Video publish timestamp\n"
+        "abc123defgh,La grâce,Éphésiens 2,2019-03-10T09:30:00+00:00\n"
+        "def456ghijk,La grâce,Romains 5,2019-03-17\n"
+        "ghi789jklmn,,Sans titre,2019-03-24\n"
+    )
+
+    def setUp(self):
+        self.admin = User.objects.create_user(
+            username='admin', email='admin@example.com', password='testpassword123', role='ADMIN'
+        )
+        Sermon.objects.create(title='La grâce', slug='la-grace', pastor=self.admin)
+
+    def test_import_allocates_slugs_and_keeps_dates(self):
+        rows = SermonImportService.parse(self.CSV)
+        result = SermonImportService.import_rows(rows, self.admin)
+
+        self.assertEqual(result['created'], 2)
+        self.assertEqual(result['errors'], [{'row': 3, 'error': 'Titre manquant'}])
+        imported = Sermon.objects.filter(youtube_url__contains='youtube.com').order_by('created_at')
+        self.assertEqual([s.slug for s in imported], ['la-grace-1', 'la-grace-2'])
+        self.assertEqual(imported[0].created_at.year, 2019)
+        self.assertEqual(imported[0].youtube_url, 'https://www.youtube.com/watch?v=abc123defgh')
+
+        response = self.client.get('/api/sermons/search/?q=romains')
+        self.assertEqual([s['slug'] for s in response.data['results']], ['la-grace-2'])
+
+        # Relancer le même export n'ajoute rien
+        result = SermonImportService.import_rows(rows, self.admin)
+        self.assertEqual((result['created'], result['skipped']), (0, 2))
+
+    def test_admin_endpoint_accepts_csv_upload(self):
+        self.client.force_authenticate(self.admin)
+        upload = ContentFile(self.CSV.encode('utf-8'), name='videos.csv')
+        response = self.client.post('/api/admin/sermons/import/', {'file': upload}, format='multipart')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['created'], 2)
+
+        response = self.client.post('/api/admin/sermons/import/', {'sermons': 'x'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_json_values_of_wrong_type_or_length_are_row_errors(self):
+        self.client.force_authenticate(self.admin)
+        rows = [
+            {'title': 123, 'is_published': True},
+            {'title': 'Daté', 'date': 20240101},
+            {'title': 'Liste', 'series': ['a']},
+            {'title': 'Série', 'series': 'x' * 256},
+            {'title': 'Lien', 'youtube_url': 'https://www.youtube.com/watch?v=' + 'a' * 200},
+        ]
+        response = self.client.post('/api/admin/sermons/import/', {'sermons': rows}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['created'], 2)
+        self.assertTrue(Sermon.objects.filter(title='123').exists())
+        self.assertEqual(timezone.localtime(Sermon.objects.get(title='Daté').created_at).date().isoformat(), '2024-01-01')
+        self.assertEqual([e['row'] for e in response.data['errors']], [3, 4, 5])
+
+
+class SermonDerivedFieldsTests(APITestCase):
+    def setUp(self):
+        self.pastor = User.objects.create_user(
+            username='pasteur', email='pasteur@example.com',
+            password='testpassword123', role='PASTOR'
+        )
+
+    def test_youtube_url_variants(self):
+        for url in [
+            'https://www.youtube.com/watch?v=dQw4w9WgXcQ&t=42s',
+            'https://youtu.be/dQw4w9WgXcQ?si=xyz',
+            'https://youtube.com/shorts/dQw4w9WgXcQ',
+            'https://www.youtube-nocookie.com/embed/dQw4w9WgXcQ',
+            'https://m.youtube.com/live/dQw4w9WgXcQ?feature=share',
+        ]:
+            self.assertEqual(parse_youtube_id(url), 'dQw4w9WgXcQ', url)
+        self.assertEqual(parse_youtube_id('https://example.com/watch?v=dQw4w9WgXcQ'), '')
+        self.assertEqual(parse_youtube_id('https://www.youtube.com/@cyprusforchrist'), '')
+
+    def test_fields_are_stored_on_save_and_served(self):
+        sermon = Sermon.objects.create(
+            title='Louange', slug='louange', pastor=self.pastor,
+            youtube_url='https://youtu.be/dQw4w9WgXcQ'
+        )
+        self.assertEqual(sermon.youtube_id, 'dQw4w9WgXcQ')
+        self.assertEqual(sermon.thumbnail, 'https://i.ytimg.com/vi/dQw4w9WgXcQ/hqdefault.jpg')
+
+        sermon.youtube_url = ''
+        sermon.save(update_fields=['youtube_url'])
+        sermon.refresh_from_db()
+        self.assertEqual((sermon.youtube_id, sermon.thumbnail), ('', ''))
+
+        Sermon.objects.filter(pk=sermon.pk).update(youtube_url='https://www.youtube.com/watch?v=abcdefghijk')
+        call_command('backfill_sermon_fields', stdout=io.StringIO())
+        response = self.client.get(f'/api/sermons/{sermon.pk}/')
+        self.assertEqual(response.data['youtube_id'], 'abcdefghijk')
+        self.assertEqual(response.data['thumbnail'], 'https://i.ytimg.com/vi/abcdefghijk/hqdefault.jpg')
+
+
+class SermonFacetTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.pastor = User.objects.create_user(
+            username='pasteur', email='pasteur@example.com', password='testpassword123',
+            role='PASTOR', first_name='Jérôme', last_name='Martin'
+        )
+        Sermon.objects.create(title='A', slug='a', pastor=self.pastor, category='YOUTH', series='Romains')
+        Sermon.objects.create(title='B', slug='b', pastor=self.pastor, category='YOUTH')
+        Sermon.objects.create(title='C', slug='c', pastor=self.pastor, is_published=False)
+
+    def test_facets_are_cached_and_invalidated(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.get('/api/sermons/facets/')
+        self.assertEqual(response.data['total'], 3)
+        self.assertEqual(response.data['categories'][0], {'value': 'YOUTH', 'label': 'Jeunesse', 'count': 2})
+        self.assertEqual(response.data['series'], [{'value': 'Romains', 'count': 1}])
+        self.assertEqual(response.data['pastors'], [{'id': self.pastor.pk, 'name': 'Jérôme Martin', 'count': 3}])
+
+        with self.assertNumQueries(0):
+            self.client.get('/api/sermons/facets/')
+
+        published = self.client.get('/api/sermons/facets/?is_published=true')
+        self.assertEqual(published.data['total'], 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Sermon.objects.get(slug='a').delete()
+        response = self.client.get('/api/sermons/facets/')
+        self.assertEqual(response.data['total'], 2)
+        self.assertEqual(response.data['series'], [])
+
+    def test_unknown_category_keeps_its_code(self):
+        Sermon.objects.filter(slug='c').update(category='LEGACY')
+        response = self.client.get('/api/sermons/facets/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn({'value': 'LEGACY', 'label': 'LEGACY', 'count': 1}, response.data['categories'])
+
+
+@override_settings(SERMON_PROGRESS_FLUSH_INTERVAL=0)
+class SermonProgressTests(APITestCase):
+    def setUp(self):
+        self.pastor = User.objects.create_user(
+            username='pasteur', email='pasteur@example.com',
+            password='testpassword123', role='PASTOR'
+        )
+        self.member = User.objects.create_user(
+            username='membre', email='membre@example.com', password='testpassword123'
+        )
+        self.sermons = [
+            Sermon.objects.create(title=f'Sermon {i}', slug=f'sermon-{i}', pastor=self.pastor)
+            for i in range(3)
+        ]
+        self.client.force_authenticate(self.member)
+
+    def send(self, *heartbeats):
+        return self.client.post('/api/sermons/progress/', {'heartbeats': [
+            {'sermon': sermon.pk, 'position': position, 'duration': 1000} for sermon, position in heartbeats
+        ]}, format='json')
+
+    def test_heartbeats_are_coalesced_and_upserted(self):
+        first, second, third = self.sermons
+        response = self.send((first, 10), (first, 20), (second, 30))
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.send((first, 40), (third, 990))
+        self.assertFalse(SermonProgress.objects.exists())
+
+        # Sermons existants + un seul upsert pour les trois couples (dans un point de sauvegarde)
+        with self.assertNumQueries(4):
+            self.assertEqual(progress.flush(), 3)
+        self.send((second, 35))
+        progress.flush()
+
+        response = self.client.get('/api/sermons/continue-watching/')
+        results = response.data['results']
+        self.assertEqual([(r['sermon']['id'], r['position']) for r in results], [(second.pk, 35), (first.pk, 40)])
+
+    def test_deleted_sermon_does_not_break_the_batch(self):
+        self.send((self.sermons[0], 10), (self.sermons[1], 20))
+        self.sermons[1].delete()
+        self.assertEqual(progress.flush(), 1)
+
+    def test_unstarted_sermons_are_not_listed(self):
+        self.send((self.sermons[0], 0), (self.sermons[1], 20))
+        progress.flush()
+        results = self.client.get('/api/sermons/continue-watching/').data['results']
+        self.assertEqual([r['sermon']['id'] for r in results], [self.sermons[1].pk])
+
+    def test_upsert_without_conflict_target_on_mysql(self):
+        self.send((self.sermons[0], 10))
+        with mock.patch.object(connection.features, 'supports_update_conflicts_with_target', False), \
+                mock.patch.object(SermonProgress.objects, 'bulk_create') as bulk_create:
+            self.assertEqual(progress.flush(), 1)
+        self.assertTrue(bulk_create.call_args.kwargs['update_conflicts'])
+        self.assertNotIn('unique_fields', bulk_create.call_args.kwargs)
+
+    def test_failed_batch_does_not_override_newer_heartbeats(self):
+        self.send((self.sermons[0], 10))
+        with mock.patch.object(SermonProgress.objects, 'bulk_create', side_effect=DatabaseError):
+            self.assertEqual(progress.flush(), 0)
+        self.send((self.sermons[0], 50))
+        progress.flush()
+        self.assertEqual(SermonProgress.objects.get().position, 50)
+
+    def test_out_of_range_heartbeats(self):
+        self.assertEqual(self.send((self.sermons[0], 10 ** 20)).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.send((self.sermons[0], 1001)).status_code, status.HTTP_400_BAD_REQUEST)
+
+        # Une ligne refusée par la base est abandonnée seule, les autres sont écrites
+        progress.record(self.member.pk, self.sermons[0].pk, 10 ** 20)
+        self.send((self.sermons[1], 20))
+        self.assertEqual(progress.flush(), 1)
+        self.assertEqual(progress.flush(), 0)
+        self.assertEqual(list(SermonProgress.objects.values_list('sermon_id', 'position')), [(self.sermons[1].pk, 20)])
+
+    def test_requires_authentication_and_valid_payload(self):
+        self.assertEqual(self.send((self.sermons[0], -1)).status_code, status.HTTP_400_BAD_REQUEST)
+        self.client.force_authenticate(None)
+        self.assertEqual(self.send((self.sermons[0], 10)).status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class SermonSeriesTests(APITestCase):
+    def setUp(self):
+        self.pastor = User.objects.create_user(
+            username='pasteur', email='pasteur@example.com',
+            password='testpassword123', role='PASTOR'
+        )
+        for i in range(3):
+            Sermon.objects.create(title=f'Romains {i}', slug=f'romains-{i}', pastor=self.pastor, series='Romains')
+        Sermon.objects.create(title='Brouillon', slug='brouillon', pastor=self.pastor, series='romains', is_published=False)
+
+    def test_series_detail_in_two_queries(self):
+        series = SermonSeries.objects.get()
+        self.assertEqual(series.sermon_count, 3)
+        self.assertEqual(Sermon.objects.filter(series_ref=series).count(), 4)
+
+        with self.assertNumQueries(2):
+            response = self.client.get(f'/api/sermons/series/{series.slug}/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([s['title'] for s in response.data['sermons']], ['Romains 0', 'Romains 1', 'Romains 2'])
+
+    def test_aggregates_follow_sermon_changes(self):
+        sermon = Sermon.objects.get(slug='romains-2')
+        sermon.series = 'Galates'
+        sermon.save(update_fields=['series'])
+        Sermon.objects.get(slug='romains-1').delete()
+
+        response = self.client.get('/api/sermons/series/')
+        counts = {s['title']: s['sermon_count'] for s in response.data}
+        self.assertEqual(counts, {'Romains': 1, 'Galates': 1})
@@ -1,10 +1,13 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import SermonViewSet
+from .views import SermonSeriesViewSet, SermonViewSet
+from .feeds import sermon_feed
 
 router = DefaultRouter()
+router.register(r'series', SermonSeriesViewSet, basename='sermon-series')
 router.register(r'', SermonViewSet)
 
 urlpatterns = [
+    path('feed.xml', sermon_feed, name='sermon_feed'),
     path('', include(router.urls)),
 ]
@@ -1,24 +1,176 @@
 from rest_framework import viewsets, permissions, status
 from rest_framework.response import Response
 from rest_framework.decorators import action
-from django.utils.text import slugify
-from .models import Sermon, SermonComment
-from .serializers import SermonSerializer, SermonCommentSerializer
+from rest_framework.exceptions import ValidationError
+from datetime import datetime, time, timedelta
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Max, Prefetch, Sum
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from cyprus_api.conditional import ConditionalGetMixin, make_etag
+from cyprus_api.pagination import KeysetPagination
+from .models import Sermon, SermonComment, SermonProgress, SermonSeries
+from .serializers import (
+    SermonSerializer, SermonListSerializer, SermonCommentSerializer,
+    SermonProgressSerializer, ProgressHeartbeatSerializer,
+    SermonSeriesSerializer, SermonSeriesDetailSerializer,
+)
+from .search import rank_queryset
+from .services import PDFPageService, SlugService
+from .media_views import is_download_start, serve_file
+from .counters import EVENT_FIELDS, counters
+from .facets import get_facets
+from .progress import progress
 from users.permissions import IsAdmin
 
-class SermonViewSet(viewsets.ModelViewSet):
+class SermonCatalogPagination(KeysetPagination):
+    """Catalogue public : du plus récent au plus ancien, servi par les index composites"""
+    ordering = ('-created_at', 'id')
+
+
+class SermonSeriesViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    Séries de sermons : la liste lit les agrégats stockés (une requête),
+    le détail charge la série puis tous ses sermons publiés (deux requêtes).
+    """
+    serializer_class = SermonSeriesSerializer
+    permission_classes = [permissions.AllowAny]
+    lookup_field = 'slug'
+    # Quelques dizaines de séries au plus : pas de pagination
+    pagination_class = None
+
+    def get_queryset(self):
+        queryset = SermonSeries.objects.all()
+        if self.action == 'retrieve':
+            return queryset.prefetch_related(Prefetch(
+                'sermons',
+                queryset=Sermon.objects.filter(is_published=True)
+                .select_related('pastor', 'document').order_by('created_at', 'id'),
+                to_attr='published_sermons',
+            ))
+        return queryset.filter(sermon_count__gt=0)
+
+    def get_serializer_class(self):
+        if self.action == 'retrieve':
+            return SermonSeriesDetailSerializer
+        return SermonSeriesSerializer
+
+
+class SermonViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = Sermon.objects.all()
     serializer_class = SermonSerializer
+    pagination_class = SermonCatalogPagination
+    lookup_value_regex = r'\d+'
 
     def get_queryset(self):
-        queryset = Sermon.objects.all()
-        category = self.request.query_params.get('category')
+        queryset = self.filter_catalogue(Sermon.objects.select_related('pastor', 'document'))
+
+        if self.action == 'retrieve':
+            queryset = queryset.prefetch_related(
+                Prefetch('comments', queryset=SermonComment.objects.select_related('user'))
+            )
+        return queryset
+
+    def filter_catalogue(self, queryset):
+        """
+        Filtres du catalogue : category, series, pastor, is_published,
+        date_from / date_to (AAAA-MM-JJ, bornes incluses).
+        """
+        params = self.request.query_params
+
+        category = params.get('category')
         if category:
             queryset = queryset.filter(category=category)
+
+        series = params.get('series')
+        if series:
+            queryset = queryset.filter(series=series)
+
+        pastor = params.get('pastor')
+        if pastor:
+            if not pastor.isdigit():
+                raise ValidationError({'pastor': "Identifiant de pasteur invalide."})
+            queryset = queryset.filter(pastor_id=int(pastor))
+
+        is_published = params.get('is_published')
+        if is_published is not None:
+            queryset = queryset.filter(is_published=is_published.lower() == 'true')
+
+        # Bornes converties en datetimes pour garder l'index sur created_at utilisable
+        date_from = self._parse_date_param('date_from')
+        if date_from:
+            queryset = queryset.filter(created_at__gte=self._start_of_day(date_from))
+
+        date_to = self._parse_date_param('date_to')
+        if date_to:
+            queryset = queryset.filter(created_at__lt=self._start_of_day(date_to + timedelta(days=1)))
+
         return queryset
 
+    def get_list_validators(self):
+        """
+        ETag : max(updated_at) du catalogue filtré, plus ce qui change sans
+        toucher updated_at : suppressions (nombre de lignes), compteurs mis à
+        jour par UPDATE, extraction du PDF (page_count). Les paramètres
+        (filtres, curseur, page_size) entrent dans l'ETag.
+        Pas de Last-Modified : une date seule (If-Modified-Since) ignorerait
+        ces changements et validerait une liste périmée.
+        """
+        stats = self.filter_catalogue(Sermon.objects.all()).aggregate(
+            last_update=Max('updated_at'),
+            total=Count('id'),
+            comments=Sum('comment_count'),
+            views=Sum('view_count'),
+            downloads=Sum('download_count'),
+            clicks=Sum('youtube_click_count'),
+            document_update=Max('document__updated_at'),
+        )
+        etag = make_etag(
+            'sermons', self.request.build_absolute_uri(),
+            *(value.isoformat() if hasattr(value, 'isoformat') else value for value in stats.values())
+        )
+        return etag, None
+
+    def get_detail_validators(self):
+        row = (
+            self.filter_catalogue(Sermon.objects.all())
+            .filter(pk=self.kwargs[self.lookup_url_kwarg or self.lookup_field])
+            .values_list(
+                'updated_at', 'comment_count', 'view_count', 'download_count',
+                'youtube_click_count', 'document__updated_at',
+            )
+            .first()
+        )
+        if row is None:
+            return None
+        # ETag seul, comme pour la liste : commentaires et compteurs ne touchent pas updated_at
+        etag = make_etag('sermon', self.request.build_absolute_uri(), *row)
+        return etag, None
+
+    def _parse_date_param(self, name):
+        value = self.request.query_params.get(name)
+        if not value:
+            return None
+        try:
+            parsed = parse_date(value)
+        except ValueError:
+            parsed = None
+        if parsed is None:
+            raise ValidationError({name: "Date invalide, format attendu : AAAA-MM-JJ."})
+        return parsed
+
+    @staticmethod
+    def _start_of_day(day):
+        return timezone.make_aware(datetime.combine(day, time.min))
+
+    def get_serializer_class(self):
+        if self.action in ['list', 'search', 'related']:
+            return SermonListSerializer
+        return SermonSerializer
+
     def get_permissions(self):
-        if self.action in ['list', 'retrieve']:
+        if self.action in ['list', 'retrieve', 'comments', 'search', 'pages', 'track', 'related', 'facets']:
             permission_classes = [permissions.AllowAny]
         elif self.action in ['create', 'update', 'partial_update', 'destroy']:
             # Seuls les Admins peuvent créer/modifier/supprimer
@@ -28,24 +180,157 @@ class SermonViewSet(viewsets.ModelViewSet):
         return [permission() for permission in permission_classes]
 
     def perform_create(self, serializer):
-        # Automatically set slug and pastor
-        title = serializer.validated_data.get('title')
-        slug = slugify(title)
-        
-        # Ensure slug uniqueness
-        original_slug = slug
-        counter = 1
-        while Sermon.objects.filter(slug=slug).exists():
-            slug = f"{original_slug}-{counter}"
-            counter += 1
-            
-        serializer.save(pastor=self.request.user, slug=slug)
+        SlugService.save_with_unique_slug(serializer, pastor=self.request.user)
+
+    @action(detail=False, methods=['get'])
+    def search(self, request):
+        """Recherche plein texte classée par pertinence (?q=...&limit=...)"""
+        query = request.query_params.get('q', '').strip()
+        if not query:
+            return Response({"error": "Le paramètre q est requis"}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            limit = max(1, min(int(request.query_params.get('limit', 20)), 50))
+        except ValueError:
+            limit = 20
+
+        queryset = rank_queryset(self.get_queryset(), query, limit=limit)
+        serializer = self.get_serializer(queryset, many=True)
+        return Response({'results': serializer.data})
+
+    @action(detail=False, methods=['get'])
+    def facets(self, request):
+        """
+        Compteurs par catégorie, série et pasteur pour la barre de filtres
+        (?is_published=true|false), servis depuis le cache.
+        """
+        is_published = request.query_params.get('is_published')
+        if is_published is not None:
+            is_published = is_published.lower() == 'true'
+        return Response(get_facets(is_published))
+
+    @action(detail=True, methods=['get'], url_path=r'pages/(?P<page_range>\d+(?:-\d+)?)')
+    def pages(self, request, pk=None, page_range=None):
+        """
+        Une page (/pages/3/) ou une petite plage (/pages/2-4/) du PDF,
+        servie comme PDF autonome pour les connexions mobiles. Une lecture
+        commence par la page 1 : c'est elle qui compte comme téléchargement.
+        """
+        sermon = self.get_object()
+        if not sermon.pdf_file:
+            return Response({"error": "Ce sermon n'a pas de PDF"}, status=status.HTTP_404_NOT_FOUND)
+
+        first, _, last = page_range.partition('-')
+        first = int(first)
+        last = int(last) if last else first
+        try:
+            page_count = PDFPageService.get_page_count(sermon)
+        except Exception:
+            return Response({"error": "PDF illisible"}, status=status.HTTP_404_NOT_FOUND)
+
+        if first < 1 or last < first or last > page_count:
+            return Response(
+                {"error": f"Plage de pages invalide (1-{page_count})"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if last - first + 1 > settings.SERMON_PAGE_RANGE_MAX:
+            return Response(
+                {"error": f"Au plus {settings.SERMON_PAGE_RANGE_MAX} pages par requête"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        path = PDFPageService.get_pages_file(sermon, first, last)
+        response = serve_file(request, path)
+        response['X-Page-Count'] = str(page_count)
+        if first == 1 and is_download_start(request, response):
+            counters.record(sermon.pk, 'download')
+        return response
+
+    @action(detail=True, methods=['get'])
+    def related(self, request, pk=None):
+        """
+        Sermons similaires précalculés : une seule requête sur l'index (sermon, rank).
+        Les sermons dépubliés depuis le calcul sont écartés à la lecture.
+        """
+        queryset = (
+            Sermon.objects.filter(related_to__sermon_id=pk, is_published=True)
+            .select_related('pastor', 'document')
+            .order_by('related_to__rank')
+        )
+        serializer = self.get_serializer(queryset, many=True)
+        if not serializer.data and not Sermon.objects.filter(pk=pk).exists():
+            return Response({"detail": "Sermon introuvable."}, status=status.HTTP_404_NOT_FOUND)
+        return Response({'results': serializer.data})
+
+    @action(detail=True, methods=['post'])
+    def track(self, request, pk=None):
+        """
+        Enregistre un événement : {"event": "view" | "download" | "youtube_click"}.
+        Compté en mémoire puis écrit par lots (voir sermons/counters.py).
+        """
+        event = request.data.get('event')
+        if event not in EVENT_FIELDS:
+            return Response(
+                {"error": f"Événement inconnu, valeurs possibles : {', '.join(EVENT_FIELDS)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if not Sermon.objects.filter(pk=pk).exists():
+            return Response({"detail": "Sermon introuvable."}, status=status.HTTP_404_NOT_FOUND)
+        counters.record(int(pk), event)
+        return Response(status=status.HTTP_202_ACCEPTED)
+
+    @action(detail=False, methods=['post'])
+    def progress(self, request):
+        """
+        Battements de lecture groupés : {"heartbeats": [{"sermon", "position", "duration"}]}.
+        Fusionnés en mémoire, écrits par lots (voir sermons/progress.py).
+        """
+        heartbeats = request.data.get('heartbeats') if isinstance(request.data, dict) else None
+        if not isinstance(heartbeats, list) or not heartbeats:
+            return Response({"error": "Liste heartbeats requise"}, status=status.HTTP_400_BAD_REQUEST)
+        if len(heartbeats) > settings.SERMON_PROGRESS_BATCH_MAX:
+            return Response(
+                {"error": f"Au plus {settings.SERMON_PROGRESS_BATCH_MAX} battements par requête"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        serializer = ProgressHeartbeatSerializer(data=heartbeats, many=True)
+        serializer.is_valid(raise_exception=True)
+        # Dans l'ordre d'envoi : le dernier battement d'un sermon l'emporte
+        for heartbeat in serializer.validated_data:
+            progress.record(request.user.pk, heartbeat['sermon'], heartbeat['position'], heartbeat.get('duration'))
+        return Response({'accepted': len(serializer.validated_data)}, status=status.HTTP_202_ACCEPTED)
+
+    @action(detail=False, methods=['get'], url_path='continue-watching')
+    def continue_watching(self, request):
+        """Sermons commencés (position > 0) et non terminés, du plus récent au plus ancien (index dédié)"""
+        try:
+            limit = max(1, min(int(request.query_params.get('limit', 10)), 50))
+        except ValueError:
+            limit = 10
+        queryset = (
+            SermonProgress.objects.filter(user=request.user, completed=False, position__gt=0)
+            .select_related('sermon__pastor', 'sermon__document')
+            .order_by('-last_watched_at')[:limit]
+        )
+        serializer = SermonProgressSerializer(queryset, many=True, context=self.get_serializer_context())
+        return Response({'results': serializer.data})
+
+    @action(detail=True, methods=['get'])
+    def comments(self, request, pk=None):
+        """Commentaires d'un sermon, paginés par clé (created_at, id)"""
+        sermon = self.get_object()
+        queryset = SermonComment.objects.filter(sermon=sermon).select_related('user')
+        paginator = KeysetPagination()
+        page = paginator.paginate_queryset(queryset, request, view=self)
+        serializer = SermonCommentSerializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
 
     @action(detail=True, methods=['post'], permission_classes=[permissions.IsAuthenticated])
     def add_comment(self, request, pk=None):
         sermon = self.get_object()
         serializer = SermonCommentSerializer(data=request.data)
         if serializer.is_valid():
-            serializer.save(user=request.user, sermon=sermon)
+            # Insertion + incrément de comment_count (signal) dans la même transaction
+            with transaction.atomic():
+                serializer.save(user=request.user, sermon=sermon)
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,50 @@
+"""
+Analyse des liens YouTube des sermons.
+
+Appelée une fois à l'enregistrement (Sermon.save, import en masse, commande
+backfill_sermon_fields) : l'identifiant et la miniature sont ensuite stockés
+et le catalogue ne fait plus que lire des colonnes.
+"""
+import re
+from urllib.parse import parse_qs, urlparse
+
+VIDEO_ID_RE = re.compile(r'^[A-Za-z0-9_-]{11}$')
+YOUTUBE_HOSTS = ('youtube.com', 'youtube-nocookie.com')
+# /shorts/ID, /embed/ID, /live/ID, /v/ID
+PATH_PREFIXES = ('shorts', 'embed', 'live', 'v', 'e')
+THUMBNAIL_URL = 'https://i.ytimg.com/vi/{video_id}/hqdefault.jpg'
+
+
+def parse_youtube_id(url):
+    """
+    Identifiant de vidéo (11 caractères) d'un lien YouTube, ou '' :
+    watch?v=, youtu.be/, shorts/, embed/, live/, m./music./nocookie,
+    paramètres supplémentaires (t=, si=, list=...) et identifiant nu.
+    """
+    if not url:
+        return ''
+    url = url.strip()
+    if VIDEO_ID_RE.match(url):
+        return url
+    if '://' not in url:
+        url = f'https://{url}'
+
+    parsed = urlparse(url)
+    host = (parsed.hostname or '').lower()
+    segments = [segment for segment in parsed.path.split('/') if segment]
+
+    candidate = ''
+    if host == 'youtu.be' or host.endswith('.youtu.be'):
+        candidate = segments[0] if segments else ''
+    elif any(host == h or host.endswith(f'.{h}') for h in YOUTUBE_HOSTS):
+        query = parse_qs(parsed.query)
+        if query.get('v'):
+            candidate = query['v'][0]
+        elif len(segments) >= 2 and segments[0] in PATH_PREFIXES:
+            candidate = segments[1]
+
+    return candidate if VIDEO_ID_RE.match(candidate) else ''
+
+
+def get_thumbnail_url(video_id):
+    return THUMBNAIL_URL.format(video_id=video_id) if video_id else ''
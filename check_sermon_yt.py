@@ -9,7 +9,7 @@ os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'cyprus_api.settings')
 django.setup()
 
 from sermons.models import Sermon
-from sermons.serializers import SermonSerializer
+from sermons.youtube import parse_youtube_id
 
 try:
     # Get last 5 sermons
@@ -18,9 +18,9 @@ try:
         print(f"--- Sermon: {sermon.title} ---")
         print(f"URL: '{sermon.youtube_url}'")
         
-        # Manually run the extraction logic
-        serializer = SermonSerializer(sermon)
-        print(f"Extracted ID: {serializer.get_youtube_id(sermon)}")
+        # Stored ID vs. fresh parse of the URL
+        print(f"Stored ID: '{sermon.youtube_id}'")
+        print(f"Extracted ID: '{parse_youtube_id(sermon.youtube_url)}'")
 
 except Exception as e:
     print(f"Error: {e}")
@@ -3,6 +3,10 @@ import { motion, AnimatePresence } from 'framer-motion'
 import { FaRobot, FaUser, FaPaperPlane, FaBookOpen, FaSearch, FaChevronRight, FaChevronLeft } from 'react-icons/fa'
 import { useLanguage } from '../context/LanguageContext'
 
+// Suivi des consultations traitées en arrière-plan (POST /ai/ask/ → 202)
+const AI_POLL_INTERVAL = 1500
+const AI_POLL_TIMEOUT = 3 * 60 * 1000
+
 const BibleAIAssistant = () => {
     const { language, t } = useLanguage()
     const [activeTab, setActiveTab] = useState('reading') // 'reading' or 'chat'
@@ -90,6 +94,18 @@ const BibleAIAssistant = () => {
         }
     }, [selectedBookId, chapter, activeTab, language, t])
 
+    const pollConsultation = async (baseUrl, publicId) => {
+        const deadline = Date.now() + AI_POLL_TIMEOUT
+        while (Date.now() < deadline) {
+            await new Promise(resolve => setTimeout(resolve, AI_POLL_INTERVAL))
+            const response = await fetch(`${baseUrl}/ai/consultations/${publicId}/`)
+            if (!response.ok) throw new Error('Failed to fetch consultation')
+            const data = await response.json()
+            if (data.status === 'DONE' || data.status === 'FAILED') return data
+        }
+        throw new Error('AI consultation timed out')
+    }
+
     const handleSend = async () => {
         if (!input.trim()) return
 
@@ -115,7 +131,12 @@ const BibleAIAssistant = () => {
                     language: language // Pass current language to backend
                 }),
             })
-            const data = await response.json()
+            let data = await response.json()
+
+            // Question nouvelle : la réponse est préparée en arrière-plan, on suit la consultation
+            if (response.status === 202 && data.public_id) {
+                data = await pollConsultation(baseUrl, data.public_id)
+            }
 
             const aiMessage = {
                 id: messages.length + 2,
@@ -41,6 +41,17 @@ const Sermons = () => {
     const [isPlaying, setIsPlaying] = useState(false)
     const [loading, setLoading] = useState(true)
 
+    // Compteurs de sermons (POST /track/) ; les téléchargements PDF sont comptés par le serveur
+    const trackEvent = (sermonId, event) => {
+        const baseUrl = import.meta.env.VITE_API_URL || 'http://127.0.0.1:8000/api'
+        fetch(`${baseUrl}/sermons/${sermonId}/track/`, {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ event }),
+            keepalive: true
+        }).catch(() => {})
+    }
+
     // Helper to get label from category ID
     const getCategoryLabel = (catId) => {
         const cat = categories.find(c => c.id === catId);
@@ -74,7 +85,7 @@ const Sermons = () => {
                     categoryLabel: getCategoryLabel(s.category), // Initial label, will update on render if lang changes
                     description: s.description,
                     duration: s.duration || '00:00',
-                    views: s.views || 0,
+                    views: s.view_count || 0,
                     thumbnail: s.thumbnail || 'https://images.unsplash.com/photo-1501386761578-eac5c94b800a?ixlib=rb-4.0.3&auto=format&fit=crop&w=800&q=80',
                     notesUrl: s.pdf_file ? (s.pdf_file.startsWith('http') ? s.pdf_file : `${(import.meta.env.VITE_API_URL || 'http://127.0.0.1:8000/api').replace('/api', '')}${s.pdf_file}`) : null
                 }))
@@ -273,7 +284,10 @@ const Sermons = () => {
                                                 />
                                                 <div className="absolute inset-0 bg-black/50 flex items-center justify-center">
                                                     <button
-                                                        onClick={() => setIsPlaying(true)}
+                                                        onClick={() => {
+                                                            setIsPlaying(true)
+                                                            trackEvent(selectedSermon.id, 'youtube_click')
+                                                        }}
                                                         className="bg-gradient-to-r from-gold to-lightGold text-white p-6 rounded-full hover:scale-110 transition-transform duration-300"
                                                     >
                                                         <FaPlay className="h-8 w-8" />
@@ -343,6 +357,7 @@ const Sermons = () => {
                                                 onClick={() => {
                                                     setSelectedSermon(sermon)
                                                     setIsPlaying(false)
+                                                    trackEvent(sermon.id, 'view')
                                                 }}
                                                 className={`bg-white rounded-xl shadow-lg overflow-hidden cursor-pointer transition-all duration-300 ${selectedSermon.id === sermon.id ? 'ring-2 ring-gold' : 'hover:shadow-xl'
                                                     }`}